@@ -1,10 +1,40 @@
 """
-Autogenesis AI Agent - Supports Groq API (primary) with Gemini fallback.
+Autogenesis AI Agent - Balances Groq keys (primary) and Gemini through a provider pool.
 """
+import asyncio
 import os
-from dotenv import load_dotenv
+import threading
+import time
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from pathlib import Path
 
-load_dotenv(override=True)
+def load_env():
+    """
+    Load the nearest .env above this package, as python-dotenv's own search
+    would. dotenv is only imported when there is a file to load.
+    """
+    for folder in Path(__file__).resolve().parents:
+        path = folder / ".env"
+        if path.is_file():
+            from dotenv import load_dotenv
+            load_dotenv(path, override=True)
+            return path
+    return None
+
+ENV_FILE = load_env()
+
+# These imports must stay below load_env(): cache, providers and cassette read
+# their settings (LLM_CACHE, the breaker limits, LLM_RECORD/LLM_REPLAY) from the
+# environment when imported, so .env has to be loaded first.
+from .cache import cache_key, get_cached_any, put_cached, CACHE_ENABLED
+from .singleflight import SingleFlight
+from .ratelimit import QueueTimeout, estimate_tokens, retry_after_seconds, is_rate_limit_error
+from .providers import build_pool_from_env, LazyPool
+from .latency import RollingHistogram
+from .tracing import llm_call, note_attempt
+from .metrics import LLM_REQUESTS, LLM_LATENCY, LLM_FALLBACKS, Collected
+from . import cassette
 
 # Check for Groq API key first, then Gemini
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
@@ -20,24 +50,85 @@ def log_agent_error(msg):
     except:
         pass
 
-# Determine which provider to use
-USE_GROQ = GROQ_API_KEY is not None
-USE_GEMINI = GEMINI_API_KEY is not None and not USE_GROQ
-
-if USE_GROQ:
-    from groq import Groq
-    client = Groq(api_key=GROQ_API_KEY)
-    print("🚀 Using Groq API (llama-3.3-70b-versatile)")
-elif USE_GEMINI:
-    import google.generativeai as genai
-    genai.configure(api_key=GEMINI_API_KEY)
-    print("🚀 Using Gemini API")
-else:
-    if not MOCK_MODE:
+GROQ_MODEL = "llama-3.3-70b-versatile"
+GROQ_TEMPERATURE = 0.7
+GROQ_MAX_TOKENS = 2048
+GEMINI_MODEL = "gemini-2.0-flash"
+
+# Connection pool shared by every async LLM call (keep-alive across requests)
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "100"))
+LLM_MAX_KEEPALIVE = int(os.getenv("LLM_MAX_KEEPALIVE", "20"))
+
+# Callers queue on each backend's limiter; throttled requests are retried
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))
+LLM_QUEUE_TIMEOUT = float(os.getenv("LLM_QUEUE_TIMEOUT", "120"))
+
+# Hedging: duplicate a request to another backend once it runs past the
+# HEDGE_PERCENTILE of recent latency for its mode (opt-in)
+HEDGE_REQUESTS = os.getenv("LLM_HEDGE", "false").lower() == "true"
+HEDGE_PERCENTILE = float(os.getenv("LLM_HEDGE_PERCENTILE", "95"))
+HEDGE_MIN_SAMPLES = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+
+def _build_provider_pool():
+    """Every configured Groq key plus Gemini; built on the first LLM call, not at import."""
+    pool = build_pool_from_env()
+    if pool.backends:
+        for kind in pool.kinds():
+            count = sum(1 for b in pool.backends if b.kind == kind)
+            model = GROQ_MODEL if kind == "groq" else GEMINI_MODEL
+            print(f"🚀 Using {kind.title()} API ({model}) with {count} key(s)")
+    elif not MOCK_MODE:
         print("⚠️ No API key found! Set GROQ_API_KEY or GEMINI_API_KEY in .env, or enable MOCK_MODE=true")
+    return pool
+
+# Requests are balanced and fail over between backends
+provider_pool = LazyPool(_build_provider_pool)
+
+def __getattr__(name):
+    """USE_GROQ / USE_GEMINI: which provider is primary, read from the pool when asked."""
+    if name == "USE_GROQ":
+        return "groq" in provider_pool.kinds()
+    if name == "USE_GEMINI":
+        return "gemini" in provider_pool.kinds() and "groq" not in provider_pool.kinds()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # Track rate limit state
 _rate_limited = False
+_thread_state = threading.local()  # Per-thread fallback count, see fallback_count()
+
+# Coalesces concurrent identical provider calls
+_inflight = SingleFlight()
+
+# Recent successful call latencies per mode, used to time hedges
+latency = RollingHistogram()
+_hedge_executor = ThreadPoolExecutor(max_workers=32, thread_name_prefix="llm-hedge")
+_hedge_stats = {"fired": 0, "won": 0}
+_hedge_lock = threading.Lock()
+
+_http_client = None
+
+def get_async_http_client():
+    """Lazily build the pooled httpx connection shared by all async Groq clients."""
+    global _http_client
+    if _http_client is None:
+        import httpx
+        _http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=LLM_MAX_CONNECTIONS,
+                max_keepalive_connections=LLM_MAX_KEEPALIVE,
+            ),
+            timeout=httpx.Timeout(60.0, connect=10.0),
+        )
+    return _http_client
+
+async def close_async_clients():
+    """Close the pooled HTTP connection (called on app shutdown)."""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+    _http_client = None
+    for backend in provider_pool.backends:
+        backend.reset_async_client()
 
 def is_rate_limited():
     """Check if currently rate limited."""
@@ -184,114 +275,239 @@ if __name__ == "__main__":
     
     return {"response": idea}
 
-def groq_request(idea: str, mode: str):
-    """Use Groq API (llama-3.3-70b-versatile)."""
-    try:
-        if mode == "plan":
-            prompt = f"""You are an AI software architect. Create a structured project plan for this idea: {idea}
+def build_groq_prompt(idea: str, mode: str) -> str:
+    """Build the Groq prompt for a mode."""
+    if mode == "plan":
+        return f"""You are an AI software architect. Create a structured project plan for this idea: {idea}
 
 Return ONLY valid JSON with this structure:
 {{"phases": [{{"name": "Phase 1: ...", "tasks": ["task1", "task2"]}}]}}"""
 
-        elif mode == "optimize":
-            prompt = f"""You are an expert Prompt Engineer. Rewrite this idea into a detailed, professional software development prompt.
+    elif mode == "optimize":
+        return f"""You are an expert Prompt Engineer. Rewrite this idea into a detailed, professional software development prompt.
 Focus on: Modern UI (glassmorphism/dark mode), clean architecture, and best practices.
 Keep it strictly as a prompt for an AI coder.
 
 Idea: {idea}
 
 Return ONLY the optimized prompt text."""
-        elif mode == "code":
-            prompt = f"""You are an expert developer. Generate clean, working code for: {idea}
+    elif mode == "code":
+        return f"""You are an expert developer. Generate clean, working code for: {idea}
 
 Return ONLY the code, no markdown or explanations."""
-        elif mode == "review":
-            prompt = f"""You are an expert code reviewer. Review this code and return JSON:
+    elif mode == "review":
+        return f"""You are an expert code reviewer. Review this code and return JSON:
 {{"issues": ["issue1"], "summary": "Brief summary"}}
 
 Code to review:
 {idea}"""
-        else:
-            prompt = f"Help with: {idea}"
+    return f"Help with: {idea}"
+
+def parse_groq_content(content: str, mode: str) -> dict:
+    """Turn raw completion text into the agent's result dict."""
+    # Try to parse as JSON for plan/review modes
+    if mode in ["plan", "review"]:
+        import json
+        try:
+            # Find JSON in response
+            start = content.find('{')
+            end = content.rfind('}') + 1
+            if start >= 0 and end > start:
+                return json.loads(content[start:end])
+        except:
+            pass
+    
+    if mode == "code":
+        # Clean markdown if present
+        if "```" in content:
+            lines = content.split("\n")
+            code_lines = []
+            in_code = False
+            for line in lines:
+                if line.startswith("```"):
+                    in_code = not in_code
+                    continue
+                if in_code:
+                    code_lines.append(line)
+            return {"code": "\n".join(code_lines) if code_lines else content}
+        return {"code": content}
+    
+    return {"response": content}
+
+def groq_usage_tokens(response):
+    """Total tokens billed for a completion, if the SDK reported it."""
+    usage = getattr(response, "usage", None)
+    return getattr(usage, "total_tokens", None)
+
+def note_usage(backend, waited: float, prompt: str, text: str, prompt_tokens=None, completion_tokens=None):
+    """Record a finished attempt for tracing, estimating tokens the provider didn't report."""
+    estimated = prompt_tokens is None or completion_tokens is None
+    if estimated:
+        prompt_tokens, completion_tokens = estimate_tokens(prompt), estimate_tokens(text or "")
+    note_attempt(backend.name, waited, prompt_tokens, completion_tokens, estimated=estimated)
+
+def groq_usage_split(usage):
+    """(prompt_tokens, completion_tokens) from a Groq usage object, or Nones."""
+    return getattr(usage, "prompt_tokens", None), getattr(usage, "completion_tokens", None)
 
-        response = client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
+def gemini_usage_split(response):
+    """(prompt_tokens, completion_tokens) from Gemini usage metadata, or Nones."""
+    usage = getattr(response, "usage_metadata", None)
+    return getattr(usage, "prompt_token_count", None), getattr(usage, "candidates_token_count", None)
+
+def groq_request(backend, idea: str, mode: str):
+    """Call Groq with one key. Raises on failure so the pool can fail over."""
+    prompt = build_groq_prompt(idea, mode)
+    reserved = estimate_tokens(prompt, GROQ_MAX_TOKENS)
+    waited = backend.limiter.acquire(reserved, timeout=LLM_QUEUE_TIMEOUT)
+    try:
+        response = backend.get_client().chat.completions.create(
+            model=GROQ_MODEL,
             messages=[{"role": "user", "content": prompt}],
-            temperature=0.7,
-            max_tokens=2048
+            temperature=GROQ_TEMPERATURE,
+            max_tokens=GROQ_MAX_TOKENS
         )
-        
-        content = response.choices[0].message.content
-        
-        # Try to parse as JSON for plan/review modes
-        if mode in ["plan", "review"]:
-            import json
-            try:
-                # Find JSON in response
-                start = content.find('{')
-                end = content.rfind('}') + 1
-                if start >= 0 and end > start:
-                    return json.loads(content[start:end])
-            except:
-                pass
-        
-        if mode == "code":
-            # Clean markdown if present
-            if "```" in content:
-                lines = content.split("\n")
-                code_lines = []
-                in_code = False
-                for line in lines:
-                    if line.startswith("```"):
-                        in_code = not in_code
-                        continue
-                    if in_code:
-                        code_lines.append(line)
-                return {"code": "\n".join(code_lines) if code_lines else content}
-            return {"code": content}
-        
-        return {"response": content}
-        
     except Exception as e:
-        print(f"Groq API error: {e}")
-        log_agent_error(f"Groq Error: {e}")
-        result = mock_response(idea, mode, error_msg=str(e))
-        result["_mock_fallback"] = True  # Flag for rate limit tracking
-        return result
+        backend.limiter.release(reserved, throttled=is_rate_limit_error(e), retry_after=retry_after_seconds(e))
+        note_attempt(backend.name, waited, error=True)
+        raise
+    backend.limiter.release(reserved, used=groq_usage_tokens(response))
+    content = response.choices[0].message.content
+    note_usage(backend, waited, prompt, content, *groq_usage_split(getattr(response, "usage", None)))
+    return parse_groq_content(content, mode)
 
-def gemini_request(idea: str, mode: str):
-    """Use Gemini API with fallback to mock on 429."""
+async def groq_request_async(backend, idea: str, mode: str):
+    """Async Groq call over the shared pooled HTTP connection."""
+    prompt = build_groq_prompt(idea, mode)
+    reserved = estimate_tokens(prompt, GROQ_MAX_TOKENS)
+    waited = await backend.limiter.acquire_async(reserved, timeout=LLM_QUEUE_TIMEOUT)
     try:
-        model = genai.GenerativeModel("gemini-2.0-flash")
-        
-        if mode == "plan":
-            prompt = f"You are an AI software architect. Create a structured project plan (JSON) for: {idea}. Return ONLY valid JSON with 'phases' list."
-        elif mode == "optimize":
-            prompt = f"Rewrite this into a detailed developer prompt for an AI: {idea}. Focus on modern UI and best practices. Return ONLY the rewritten prompt."
-        elif mode == "code":
-            prompt = f"You are an expert developer. Generate code for: {idea}. Return ONLY the code."
-        elif mode == "review":
-            prompt = f"Review this code and return JSON with 'issues' and 'summary': {idea}"
-        else:
-            prompt = f"Help with: {idea}"
+        response = await backend.get_async_client(get_async_http_client()).chat.completions.create(
+            model=GROQ_MODEL,
+            messages=[{"role": "user", "content": prompt}],
+            temperature=GROQ_TEMPERATURE,
+            max_tokens=GROQ_MAX_TOKENS
+        )
+    except Exception as e:
+        backend.limiter.release(reserved, throttled=is_rate_limit_error(e), retry_after=retry_after_seconds(e))
+        note_attempt(backend.name, waited, error=True)
+        raise
+    backend.limiter.release(reserved, used=groq_usage_tokens(response))
+    content = response.choices[0].message.content
+    note_usage(backend, waited, prompt, content, *groq_usage_split(getattr(response, "usage", None)))
+    return parse_groq_content(content, mode)
 
+def build_gemini_prompt(idea: str, mode: str) -> str:
+    """Build the Gemini prompt for a mode."""
+    if mode == "plan":
+        return f"You are an AI software architect. Create a structured project plan (JSON) for: {idea}. Return ONLY valid JSON with 'phases' list."
+    elif mode == "optimize":
+        return f"Rewrite this into a detailed developer prompt for an AI: {idea}. Focus on modern UI and best practices. Return ONLY the rewritten prompt."
+    elif mode == "code":
+        return f"You are an expert developer. Generate code for: {idea}. Return ONLY the code."
+    elif mode == "review":
+        return f"Review this code and return JSON with 'issues' and 'summary': {idea}"
+    return f"Help with: {idea}"
+
+def gemini_request(backend, idea: str, mode: str):
+    """Call Gemini. Raises on failure so the pool can fail over."""
+    prompt = build_gemini_prompt(idea, mode)
+    waited = backend.limiter.acquire(estimate_tokens(prompt), timeout=LLM_QUEUE_TIMEOUT)
+    try:
+        model = backend.get_client().GenerativeModel(GEMINI_MODEL)
         response = model.generate_content(prompt)
-        return {"response": response.text}
-        
     except Exception as e:
-        if "429" in str(e):
-            print(f"Gemini quota exceeded, using mock: {e}")
-            return mock_response(idea, mode, error_msg="Gemini 429: Rate Limited")
-        log_agent_error(f"Gemini Error: {e}")
-        return {"error": str(e)}
+        backend.limiter.release(throttled=is_rate_limit_error(e))
+        note_attempt(backend.name, waited, error=True)
+        raise
+    backend.limiter.release()
+    note_usage(backend, waited, prompt, response.text, *gemini_usage_split(response))
+    return {"response": response.text}
 
-def run_agent(idea: str, mode: str = "plan"):
-    """
-    Main agent function - routes to appropriate AI provider.
-    Returns response with rate_limited flag when applicable.
-    """
-    global _rate_limited
-    
+async def gemini_request_async(backend, idea: str, mode: str):
+    """Async Gemini call."""
+    prompt = build_gemini_prompt(idea, mode)
+    waited = await backend.limiter.acquire_async(estimate_tokens(prompt), timeout=LLM_QUEUE_TIMEOUT)
+    try:
+        model = backend.get_client().GenerativeModel(GEMINI_MODEL)
+        response = await model.generate_content_async(prompt)
+    except Exception as e:
+        backend.limiter.release(throttled=is_rate_limit_error(e))
+        note_attempt(backend.name, waited, error=True)
+        raise
+    backend.limiter.release()
+    note_usage(backend, waited, prompt, response.text, *gemini_usage_split(response))
+    return {"response": response.text}
+
+def groq_stream(backend, idea: str, mode: str, on_delta):
+    """Streaming Groq call: on_delta gets each chunk of text as it arrives."""
+    prompt = build_groq_prompt(idea, mode)
+    reserved = estimate_tokens(prompt, GROQ_MAX_TOKENS)
+    waited = backend.limiter.acquire(reserved, timeout=LLM_QUEUE_TIMEOUT)
+    parts, usage = [], None
+    try:
+        stream = backend.get_client().chat.completions.create(
+            model=GROQ_MODEL,
+            messages=[{"role": "user", "content": prompt}],
+            temperature=GROQ_TEMPERATURE,
+            max_tokens=GROQ_MAX_TOKENS,
+            stream=True
+        )
+        for chunk in stream:
+            text = chunk.choices[0].delta.content if chunk.choices else None
+            if text:
+                parts.append(text)
+                on_delta(text)
+            # Groq reports usage on the final chunk
+            usage = getattr(getattr(chunk, "x_groq", None), "usage", None) or usage
+    except Exception as e:
+        backend.limiter.release(reserved, throttled=is_rate_limit_error(e), retry_after=retry_after_seconds(e))
+        note_attempt(backend.name, waited, error=True)
+        raise
+    backend.limiter.release(reserved, used=getattr(usage, "total_tokens", None))
+    content = "".join(parts)
+    note_usage(backend, waited, prompt, content, *groq_usage_split(usage))
+    return parse_groq_content(content, mode)
+
+def gemini_stream(backend, idea: str, mode: str, on_delta):
+    """Streaming Gemini call."""
+    prompt = build_gemini_prompt(idea, mode)
+    waited = backend.limiter.acquire(estimate_tokens(prompt), timeout=LLM_QUEUE_TIMEOUT)
+    parts, last = [], None
+    try:
+        model = backend.get_client().GenerativeModel(GEMINI_MODEL)
+        for chunk in model.generate_content(prompt, stream=True):
+            last = chunk  # Usage metadata on the last chunk covers the whole response
+            if chunk.text:
+                parts.append(chunk.text)
+                on_delta(chunk.text)
+    except Exception as e:
+        backend.limiter.release(throttled=is_rate_limit_error(e))
+        note_attempt(backend.name, waited, error=True)
+        raise
+    backend.limiter.release()
+    content = "".join(parts)
+    note_usage(backend, waited, prompt, content, *gemini_usage_split(last))
+    return {"response": content}
+
+def provider_fallback(idea: str, mode: str, error) -> dict:
+    """Mock result used when no backend could answer."""
+    print(f"LLM provider error: {error}")
+    log_agent_error(f"Provider Error: {error}")
+    if is_rate_limit_error(error):
+        result = mock_response(idea, mode, error_msg="429: Rate Limited")
+    else:
+        result = mock_response(idea, mode, error_msg=str(error))
+    result["_mock_fallback"] = True  # Flag for rate limit tracking
+    LLM_FALLBACKS.inc(mode=mode)
+    return result
+
+def fallback_count() -> int:
+    """How many calls made on this thread fell back to mock output."""
+    return getattr(_thread_state, "fallbacks", 0)
+
+def preloaded_response(idea: str, mode: str):
+    """Return the preloaded demo result for this prompt, or None."""
     # CHECK FOR PRELOADED DEMOS (Hackathon Mode)
     from .preloaded import get_preloaded_project
     preloaded = get_preloaded_project(idea)
@@ -318,21 +534,400 @@ def run_agent(idea: str, mode: str = "plan"):
             
             if code_content:
                  return {"code": code_content}
-    
-    if MOCK_MODE:
+    return None
+
+def track_rate_limit(result: dict) -> dict:
+    """Update the rate limit flag from a provider result."""
+    global _rate_limited
+    # Check if it fell back to mock (rate limited)
+    if result.get("_mock_fallback"):
+        _rate_limited = True
+        _thread_state.fallbacks = fallback_count() + 1
+        del result["_mock_fallback"]
+    else:
         _rate_limited = False
-        return mock_response(idea, mode)
+    return result
+
+def response_cache_key(kind: str, idea: str, mode: str) -> str:
+    """Cache key for a request to one provider kind."""
+    if kind == "groq":
+        return cache_key("groq", GROQ_MODEL, mode, build_groq_prompt(idea, mode), GROQ_TEMPERATURE)
+    return cache_key("gemini", GEMINI_MODEL, mode, build_gemini_prompt(idea, mode), None)
+
+def is_cacheable(result: dict) -> bool:
+    """Only real provider answers are cached, never fallbacks or errors."""
+    return not result.get("_mock_fallback") and "error" not in result
+
+def pool_request(idea: str, mode: str, store: bool, exclude=(), picked: list = None, cancelled=None, call=None) -> dict:
+    """
+    Send one request through the provider pool.
+    Fails over to the next backend on errors; if every backend is
+    throttled, queues on them again up to LLM_MAX_RETRIES times.
+    picked collects the backends tried; cancelled (an Event) stops failover;
+    call(backend) replaces the default blocking request (used for streaming).
+    """
+    failed, throttled = set(exclude), set()
+    retries = LLM_MAX_RETRIES
+    last_error = "No healthy provider available"
     
-    if USE_GROQ:
-        result = groq_request(idea, mode)
-        # Check if it fell back to mock (rate limited)
-        if result.get("_mock_fallback"):
-            _rate_limited = True
-            del result["_mock_fallback"]
-        else:
+    while not (cancelled and cancelled.is_set()):
+        backend = provider_pool.pick(exclude=failed | throttled)
+        if backend is None:
+            if throttled and retries > 0:
+                retries -= 1
+                throttled.clear()
+                continue
+            break
+        if picked is not None:
+            picked.append(backend.name)
+        
+        started = time.monotonic()
+        try:
+            if call is not None:
+                result = call(backend)
+            elif backend.kind == "groq":
+                result = groq_request(backend, idea, mode)
+            else:
+                result = gemini_request(backend, idea, mode)
+        except QueueTimeout as e:
+            last_error = e
+            provider_pool.record_failure(backend, counts_as_error=False)
+            LLM_REQUESTS.inc(provider=backend.name, mode=mode, outcome="timeout")
+            failed.add(backend.name)
+            continue
+        except Exception as e:
+            last_error = e
+            is_429 = is_rate_limit_error(e)
+            provider_pool.record_failure(backend, counts_as_error=not is_429)
+            LLM_REQUESTS.inc(provider=backend.name, mode=mode, outcome="throttled" if is_429 else "error")
+            (throttled if is_429 else failed).add(backend.name)
+            print(f"⚠️ {backend.name} failed, failing over: {e}")
+            continue
+        
+        elapsed = time.monotonic() - started
+        provider_pool.record_success(backend)
+        latency.record(mode, elapsed)
+        LLM_REQUESTS.inc(provider=backend.name, mode=mode, outcome="ok")
+        LLM_LATENCY.observe(elapsed, provider=backend.name, mode=mode)
+        if store and is_cacheable(result):
+            put_cached(response_cache_key(backend.kind, idea, mode), result)
+        return result
+    
+    return provider_fallback(idea, mode, last_error)
+
+async def pool_request_async(idea: str, mode: str, store: bool, exclude=(), picked: list = None) -> dict:
+    """Async pool_request."""
+    failed, throttled = set(exclude), set()
+    retries = LLM_MAX_RETRIES
+    last_error = "No healthy provider available"
+    
+    while True:
+        backend = provider_pool.pick(exclude=failed | throttled)
+        if backend is None:
+            if throttled and retries > 0:
+                retries -= 1
+                throttled.clear()
+                continue
+            break
+        if picked is not None:
+            picked.append(backend.name)
+        
+        started = time.monotonic()
+        try:
+            if backend.kind == "groq":
+                result = await groq_request_async(backend, idea, mode)
+            else:
+                result = await gemini_request_async(backend, idea, mode)
+        except QueueTimeout as e:
+            last_error = e
+            provider_pool.record_failure(backend, counts_as_error=False)
+            LLM_REQUESTS.inc(provider=backend.name, mode=mode, outcome="timeout")
+            failed.add(backend.name)
+            continue
+        except asyncio.CancelledError:
+            provider_pool.record_failure(backend, counts_as_error=False)
+            raise
+        except Exception as e:
+            last_error = e
+            is_429 = is_rate_limit_error(e)
+            provider_pool.record_failure(backend, counts_as_error=not is_429)
+            LLM_REQUESTS.inc(provider=backend.name, mode=mode, outcome="throttled" if is_429 else "error")
+            (throttled if is_429 else failed).add(backend.name)
+            print(f"⚠️ {backend.name} failed, failing over: {e}")
+            continue
+        
+        elapsed = time.monotonic() - started
+        provider_pool.record_success(backend)
+        latency.record(mode, elapsed)
+        LLM_REQUESTS.inc(provider=backend.name, mode=mode, outcome="ok")
+        LLM_LATENCY.observe(elapsed, provider=backend.name, mode=mode)
+        if store and is_cacheable(result):
+            put_cached(response_cache_key(backend.kind, idea, mode), result)
+        return result
+    
+    return provider_fallback(idea, mode, last_error)
+
+def count_hedge(outcome: str):
+    with _hedge_lock:
+        _hedge_stats[outcome] += 1
+
+def hedge_delay(mode: str):
+    """Seconds to wait before hedging, or None if hedging can't help yet."""
+    if len(provider_pool.backends) < 2:
+        return None
+    return latency.percentile(mode, HEDGE_PERCENTILE, min_samples=HEDGE_MIN_SAMPLES)
+
+def hedged_request(idea: str, mode: str, store: bool) -> dict:
+    """
+    Run pool_request; if it is still pending after the hedge delay, send a
+    duplicate to a different backend and return whichever answers first.
+    A thread can't abort an in-flight HTTP call, so the loser is told to
+    stop failing over and its result is discarded.
+    """
+    delay = hedge_delay(mode)
+    if delay is None:
+        return pool_request(idea, mode, store)
+    
+    picked, cancel_primary, cancel_hedge = [], threading.Event(), threading.Event()
+    running = threading.Event()
+    
+    def run_primary():
+        running.set()
+        return pool_request(idea, mode, store, picked=picked, cancelled=cancel_primary)
+    
+    # Worker threads don't inherit context vars; copy them so attempts are traced to this call
+    primary = _hedge_executor.submit(contextvars.copy_context().run, run_primary)
+    running.wait()  # Time queued for a hedge worker is ours, not the provider's
+    done, _ = wait([primary], timeout=delay)
+    if done:
+        return primary.result()
+    
+    count_hedge("fired")
+    hedge = _hedge_executor.submit(contextvars.copy_context().run, pool_request, idea, mode, store, exclude=set(picked), cancelled=cancel_hedge)
+    pending = {primary: cancel_primary, hedge: cancel_hedge}
+    result = None
+    while pending:
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            del pending[future]
+            result = future.result()
+            if not result.get("_mock_fallback"):
+                if future is hedge:
+                    count_hedge("won")
+                for loser, cancel in pending.items():
+                    cancel.set()
+                    loser.cancel()
+                return result
+    return result  # Both fell back; return the last fallback
+
+async def hedged_request_async(idea: str, mode: str, store: bool) -> dict:
+    """Async hedged_request; the losing task is cancelled outright."""
+    delay = hedge_delay(mode)
+    if delay is None:
+        return await pool_request_async(idea, mode, store)
+    
+    picked = []
+    primary = asyncio.ensure_future(pool_request_async(idea, mode, store, picked=picked))
+    done, _ = await asyncio.wait([primary], timeout=delay)
+    if done:
+        return primary.result()
+    
+    count_hedge("fired")
+    hedge = asyncio.ensure_future(pool_request_async(idea, mode, store, exclude=set(picked)))
+    pending = {primary, hedge}
+    result = None
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                result = task.result()
+                if not result.get("_mock_fallback"):
+                    if task is hedge:
+                        count_hedge("won")
+                    return result
+        return result
+    finally:
+        for task in pending:
+            task.cancel()
+
+def get_hedge_stats() -> dict:
+    """Hedging counters and recent latency percentiles for /status."""
+    with _hedge_lock:
+        counts = dict(_hedge_stats)
+    return {
+        "enabled": HEDGE_REQUESTS,
+        "percentile": HEDGE_PERCENTILE,
+        **counts,
+        "latency": latency.snapshot(),
+    }
+
+Collected("autogenesis_llm_rate_limited", "1 while the last provider call fell back to mock output.", lambda: int(_rate_limited))
+Collected("autogenesis_provider_outstanding", "Requests in flight per provider backend.",
+          lambda: {(b.name,): b.outstanding for b in provider_pool.backends}, labels=("provider",))
+
+def lookup_cached(idea: str, mode: str):
+    """Cached answer from any provider kind in the pool, or None."""
+    keys = [response_cache_key(kind, idea, mode) for kind in provider_pool.kinds()]
+    return get_cached_any(keys)
+
+def traced_result(call: dict, result: dict, idea: str, mode: str, started: float) -> dict:
+    """
+    Mark a provider result as a mock fallback in the trace, update rate limit
+    state and add real provider answers to the cassette being recorded.
+    """
+    if result.get("_mock_fallback"):
+        call["source"] = "fallback"
+    result = track_rate_limit(result)
+    if call["source"] == "provider" and call["attempts"] and cassette.recording():  # Not coalesced followers
+        cassette.record(idea, mode, result, time.monotonic() - started, call)
+    return result
+
+def run_agent(idea: str, mode: str = "plan", use_cache: bool = True, hedge: bool = None):
+    """
+    Main agent function - routes to appropriate AI provider.
+    Returns response with rate_limited flag when applicable.
+    Set use_cache=False to bypass the response cache and hedge=True to
+    hedge slow requests (defaults to LLM_HEDGE).
+    """
+    global _rate_limited
+    
+    started = time.monotonic()
+    with llm_call(mode) as call:
+        preloaded = preloaded_response(idea, mode)
+        if preloaded is not None:
+            call["source"] = "preloaded"
+            return preloaded
+        
+        replayed = cassette.replay(idea, mode)
+        if replayed is not None:
+            call["source"] = "replay"
+            return replayed
+        
+        if MOCK_MODE or not provider_pool.backends:
             _rate_limited = False
+            call["source"] = "mock"
+            return mock_response(idea, mode)
+        
+        # While recording, every call goes to a provider so its timing is real
+        use_cache = use_cache and CACHE_ENABLED and not cassette.recording()
+        if use_cache:
+            cached = lookup_cached(idea, mode)
+            if cached is not None:
+                call["source"] = "cache"
+                return cached
+        
+        # Identical prompts already in flight share that provider call
+        key = cache_key("pool", "", mode, idea, None)
+        request = hedged_request if (HEDGE_REQUESTS if hedge is None else hedge) else pool_request
+        result = _inflight.do(key, lambda: request(idea, mode, use_cache))
+        return traced_result(call, result, idea, mode, started)
+
+def run_agent_stream(idea: str, mode: str = "code", on_delta=None, use_cache: bool = True):
+    """
+    run_agent with a streaming completion: on_delta(text, reset=False) is
+    called for each chunk. reset=True means a backend failed mid-stream and
+    the text so far should be discarded. Preloaded, mock and cached answers
+    arrive as a single chunk. Identical calls already in flight are joined
+    like in run_agent; a caller that joins gets the answer as one chunk when
+    it completes. Streamed calls are not hedged.
+    """
+    global _rate_limited
+    
+    if on_delta is None:
+        return run_agent(idea, mode, use_cache)
+    
+    def emit_whole(result):
+        text = result.get("code") or result.get("response")
+        if isinstance(text, str) and text:
+            on_delta(text)
         return result
-    elif USE_GEMINI:
-        return gemini_request(idea, mode)
-    else:
-        return mock_response(idea, mode)
+    
+    started = time.monotonic()
+    with llm_call(mode) as call:
+        preloaded = preloaded_response(idea, mode)
+        if preloaded is not None:
+            call["source"] = "preloaded"
+            return emit_whole(preloaded)
+        
+        replayed = cassette.replay(idea, mode, on_delta)
+        if replayed is not None:
+            call["source"] = "replay"
+            return replayed
+        
+        if MOCK_MODE or not provider_pool.backends:
+            _rate_limited = False
+            call["source"] = "mock"
+            return emit_whole(mock_response(idea, mode))
+        
+        use_cache = use_cache and CACHE_ENABLED and not cassette.recording()
+        if use_cache:
+            cached = lookup_cached(idea, mode)
+            if cached is not None:
+                call["source"] = "cache"
+                return emit_whole(cached)
+        
+        emitted = [False]
+        
+        def forward(text):
+            emitted[0] = True
+            on_delta(text)
+        
+        def stream_call(backend):
+            if emitted[0]:
+                on_delta("", reset=True)  # Failing over after a partial stream
+                emitted[0] = False
+            stream = groq_stream if backend.kind == "groq" else gemini_stream
+            return stream(backend, idea, mode, forward)
+        
+        led = [False]
+        
+        def lead():
+            led[0] = True
+            return pool_request(idea, mode, use_cache, call=stream_call)
+        
+        # Shares the key with run_agent, so streamed and plain calls coalesce
+        key = cache_key("pool", "", mode, idea, None)
+        result = _inflight.do(key, lead)
+        if not led[0]:
+            emit_whole(result)  # Joined another caller's request; its chunks went to that caller
+        elif result.get("_mock_fallback"):
+            if emitted[0]:
+                on_delta("", reset=True)
+            emit_whole(result)
+        return traced_result(call, result, idea, mode, started)
+
+async def run_agent_async(idea: str, mode: str = "plan", use_cache: bool = True, hedge: bool = None):
+    """
+    Async version of run_agent for use inside FastAPI handlers.
+    Awaits the provider instead of blocking the event loop.
+    """
+    global _rate_limited
+    
+    started = time.monotonic()
+    with llm_call(mode) as call:
+        preloaded = preloaded_response(idea, mode)
+        if preloaded is not None:
+            call["source"] = "preloaded"
+            return preloaded
+        
+        replayed = await cassette.replay_async(idea, mode)
+        if replayed is not None:
+            call["source"] = "replay"
+            return replayed
+        
+        if MOCK_MODE or not provider_pool.backends:
+            _rate_limited = False
+            call["source"] = "mock"
+            return mock_response(idea, mode)
+        
+        use_cache = use_cache and CACHE_ENABLED and not cassette.recording()
+        if use_cache:
+            cached = lookup_cached(idea, mode)
+            if cached is not None:
+                call["source"] = "cache"
+                return cached
+        
+        key = cache_key("pool", "", mode, idea, None)
+        request = hedged_request_async if (HEDGE_REQUESTS if hedge is None else hedge) else pool_request_async
+        result = await _inflight.do_async(key, lambda: request(idea, mode, use_cache))
+        return traced_result(call, result, idea, mode, started)
@@ -0,0 +1,82 @@
+"""
+Blob Store - Content-addressed storage for generated file bodies.
+Each distinct file is stored once under storage/blobs/<aa>/<sha256>,
+compressed with gzip (or zstd when the zstandard package is installed).
+"""
+import gzip
+import hashlib
+import os
+import threading
+from importlib.util import find_spec
+from pathlib import Path
+
+ZSTD_AVAILABLE = find_spec("zstandard") is not None  # Imported on first use: it is slow to load
+
+BLOB_DIR = Path("storage/blobs")
+BLOB_COMPRESSION = os.getenv("BLOB_COMPRESSION", "zstd" if ZSTD_AVAILABLE else "gzip").lower()
+
+
+def _zstd_compress(data: bytes) -> bytes:
+    import zstandard
+    return zstandard.ZstdCompressor(level=10).compress(data)
+
+
+def _zstd_decompress(data: bytes) -> bytes:
+    import zstandard
+    return zstandard.ZstdDecompressor().decompress(data)
+
+
+# Extension -> (compress, decompress)
+_CODECS = {
+    ".gz": (lambda data: gzip.compress(data, compresslevel=6), gzip.decompress),
+    ".raw": (lambda data: data, lambda data: data),
+}
+if ZSTD_AVAILABLE:
+    _CODECS[".zst"] = (_zstd_compress, _zstd_decompress)
+
+_WRITE_EXTENSION = {"gzip": ".gz", "zstd": ".zst", "none": ".raw"}.get(BLOB_COMPRESSION, ".gz")
+if _WRITE_EXTENSION not in _CODECS:
+    print("⚠️  zstandard not installed, storing blobs with gzip")
+    _WRITE_EXTENSION = ".gz"
+
+
+def blob_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _blob_path(digest: str, extension: str) -> Path:
+    return BLOB_DIR / digest[:2] / f"{digest}{extension}"
+
+
+def put_blob(text: str) -> str:
+    """Store text once and return its hash. Re-storing identical text is free."""
+    digest = blob_hash(text)
+    if any(_blob_path(digest, ext).exists() for ext in _CODECS):
+        return digest
+
+    path = _blob_path(digest, _WRITE_EXTENSION)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Unique per thread: concurrent builds often store the same file at once
+    tmp = path.with_suffix(f".{os.getpid()}-{threading.get_ident()}.tmp")
+    tmp.write_bytes(_CODECS[_WRITE_EXTENSION][0](text.encode("utf-8")))
+    os.replace(tmp, path)
+    return digest
+
+
+def get_blob(digest: str):
+    """Text stored under the hash, or None if it is missing."""
+    for extension, (_, decompress) in _CODECS.items():
+        try:
+            data = _blob_path(digest, extension).read_bytes()
+        except FileNotFoundError:
+            continue
+        return decompress(data).decode("utf-8")
+    return None
+
+
+def clear_blobs():
+    """Delete every stored blob."""
+    if not BLOB_DIR.exists():
+        return
+    for path in BLOB_DIR.glob("*/*"):
+        path.unlink(missing_ok=True)
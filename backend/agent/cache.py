@@ -0,0 +1,180 @@
+"""
+LLM Response Cache - Content-addressed cache for provider responses.
+Two tiers: an in-process LRU and JSON files under storage/llm_cache/.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+from .metrics import Collected
+
+CACHE_DIR = Path("storage/llm_cache")
+CACHE_ENABLED = os.getenv("LLM_CACHE", "true").lower() == "true"
+CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 3600)))  # seconds
+CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "256"))  # memory tier
+CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_MB", "100")) * 1024 * 1024  # disk tier
+
+_lock = threading.Lock()
+_memory = OrderedDict()  # key -> (created, value)
+_disk_bytes = None  # Lazily measured on first disk write
+_stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+
+def cache_key(provider: str, model: str, mode: str, prompt: str, temperature) -> str:
+    """Hash of everything that determines a provider's response."""
+    payload = json.dumps([provider, model, mode, prompt, temperature])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def _disk_path(key: str) -> Path:
+    return CACHE_DIR / key[:2] / f"{key}.json"
+
+def _expired(created: float) -> bool:
+    return time.time() - created > CACHE_TTL
+
+def get_cached(key: str, count_miss: bool = True):
+    """Return a cached response (a copy) or None."""
+    with _lock:
+        entry = _memory.get(key)
+        if entry and not _expired(entry[0]):
+            _memory.move_to_end(key)
+            _stats["memory_hits"] += 1
+            return json.loads(entry[1])
+        if entry:
+            del _memory[key]
+
+    path = _disk_path(key)
+    try:
+        record = json.loads(path.read_text())
+    except (OSError, ValueError):
+        record = None
+
+    with _lock:
+        if record is None or _expired(record["created"]):
+            if count_miss:
+                _stats["misses"] += 1
+            return None
+        _stats["disk_hits"] += 1
+        _remember(key, record["created"], json.dumps(record["value"]))
+    return record["value"]
+
+def get_cached_any(keys: list):
+    """First hit among several keys, counted as a single lookup."""
+    for i, key in enumerate(keys):
+        value = get_cached(key, count_miss=(i == len(keys) - 1))
+        if value is not None:
+            return value
+    return None
+
+def put_cached(key: str, value: dict):
+    """Store a response in both tiers."""
+    global _disk_bytes
+    created = time.time()
+    serialized = json.dumps(value)
+
+    with _lock:
+        _remember(key, created, serialized)
+        _stats["writes"] += 1
+
+    path = _disk_path(key)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = json.dumps({"created": created, "value": value})
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(data)
+        os.replace(tmp, path)
+    except OSError:
+        return
+
+    with _lock:
+        if _disk_bytes is None:
+            _disk_bytes = _measure_disk()
+        else:
+            _disk_bytes += len(data)
+        over_limit = _disk_bytes > CACHE_MAX_BYTES
+    if over_limit:
+        _evict_disk()
+
+def _remember(key: str, created: float, serialized: str):
+    """Insert into the memory tier, evicting least recently used entries."""
+    _memory[key] = (created, serialized)
+    _memory.move_to_end(key)
+    while len(_memory) > CACHE_MAX_ENTRIES:
+        _memory.popitem(last=False)
+        _stats["evictions"] += 1
+
+def _disk_entries():
+    if not CACHE_DIR.exists():
+        return []
+    return list(CACHE_DIR.glob("*/*.json"))
+
+def _measure_disk() -> int:
+    total = 0
+    for path in _disk_entries():
+        try:
+            total += path.stat().st_size
+        except OSError:
+            pass
+    return total
+
+def _evict_disk():
+    """Drop expired entries, then oldest entries until under the size limit."""
+    global _disk_bytes
+    entries = []
+    for path in _disk_entries():
+        try:
+            stat = path.stat()
+            entries.append((stat.st_mtime, stat.st_size, path))
+        except OSError:
+            pass
+    entries.sort()
+
+    total = sum(size for _, size, _ in entries)
+    target = CACHE_MAX_BYTES * 0.9  # Leave headroom so we don't evict on every write
+    removed = 0
+    for mtime, size, path in entries:
+        if total <= target and time.time() - mtime <= CACHE_TTL:
+            break
+        try:
+            path.unlink()
+            total -= size
+            removed += 1
+        except OSError:
+            pass
+
+    with _lock:
+        _disk_bytes = total
+        _stats["evictions"] += removed
+
+def clear_cache():
+    """Drop both tiers."""
+    global _disk_bytes
+    with _lock:
+        _memory.clear()
+        _disk_bytes = 0
+    for path in _disk_entries():
+        try:
+            path.unlink()
+        except OSError:
+            pass
+
+def get_cache_stats() -> dict:
+    """Hit/miss counters for /status."""
+    with _lock:
+        hits = _stats["memory_hits"] + _stats["disk_hits"]
+        lookups = hits + _stats["misses"]
+        return {
+            "enabled": CACHE_ENABLED,
+            "hits": hits,
+            **_stats,
+            "hit_ratio": round(hits / lookups, 3) if lookups else 0.0,
+            "memory_entries": len(_memory),
+            "disk_bytes": _disk_bytes,
+        }
+
+Collected("autogenesis_llm_cache_hits_total", "Response cache hits (memory and disk tiers).",
+          lambda: {("memory",): _stats["memory_hits"], ("disk",): _stats["disk_hits"]}, labels=("tier",), kind="counter")
+Collected("autogenesis_llm_cache_misses_total", "Response cache misses.", lambda: _stats["misses"], kind="counter")
+Collected("autogenesis_llm_cache_hit_ratio", "Share of cache lookups answered from the cache.", lambda: get_cache_stats()["hit_ratio"])
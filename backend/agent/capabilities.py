@@ -1,9 +1,16 @@
 """
 Advanced Agent Capabilities - Auto-fix, CI/CD, Tests, Deploy
 """
-from .agent import run_agent
+from .agent import run_agent, run_agent_async
 import os
 
+CICD_PATH = ".github/workflows/main.yml"
+
+def get_test_filename(filename: str) -> str:
+    """Name of the generated test file for a source file."""
+    base, ext = os.path.splitext(filename)
+    return f"test_{base}{ext}"
+
 def generate_cicd_pipeline(project_type: str, files: list) -> dict:
     """Generate CI/CD pipeline configuration based on project type."""
     prompt = f"""Generate a GitHub Actions CI/CD pipeline for this project.
@@ -30,7 +37,7 @@ Return ONLY the YAML content, no markdown."""
         yaml_content = "\n".join(l for l in lines if not l.strip().startswith("```"))
     
     return {
-        "path": ".github/workflows/main.yml",
+        "path": CICD_PATH,
         "content": yaml_content.strip(),
         "type": "cicd"
     }
@@ -58,20 +65,15 @@ Return ONLY the test code, no markdown."""
         lines = test_content.split("\n")
         test_content = "\n".join(l for l in lines if not l.strip().startswith("```"))
     
-    # Generate test filename
-    base = os.path.splitext(filename)[0]
-    ext = os.path.splitext(filename)[1]
-    test_filename = f"test_{base}{ext}"
-    
     return {
-        "path": test_filename,
+        "path": get_test_filename(filename),
         "content": test_content.strip(),
         "type": "test"
     }
 
-def auto_fix_code(code: str, error_message: str = "") -> dict:
-    """Fix ALL errors in code and improve quality."""
-    prompt = f"""You are an expert code fixer. Fix ALL issues in this code and improve its quality.
+def build_fix_prompt(code: str, error_message: str = "") -> str:
+    """Prompt asking the model to fix and improve code."""
+    return f"""You are an expert code fixer. Fix ALL issues in this code and improve its quality.
 
 CURRENT CODE:
 {code}
@@ -91,7 +93,8 @@ YOUR TASK:
 IMPORTANT: Return ONLY the complete fixed code. No explanations, no markdown, just pure code.
 The code must be complete and ready to run."""
 
-    result = run_agent(prompt, mode="code")
+def clean_fixed_code(result: dict) -> dict:
+    """Strip markdown and headers from an auto-fix result."""
     fixed_code = result.get("code") or result.get("response", "")
     
     # Clean markdown artifacts
@@ -115,6 +118,16 @@ The code must be complete and ready to run."""
         "type": "fix"
     }
 
+def auto_fix_code(code: str, error_message: str = "") -> dict:
+    """Fix ALL errors in code and improve quality."""
+    result = run_agent(build_fix_prompt(code, error_message), mode="code")
+    return clean_fixed_code(result)
+
+async def auto_fix_code_async(code: str, error_message: str = "") -> dict:
+    """Async auto_fix_code for use inside API handlers."""
+    result = await run_agent_async(build_fix_prompt(code, error_message), mode="code")
+    return clean_fixed_code(result)
+
 def generate_dockerfile(project_type: str, files: list) -> dict:
     """Generate Dockerfile for deployment."""
     prompt = f"""Generate a production-ready Dockerfile.
@@ -0,0 +1,165 @@
+"""
+Cassettes - Record provider answers and play them back offline.
+LLM_RECORD=path appends every provider answer run_agent gets, with how long
+it took, to a JSONL cassette. LLM_REPLAY=path serves answers from a cassette
+instead of calling a provider, sleeping for the recorded time divided by
+LLM_REPLAY_SPEED (0 replays instantly). Prompts missing from the cassette
+fall through to the normal provider/mock path.
+"""
+import asyncio
+import copy
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+from .cache import cache_key
+
+RECORD_PATH = os.getenv("LLM_RECORD")
+REPLAY_PATH = os.getenv("LLM_REPLAY")
+REPLAY_SPEED = float(os.getenv("LLM_REPLAY_SPEED", "1.0"))
+STREAM_CHUNKS = 8  # Replayed streams arrive in this many evenly spaced chunks
+
+_lock = threading.Lock()
+_recording = None  # Path being recorded to, or None
+_tape = None  # key -> list of entries, when replaying
+_positions = {}  # key -> next entry to replay (repeated prompts replay in order)
+_speed = REPLAY_SPEED
+_stats = {"recorded": 0, "replayed": 0, "misses": 0}
+
+
+def entry_key(idea: str, mode: str) -> str:
+    return cache_key("cassette", "", mode, idea, None)
+
+
+def load_cassette(path) -> dict:
+    """Entries of a cassette file grouped by key, in recording order."""
+    tape = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue  # Torn last line from an interrupted recording
+            tape.setdefault(entry["key"], []).append(entry)
+    return tape
+
+
+def use_cassettes(record=None, replay=None, speed: float = None):
+    """Switch recording/replay at runtime (tests, benchmarks). None turns a side off."""
+    global _recording, _tape, _speed
+    tape = load_cassette(replay) if replay else None
+    with _lock:
+        _recording = Path(record) if record else None
+        _tape = tape
+        _positions.clear()
+        if speed is not None:
+            _speed = speed
+    if tape is not None:
+        print(f"📼 Replaying {sum(len(v) for v in tape.values())} recorded LLM calls from {replay}")
+    if record:
+        print(f"📼 Recording LLM calls to {record}")
+
+
+def recording() -> bool:
+    return _recording is not None
+
+
+def _next_entry(idea: str, mode: str):
+    if _tape is None:
+        return None
+    key = entry_key(idea, mode)
+    with _lock:
+        entries = _tape.get(key)
+        if not entries:
+            _stats["misses"] += 1
+            return None
+        position = _positions.get(key, 0)
+        _positions[key] = position + 1
+        _stats["replayed"] += 1
+        return entries[position % len(entries)]
+
+
+def _delay(entry: dict) -> float:
+    return entry["seconds"] / _speed if _speed > 0 else 0.0
+
+
+def _chunks(result: dict) -> list:
+    text = result.get("code") or result.get("response")
+    if not isinstance(text, str) or not text:
+        return []
+    step = max(1, -(-len(text) // STREAM_CHUNKS))
+    return [text[i:i + step] for i in range(0, len(text), step)]
+
+
+def replay(idea: str, mode: str, on_delta=None):
+    """Recorded answer after its recorded delay, or None. on_delta gets it in timed chunks."""
+    entry = _next_entry(idea, mode)
+    if entry is None:
+        return None
+    result = copy.deepcopy(entry["result"])
+    delay = _delay(entry)
+    chunks = _chunks(result) if on_delta else []
+    if not chunks:
+        time.sleep(delay)
+        return result
+    for chunk in chunks:
+        time.sleep(delay / len(chunks))
+        on_delta(chunk)
+    return result
+
+
+async def replay_async(idea: str, mode: str):
+    """replay() for the async agent."""
+    entry = _next_entry(idea, mode)
+    if entry is None:
+        return None
+    await asyncio.sleep(_delay(entry))
+    return copy.deepcopy(entry["result"])
+
+
+def record(idea: str, mode: str, result: dict, seconds: float, call: dict = None):
+    """Append one provider answer to the cassette being recorded."""
+    path = _recording
+    if path is None:
+        return
+    attempts = (call or {}).get("attempts", [])
+    entry = {
+        "key": entry_key(idea, mode),
+        "mode": mode,
+        "idea": idea,
+        "seconds": round(seconds, 4),
+        "provider": attempts[-1]["provider"] if attempts else None,
+        "prompt_tokens": sum(a["prompt_tokens"] for a in attempts),
+        "completion_tokens": sum(a["completion_tokens"] for a in attempts),
+        "result": result,
+    }
+    line = json.dumps(entry) + "\n"
+    with _lock:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(line)
+        _stats["recorded"] += 1
+
+
+def get_cassette_stats() -> dict:
+    """Recording/replay state for /status."""
+    with _lock:
+        return {
+            "recording": str(_recording) if _recording else None,
+            "replaying": _tape is not None,
+            "speed": _speed,
+            **_stats,
+        }
+
+
+if RECORD_PATH or REPLAY_PATH:
+    try:
+        use_cassettes(record=RECORD_PATH, replay=REPLAY_PATH)
+    except OSError as e:
+        print(f"⚠️ Could not load cassette {REPLAY_PATH}: {e}")
+        use_cassettes(record=RECORD_PATH)
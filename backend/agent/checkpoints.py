@@ -0,0 +1,51 @@
+"""
+Phase Checkpoints - Saves each pipeline phase's output in the build workspace.
+A resumed build reuses any phase whose inputs hash the same as last time,
+so retrying after a provider error only pays for the phases that failed.
+"""
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+
+CHECKPOINT_DIRNAME = ".checkpoints"  # Listed in workspaces.INTERNAL_DIRS
+
+
+def input_hash(inputs) -> str:
+    payload = json.dumps(inputs, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class Checkpoints:
+    """One JSON file per phase under <workspace>/.checkpoints/."""
+
+    def __init__(self, workspace):
+        self.root = Path(workspace) / CHECKPOINT_DIRNAME
+
+    def _path(self, phase: str) -> Path:
+        return self.root / (re.sub(r"[^A-Za-z0-9._-]", "_", phase) + ".json")
+
+    def load(self, phase: str, inputs):
+        """The saved result if the phase ran before with the same inputs, else None."""
+        try:
+            record = json.loads(self._path(phase).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if record.get("phase") != phase or record.get("input_hash") != input_hash(inputs):
+            return None
+        return record.get("result")
+
+    def latest(self, phase: str):
+        """The last saved result for a phase, whatever its inputs were."""
+        try:
+            return json.loads(self._path(phase).read_text(encoding="utf-8")).get("result")
+        except (OSError, ValueError):
+            return None
+
+    def save(self, phase: str, inputs, result):
+        self.root.mkdir(parents=True, exist_ok=True)
+        path = self._path(phase)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"phase": phase, "input_hash": input_hash(inputs), "result": result}), encoding="utf-8")
+        os.replace(tmp, path)
@@ -1,7 +1,7 @@
 """
 Code Generator Module - High quality, language-aware code generation.
 """
-from .agent import run_agent
+from .agent import run_agent, run_agent_stream
 import os
 
 # File extension to language mapping
@@ -26,9 +26,10 @@ def get_language_info(filename: str) -> dict:
     ext = os.path.splitext(filename)[1].lower()
     return LANG_MAP.get(ext, {"name": "Python", "comment": "#"})
 
-def generate_file(idea: str, filename: str = "main.py") -> str:
+def generate_file(idea: str, filename: str = "main.py", on_delta=None) -> str:
     """
     Generates high-quality, language-appropriate code.
+    If on_delta is given, raw completion text is streamed to it as it arrives.
     """
     lang = get_language_info(filename)
     lang_name = lang["name"]
@@ -56,7 +57,10 @@ CRITICAL RULES:
 
 Return ONLY the {lang_name} code. No markdown, no explanations, no code fences."""
 
-    result = run_agent(prompt, mode="code")
+    if on_delta is not None:
+        result = run_agent_stream(prompt, mode="code", on_delta=on_delta)
+    else:
+        result = run_agent(prompt, mode="code")
     
     code = ""
     if "code" in result:
@@ -241,3 +245,37 @@ CRITICAL: Return ONLY valid {lang_name} code. No markdown, no explanations."""
         return clean_code(result["response"], lang_name)
     
     return code
+
+def patch_code(code: str, issues: list, idea: str = "", filename: str = "main.py") -> tuple:
+    """
+    Improve a file by asking only for a unified diff and applying it locally.
+    Falls back to fix_code (a full rewrite) if the diff doesn't apply.
+    Returns (new_code, "patched" | "rewritten").
+    """
+    from .patches import apply_patch, extract_diff, PatchError
+    
+    lang_name = get_language_info(filename)["name"]
+    issues_text = "\n".join(f"- {issue}" for issue in issues)
+    numbered = "\n".join(f"{i:4d} | {line}" for i, line in enumerate(code.split("\n"), 1))
+    prompt = f"""You are an expert {lang_name} developer. Improve this file with a minimal patch.
+
+PROJECT: {idea}
+FILE: {filename}
+LANGUAGE: {lang_name}
+
+ISSUES TO FIX:
+{issues_text}
+
+CURRENT CODE (line numbers are for reference only):
+{numbered}
+
+Return ONLY a unified diff (--- a/{filename}, +++ b/{filename}, @@ hunks with 3 lines of context).
+Change only what is needed to fix the issues. No explanations."""
+    
+    result = run_agent(prompt, mode="code")
+    reply = result.get("code") or result.get("response") or ""
+    try:
+        return apply_patch(code, extract_diff(reply)), "patched"
+    except PatchError as e:
+        print(f"⚠️  Patch for {filename} did not apply ({e}), rewriting file")
+        return fix_code(code, issues, idea, filename), "rewritten"
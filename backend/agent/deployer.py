@@ -5,7 +5,14 @@ import os
 import subprocess
 import json
 
-def deploy_to_vercel(project_path: str = "output"):
+from .workspaces import latest_workspace
+
+def default_project_path():
+    """Default project to deploy: the most recent finished build's workspace."""
+    workspace = latest_workspace()
+    return str(workspace) if workspace else None
+
+def deploy_to_vercel(project_path: str = None):
     """
     Deploys the generated project to Vercel.
     Requires Vercel CLI installed and authenticated.
@@ -17,6 +24,10 @@ def deploy_to_vercel(project_path: str = "output"):
         "url": None,
         "message": ""
     }
+    project_path = project_path or default_project_path()
+    if not project_path:
+        result["message"] = "No finished build to deploy."
+        return result
     
     # Check if Vercel CLI is available
     try:
@@ -68,20 +79,22 @@ def deploy_to_vercel(project_path: str = "output"):
     
     return result
 
-def mock_deploy(project_path: str = "output"):
+def mock_deploy(project_path: str = None):
     """
     Simulates deployment for demo purposes.
     """
+    project_path = project_path or default_project_path() or "project"
     return {
         "success": True,
         "url": f"https://autogenesis-demo.vercel.app/{os.path.basename(project_path)}",
         "message": "Mock deployment successful (Vercel CLI not configured)."
     }
 
-def smart_deploy(project_path: str = "output"):
+def smart_deploy(project_path: str = None):
     """
     Attempts real deployment, falls back to mock.
     """
+    project_path = project_path or default_project_path()
     real_result = deploy_to_vercel(project_path)
     if real_result["success"]:
         return real_result
@@ -0,0 +1,133 @@
+"""
+Project Export - Streams zip archives of generated projects.
+Archives are built on the fly while they are sent, and a copy is kept under
+storage/exports/ keyed by a hash of the file set, so downloading the same
+files again is served straight from disk without recompressing.
+"""
+import hashlib
+import os
+import threading
+import uuid
+import zipfile
+from pathlib import Path
+
+EXPORT_CACHE_DIR = Path("storage/exports")
+EXPORT_CACHE_MAX = int(os.getenv("EXPORT_CACHE_MAX", "50"))  # Archives kept
+CHUNK_SIZE = 64 * 1024
+
+_lock = threading.Lock()
+
+
+class _StreamBuffer:
+    """Unseekable file object that collects what zipfile writes so it can be yielded."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _read_chunks(source):
+    """Chunks of a file (Path) or in-memory content (str/bytes)."""
+    if isinstance(source, Path):
+        with open(source, "rb") as f:
+            while True:
+                chunk = f.read(CHUNK_SIZE)
+                if not chunk:
+                    return
+                yield chunk
+    else:
+        data = source.encode("utf-8") if isinstance(source, str) else source
+        for i in range(0, len(data), CHUNK_SIZE):
+            yield data[i:i + CHUNK_SIZE]
+
+
+def file_set_hash(entries: list) -> str:
+    """Content hash of [(archive name, Path | str | bytes)], independent of where files live."""
+    digest = hashlib.sha256()
+    for name, source in entries:
+        digest.update(name.encode("utf-8") + b"\0")
+        file_digest = hashlib.sha256()
+        for chunk in _read_chunks(source):
+            file_digest.update(chunk)
+        digest.update(file_digest.digest())
+    return digest.hexdigest()
+
+
+def cached_archive(key: str):
+    """Path of a previously built archive for this file set, or None."""
+    path = EXPORT_CACHE_DIR / f"{key}.zip"
+    if path.exists():
+        os.utime(path)  # Mark as recently used
+        return path
+    return None
+
+
+def stream_zip(entries: list, key: str = None):
+    """
+    Yield a zip archive of entries chunk by chunk. If key is given the bytes
+    are also written to the export cache, which is only published once the
+    whole archive has been produced.
+    """
+    buffer = _StreamBuffer()
+    cache_file = tmp_path = None
+    if key is not None:
+        EXPORT_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp_path = EXPORT_CACHE_DIR / f"{key}.{uuid.uuid4().hex}.tmp"
+        cache_file = open(tmp_path, "wb")
+
+    def flush():
+        data = buffer.drain()
+        if data and cache_file is not None:
+            cache_file.write(data)
+        return data
+
+    complete = False
+    try:
+        with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zf:
+            for name, source in entries:
+                info = zipfile.ZipInfo.from_file(source, name) if isinstance(source, Path) else zipfile.ZipInfo(name)
+                info.compress_type = zipfile.ZIP_DEFLATED
+                with zf.open(info, "w") as dest:
+                    for chunk in _read_chunks(source):
+                        dest.write(chunk)
+                        data = flush()
+                        if data:
+                            yield data
+        data = flush()  # Central directory, written on close
+        if data:
+            yield data
+        complete = True
+    finally:
+        if cache_file is not None:
+            cache_file.close()
+            if complete:
+                os.replace(tmp_path, EXPORT_CACHE_DIR / f"{key}.zip")
+                _evict()
+            else:
+                tmp_path.unlink(missing_ok=True)  # Client went away mid-download
+
+
+def _evict():
+    """Keep only the EXPORT_CACHE_MAX most recently used archives."""
+    with _lock:
+        archives = sorted(EXPORT_CACHE_DIR.glob("*.zip"), key=lambda p: p.stat().st_mtime, reverse=True)
+        for path in archives[EXPORT_CACHE_MAX:]:
+            path.unlink(missing_ok=True)
+
+
+def clear_exports():
+    """Drop every cached archive."""
+    if EXPORT_CACHE_DIR.exists():
+        for path in EXPORT_CACHE_DIR.iterdir():
+            path.unlink(missing_ok=True)
@@ -1,10 +1,22 @@
 """
 Intelligence System - Tracks Autogenesis growth and learning.
+Stats live in memory and are written behind to storage/intelligence.json.
 """
+import atexit
+import copy
 import json
+import os
+import threading
 from pathlib import Path
 
 STATS_FILE = Path("storage/intelligence.json")
+STATS_FLUSH_INTERVAL = float(os.getenv("STATS_FLUSH_INTERVAL", "5"))  # seconds
+
+_lock = threading.RLock()
+_write_lock = threading.Lock()  # One disk writer at a time; taken before _lock, never inside it
+_stats = None  # Loaded from disk once, then updated in place
+_dirty = False
+_flush_timer = None
 
 # Growth stages
 STAGES = [
@@ -16,14 +28,7 @@ STAGES = [
     {"min": 95, "name": "Sage", "emoji": "🏆", "desc": "Legendary AI"},
 ]
 
-def get_stats() -> dict:
-    """Load or initialize stats."""
-    if STATS_FILE.exists():
-        try:
-            return json.loads(STATS_FILE.read_text())
-        except:
-            pass
-    
+def _default_stats() -> dict:
     return {
         "total_projects": 0,
         "total_files": 0,
@@ -34,10 +39,79 @@ def get_stats() -> dict:
         "level": 0
     }
 
+def _cached_stats() -> dict:
+    """The live stats dict. Callers must hold _lock."""
+    global _stats
+    if _stats is None:
+        _stats = _default_stats()
+        if STATS_FILE.exists():
+            try:
+                _stats = json.loads(STATS_FILE.read_text())
+            except (OSError, ValueError):
+                pass
+    return _stats
+
+def get_stats() -> dict:
+    """Current stats (a copy), served from memory."""
+    with _lock:
+        return copy.deepcopy(_cached_stats())
+
+def _mark_dirty():
+    """Schedule a flush unless one is already pending. Callers must hold _lock."""
+    global _dirty, _flush_timer
+    _dirty = True
+    if _flush_timer is None:
+        _flush_timer = threading.Timer(STATS_FLUSH_INTERVAL, flush_stats)
+        _flush_timer.daemon = True
+        _flush_timer.start()
+
 def save_stats(stats: dict):
-    """Save stats to file."""
-    STATS_FILE.parent.mkdir(exist_ok=True)
-    STATS_FILE.write_text(json.dumps(stats, indent=2))
+    """Replace stats; written to disk on the next flush."""
+    global _stats
+    with _lock:
+        _stats = copy.deepcopy(stats)
+        _mark_dirty()
+
+def flush_stats():
+    """Write pending stats to disk atomically (temp file + rename)."""
+    global _dirty, _flush_timer
+    # Snapshot inside the write lock: each write carries the newest stats, so a
+    # slower flush can never replace a newer file with an older copy
+    with _write_lock:
+        with _lock:
+            _flush_timer = None
+            if not _dirty:
+                return
+            data = json.dumps(_stats, indent=2)
+            _dirty = False
+
+        try:
+            STATS_FILE.parent.mkdir(exist_ok=True)
+            tmp = STATS_FILE.with_suffix(".tmp")
+            with open(tmp, "w") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, STATS_FILE)
+        except OSError as e:
+            print(f"⚠️  Failed to save intelligence stats: {e}")
+            with _lock:
+                _mark_dirty()  # Try again on the next interval
+
+def reset_stats():
+    """Forget all progress, in memory and on disk."""
+    global _stats, _dirty, _flush_timer
+    with _write_lock:  # Let a flush already writing finish first, or it would restore the file
+        with _lock:
+            if _flush_timer is not None:
+                _flush_timer.cancel()
+                _flush_timer = None
+            _stats = _default_stats()
+            _dirty = False
+            if STATS_FILE.exists():
+                STATS_FILE.unlink()
+
+atexit.register(flush_stats)
 
 def calculate_level(xp: int) -> int:
     """Calculate level percentage (0-100) from XP."""
@@ -59,45 +133,45 @@ def add_project_xp(files_generated: int, issues_found: int, languages: list) ->
     Add XP for completing a project.
     Returns updated stats.
     """
-    stats = get_stats()
-    
-    # Base XP for completing a project
-    xp_gained = 10
+    with _lock:
+        stats = _cached_stats()
     
-    # Bonus for multiple files
-    xp_gained += files_generated * 2
+        # Base XP for completing a project
+        xp_gained = 10
     
-    # Bonus for clean code (fewer issues)
-    if issues_found == 0:
-        xp_gained += 15  # Perfect code bonus
-    elif issues_found <= 2:
-        xp_gained += 5   # Minor issues bonus
+        # Bonus for multiple files
+        xp_gained += files_generated * 2
     
-    # Bonus for using new languages
-    for lang in languages:
-        if lang not in stats["languages_used"]:
-            xp_gained += 10  # New language bonus
-            stats["languages_used"].append(lang)
+        # Bonus for clean code (fewer issues)
+        if issues_found == 0:
+            xp_gained += 15  # Perfect code bonus
+        elif issues_found <= 2:
+            xp_gained += 5   # Minor issues bonus
     
-    # Update stats
-    stats["total_projects"] += 1
-    stats["total_files"] += files_generated
-    stats["total_issues_found"] += issues_found
-    stats["xp"] += xp_gained
-    stats["level"] = calculate_level(stats["xp"])
+        # Bonus for using new languages
+        for lang in languages:
+            if lang not in stats["languages_used"]:
+                xp_gained += 10  # New language bonus
+                stats["languages_used"].append(lang)
     
-    save_stats(stats)
+        # Update stats
+        stats["total_projects"] += 1
+        stats["total_files"] += files_generated
+        stats["total_issues_found"] += issues_found
+        stats["xp"] += xp_gained
+        stats["level"] = calculate_level(stats["xp"])
+        _mark_dirty()
     
-    return {
-        "xp_gained": xp_gained,
-        "total_xp": stats["xp"],
-        "level": stats["level"],
-        "stage": get_stage(stats["level"]),
-        "stats": stats
-    }
+        return {
+            "xp_gained": xp_gained,
+            "total_xp": stats["xp"],
+            "level": stats["level"],
+            "stage": get_stage(stats["level"]),
+            "stats": copy.deepcopy(stats)
+        }
 
 def get_intelligence() -> dict:
-    """Get current intelligence status."""
+    """Get current intelligence status (no disk access)."""
     stats = get_stats()
     level = calculate_level(stats["xp"])
     stage = get_stage(level)
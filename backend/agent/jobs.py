@@ -0,0 +1,146 @@
+"""
+Build Jobs - Runs pipelines in the background, independent of HTTP requests.
+Each job buffers its events so clients can poll status or reconnect to the
+event stream from any offset without restarting the build.
+"""
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .orchestrator import run_pipeline_streaming
+from .singleflight import SharedStream
+from .workspaces import new_job_id, valid_job_id
+from .metrics import Collected
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))  # Pipelines running at once
+JOB_MAX_QUEUED = int(os.getenv("JOB_MAX_QUEUED", "50"))
+JOB_RETENTION = int(os.getenv("JOB_RETENTION_MINUTES", "60")) * 60  # Keep finished jobs this long
+
+_pool = ThreadPoolExecutor(max_workers=max(1, JOB_WORKERS), thread_name_prefix="job")
+_jobs = {}  # job_id -> Job
+_lock = threading.Lock()
+
+
+class QueueFull(Exception):
+    pass
+
+
+class Job:
+    def __init__(self, idea: str, auto_deploy: bool, improve_mode: bool, job_id: str = None, resume: bool = False,
+                 previous_job: str = None):
+        self.id = job_id or new_job_id()
+        self.idea = idea
+        self.auto_deploy = auto_deploy
+        self.improve_mode = improve_mode
+        self.resume = resume
+        self.previous_job = previous_job
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self.stream = SharedStream(self._events(), on_finish=self._on_finish)
+
+    def _events(self):
+        self.started = time.time()
+        yield from run_pipeline_streaming(
+            self.idea, self.auto_deploy, self.improve_mode,
+            job_id=self.id, resume=self.resume, previous_job=self.previous_job
+        )
+
+    def _on_finish(self, stream):
+        self.finished = time.time()
+        if stream.error is not None:
+            print(f"❌ Job {self.id} failed: {stream.error}")
+
+    @property
+    def status(self) -> str:
+        if self.finished is None:
+            return "running" if self.started else "queued"
+        return "failed" if self.stream.error is not None else "done"
+
+    def result(self):
+        """The build result from the final "complete" event, if it got there."""
+        if self.finished is None or not self.stream.events:
+            return None
+        last = json.loads(self.stream.events[-1])
+        return last["data"] if last.get("step") == "complete" else None
+
+    def info(self) -> dict:
+        return {
+            "job_id": self.id,
+            "idea": self.idea,
+            "status": self.status,
+            "events": len(self.stream.events),
+            "created": self.created,
+            "started": self.started,
+            "finished": self.finished,
+            "error": str(self.stream.error) if self.stream.error is not None else None,
+            "result": self.result(),
+        }
+
+    def events(self, offset: int = 0):
+        """(event_id, event) pairs from offset onward, following the build live.
+        A failed build ends with an "error" event instead of raising."""
+        event_id = offset
+        try:
+            for event in self.stream.subscribe(offset):
+                event_id += 1
+                yield event_id, event
+        except Exception as e:
+            yield event_id + 1, json.dumps({"step": "error", "message": str(e), "percent": 100, "data": {}})
+
+
+def _prune():
+    """Forget finished jobs past the retention window. Callers must hold _lock."""
+    cutoff = time.time() - JOB_RETENTION
+    for job_id in [j.id for j in _jobs.values() if j.finished and j.finished < cutoff]:
+        del _jobs[job_id]
+
+
+def submit_job(idea: str, auto_deploy: bool = False, improve_mode: bool = False, resume_job: str = None,
+               previous_job: str = None) -> Job:
+    """
+    Queue a build; it starts when one of the JOB_WORKERS slots frees up.
+    resume_job reruns an earlier job in its workspace, reusing checkpointed phases.
+    previous_job is the build that improve mode patches.
+    """
+    if resume_job is not None and not valid_job_id(resume_job):
+        raise ValueError(f"Invalid job id: {resume_job}")
+    with _lock:
+        _prune()
+        queued = sum(1 for j in _jobs.values() if j.status == "queued")
+        if queued >= JOB_MAX_QUEUED:
+            raise QueueFull(f"{queued} builds already queued")
+        previous = _jobs.get(resume_job)
+        if previous is not None and previous.finished is None:
+            raise ValueError(f"Job {resume_job} is still running")
+        job = Job(idea, auto_deploy, improve_mode, job_id=resume_job, resume=resume_job is not None,
+                  previous_job=previous_job)
+        _jobs[job.id] = job
+    job.stream.start(executor=_pool)
+    return job
+
+
+def get_job(job_id: str):
+    with _lock:
+        return _jobs.get(job_id)
+
+
+def get_job_stats() -> dict:
+    """Job counts by status for /status."""
+    with _lock:
+        jobs = list(_jobs.values())
+    counts = {"queued": 0, "running": 0, "done": 0, "failed": 0}
+    for job in jobs:
+        counts[job.status] += 1
+    return {"workers": JOB_WORKERS, **counts}
+
+
+Collected("autogenesis_jobs", "Background jobs by status.",
+          lambda: {(status,): count for status, count in get_job_stats().items() if status != "workers"}, labels=("status",))
+
+
+def shutdown_jobs():
+    """Drop queued jobs; running ones finish on their worker threads."""
+    _pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,45 @@
+"""
+Latency Tracking - Rolling window of recent LLM call latencies.
+Used to decide when a slow request should be hedged.
+"""
+import threading
+from collections import deque
+
+
+class RollingHistogram:
+    """Keeps the last `window` samples per key and answers percentile queries."""
+
+    def __init__(self, window: int = 200):
+        self.window = window
+        self._samples = {}
+        self._lock = threading.Lock()
+
+    def record(self, key: str, seconds: float):
+        with self._lock:
+            samples = self._samples.get(key)
+            if samples is None:
+                samples = self._samples[key] = deque(maxlen=self.window)
+            samples.append(seconds)
+
+    def percentile(self, key: str, pct: float, min_samples: int = 1):
+        """pct-th percentile (0-100) of recent samples, or None if there are too few."""
+        with self._lock:
+            samples = sorted(self._samples.get(key, ()))
+        if len(samples) < max(1, min_samples):
+            return None
+        index = min(len(samples) - 1, int(round(pct / 100 * (len(samples) - 1))))
+        return samples[index]
+
+    def snapshot(self) -> dict:
+        """p50/p95/p99 per key for /status."""
+        with self._lock:
+            keys = list(self._samples)
+        result = {}
+        for key in keys:
+            result[key] = {
+                "count": len(self._samples[key]),
+                "p50": round(self.percentile(key, 50) or 0, 3),
+                "p95": round(self.percentile(key, 95) or 0, 3),
+                "p99": round(self.percentile(key, 99) or 0, 3),
+            }
+        return result
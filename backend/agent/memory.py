@@ -1,64 +1,188 @@
-import json
+import os
+import threading
+from datetime import datetime
 from pathlib import Path
+from .blobs import put_blob, get_blob, clear_blobs
+from .memory_store import JsonlMemoryStore, file_language
+from .search import SearchIndex
+from .metrics import Collected
 
-MEMORY_FILE = Path("storage/memory.json")
+MEMORY_BACKEND = os.getenv("MEMORY_BACKEND", "jsonl").lower()  # "jsonl" or "sqlite"
+MEMORY_DIR = Path("storage/memory")
+MEMORY_DB = Path("storage/memory.db")
+LEGACY_MEMORY_FILE = Path("storage/memory.json")  # Migrated into the log on first use
+
+def _code_to_blobs(data: dict) -> dict:
+    """Replace inline file bodies with blob references; final_code is rebuilt on load."""
+    if "all_code" not in data:
+        return data
+    record = {k: v for k, v in data.items() if k not in ("all_code", "final_code")}
+    record["file_refs"] = {path: put_blob(code) for path, code in data["all_code"].items()}
+    return record
+
+def _open_store():
+    log = JsonlMemoryStore(MEMORY_DIR, legacy_file=LEGACY_MEMORY_FILE, prepare=_code_to_blobs)
+    if MEMORY_BACKEND != "sqlite":
+        return log
+
+    from .memory_sqlite import SqliteMemoryStore
+    store = SqliteMemoryStore(MEMORY_DB)
+    # Import the existing log the first time the SQLite backend is used
+    if store.count() == 0 and (MEMORY_DIR.exists() or LEGACY_MEMORY_FILE.exists()):
+        imported = store.import_records(log.iter_records())
+        if imported:
+            print(f"📦 Imported {imported} projects into {MEMORY_DB}")
+    return store
+
+_store = _open_store()
+_index = SearchIndex()
+_index_lock = threading.Lock()
+_index_checked = False
+
+_vectors = None  # VectorIndex, created on first use: numpy is slow to import
+_vectors_loaded = False
+_vectors_lock = threading.Lock()
+
+def _vector_index():
+    """The semantic index, or None when numpy is not installed."""
+    global _vectors, _vectors_loaded
+    if not _vectors_loaded:
+        with _vectors_lock:
+            if not _vectors_loaded:
+                try:
+                    from .vectors import VectorIndex
+                    _vectors = VectorIndex()
+                except ImportError:
+                    print("⚠️  numpy not installed, semantic project search disabled")
+                _vectors_loaded = True  # Learning context falls back to BM25 only
+    return _vectors
+
+MIN_SEMANTIC_SCORE = float(os.getenv("MIN_SEMANTIC_SCORE", "0.3"))
+
+def _indexes() -> list:
+    """The similarity indexes, rebuilt from memory if missing or out of date."""
+    global _index_checked
+    indexes = [i for i in (_index, _vector_index()) if i is not None]
+    with _index_lock:
+        if not _index_checked:
+            total = _store.count()
+            for index in indexes:
+                if index.count() != total:
+                    index.clear()
+                    indexed = index.add_many(_store.iter_records())
+                    if indexed:
+                        print(f"🔎 Indexed {indexed} past projects in {type(index).__name__}")
+            _index_checked = True
+    return indexes
 
 def save_memory(data):
     """
-    Saves data to memory.json.
+    Appends a project to memory, stamping it with the save time.
     """
-    MEMORY_FILE.parent.mkdir(exist_ok=True)
-    
-    current_memory = []
-    if MEMORY_FILE.exists():
-        try:
-             current_memory = json.loads(MEMORY_FILE.read_text())
-        except:
-             pass
-    
-    current_memory.append(data)
-    MEMORY_FILE.write_text(json.dumps(current_memory, indent=2))
+    if "timestamp" not in data:
+        data = {**data, "timestamp": datetime.now().isoformat(timespec="seconds")}
+    indexes = _indexes()
+    _store.append(_code_to_blobs(data))
+    for index in indexes:
+        index.add(data)
+
+def load_project_code(project: dict) -> dict:
+    """
+    Resolve a stored project's blob references into all_code and final_code.
+    """
+    refs = project.get("file_refs")
+    if refs is None:
+        return project
+    all_code = {path: get_blob(digest) or "" for path, digest in refs.items()}
+    project = {k: v for k, v in project.items() if k != "file_refs"}
+    project["all_code"] = all_code
+    project["final_code"] = "\n\n".join([f"// === {k} ===\n{v}" for k, v in all_code.items()])
+    return project
+
+def iter_memory(reverse: bool = False):
+    """
+    Streams stored projects oldest-first (newest-first with reverse=True).
+    File bodies stay as blob references; see load_project_code.
+    """
+    return _store.iter_records(reverse=reverse)
 
 def read_memory():
     """
-    Reads all memory.
+    Reads all memory, with generated code.
     """
-    if MEMORY_FILE.exists():
-        try:
-            return json.loads(MEMORY_FILE.read_text())
-        except:
-            return []
-    return []
+    return [load_project_code(p) for p in iter_memory()]
+
+def get_project(project_id: int):
+    """
+    One stored project with its generated code, by Memory View id.
+    """
+    project = _store.get(project_id)
+    return load_project_code(project) if project is not None else None
+
+def memory_count() -> int:
+    """Number of stored projects."""
+    return _store.count()
+
+def memory_size_bytes() -> int:
+    """On-disk size of the memory store (log segments or SQLite file)."""
+    return _store.size_bytes()
+
+Collected("autogenesis_memory_store_bytes", "On-disk size of the project memory store.", memory_size_bytes)
+Collected("autogenesis_memory_projects", "Projects stored in memory.", memory_count)
+
+def compact_memory():
+    """Merge sealed log segments (also runs automatically as segments pile up)."""
+    _store.compact()
+
+def clear_memory():
+    """Delete all stored projects."""
+    _store.clear()
+    _index.clear()
+    if _vector_index() is not None:
+        _vectors.clear()
+    clear_blobs()
+    if MEMORY_BACKEND == "sqlite":
+        JsonlMemoryStore(MEMORY_DIR).clear()  # Otherwise it would be re-imported
+    if LEGACY_MEMORY_FILE.exists():
+        LEGACY_MEMORY_FILE.unlink()
+
+def find_project(idea: str):
+    """
+    Newest stored project built from exactly this idea, with its code, or None.
+    """
+    idea = idea.strip()
+    for project in iter_memory(reverse=True):
+        if project.get("idea", "").strip() == idea:
+            return load_project_code(project)
+    return None
 
 def get_similar_projects(idea: str, limit: int = 3):
     """
     Find past projects similar to the current idea.
-    Uses simple keyword matching for now.
+    Ranked with BM25 over past ideas, plans and file names.
     """
-    memory = read_memory()
-    if not memory:
-        return []
-    
-    # Simple relevance scoring based on word overlap
-    idea_words = set(idea.lower().split())
-    scored = []
-    
-    for project in memory:
-        past_idea = project.get("idea", "")
-        past_words = set(past_idea.lower().split())
-        overlap = len(idea_words & past_words)
-        if overlap > 0:
-            scored.append((overlap, project))
-    
-    # Sort by overlap score descending
-    scored.sort(key=lambda x: x[0], reverse=True)
-    return [p for _, p in scored[:limit]]
+    _indexes()
+    return _index.search(idea, limit)
+
+def get_related_projects(idea: str, limit: int = 3):
+    """
+    Past projects that mean the same thing as the idea, even when worded
+    differently. Semantic matches come first, topped up with BM25 hits.
+    """
+    related = []
+    if _vector_index() is not None:
+        _indexes()
+        related = [p for _, p in _vectors.search(idea, limit, MIN_SEMANTIC_SCORE)]
+    if len(related) < limit:
+        seen = {p.get("idea") for p in related}
+        related += [p for p in get_similar_projects(idea, limit) if p.get("idea") not in seen]
+    return related[:limit]
 
 def get_learning_context(idea: str):
     """
     Generate context from past projects to improve new generations.
     """
-    similar = get_similar_projects(idea)
+    similar = get_related_projects(idea)
     if not similar:
         return ""
     
@@ -70,16 +194,17 @@ def get_learning_context(idea: str):
     
     return context
 
-def get_memory_history():
+def get_memory_history(page: int = 1, page_size: int = 20, language: str = None):
     """
-    Get formatted project history for Memory View.
-    Returns list of projects with key metrics.
+    Get formatted project history for Memory View, newest first.
+    Returns one page of projects with key metrics, optionally only
+    projects containing files in the given language.
     """
-    from datetime import datetime
-    memory = read_memory()
-    
+    page = max(1, page)
+    offset = (page - 1) * page_size
+
     history = []
-    for i, project in enumerate(memory):
+    for project_id, project in _store.page(offset, page_size, language):
         # Extract info
         idea = project.get("idea", "Unknown project")
         xp = project.get("xp_gained", 0)
@@ -90,19 +215,10 @@ def get_memory_history():
         tech = plan.get("tech_stack", [])
         if not tech:
             # Infer from files
-            for f in files:
-                if f.endswith(".py"):
-                    tech.append("Python")
-                elif f.endswith(".html"):
-                    tech.append("HTML")
-                elif f.endswith(".css"):
-                    tech.append("CSS")
-                elif f.endswith(".js"):
-                    tech.append("JavaScript")
-            tech = list(set(tech))
+            tech = list({file_language(f) for f in files} - {None})
         
         history.append({
-            "id": i + 1,
+            "id": project_id,
             "idea": idea[:60] + ("..." if len(idea) > 60 else ""),
             "xp_gained": xp,
             "languages": tech[:3],  # Max 3 languages
@@ -112,6 +228,4 @@ def get_memory_history():
             "timestamp": project.get("timestamp", datetime.now().isoformat()[:10])
         })
     
-    # Most recent first
-    history.reverse()
-    return history[:20]  # Last 20 projects
+    return history
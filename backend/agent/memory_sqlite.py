@@ -0,0 +1,209 @@
+"""
+SQLite Memory Store - Optional indexed backend for project memory.
+Projects, generated files and review results live in separate tables so
+history pages and language filters never touch the generated code.
+Enable with MEMORY_BACKEND=sqlite.
+"""
+import json
+import sqlite3
+import threading
+from pathlib import Path
+
+from .memory_store import file_language
+
+BATCH_SIZE = 100
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS projects (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp TEXT,
+    idea TEXT,
+    xp_gained INTEGER,
+    data TEXT
+);
+CREATE TABLE IF NOT EXISTS files (
+    project_id INTEGER REFERENCES projects(id) ON DELETE CASCADE,
+    position INTEGER,
+    path TEXT,
+    language TEXT,
+    content TEXT
+);
+CREATE TABLE IF NOT EXISTS reviews (
+    project_id INTEGER PRIMARY KEY REFERENCES projects(id) ON DELETE CASCADE,
+    score INTEGER,
+    data TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_projects_timestamp ON projects(timestamp);
+CREATE INDEX IF NOT EXISTS idx_files_project ON files(project_id, position);
+CREATE INDEX IF NOT EXISTS idx_files_language ON files(language, project_id);
+"""
+
+
+def build_final_code(all_code: dict) -> str:
+    return "\n\n".join([f"// === {k} ===\n{v}" for k, v in all_code.items()])
+
+
+class SqliteMemoryStore:
+    """Same interface as JsonlMemoryStore, plus indexed paging."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            conn.executescript(SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    # ---------- writes ----------
+
+    def append(self, record: dict):
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                self._insert(conn, record)
+
+    def import_records(self, records) -> int:
+        """Bulk-load records (e.g. from the JSONL log) in one transaction."""
+        count = 0
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                for record in records:
+                    self._insert(conn, record)
+                    count += 1
+        return count
+
+    def _insert(self, conn: sqlite3.Connection, record: dict):
+        data = dict(record)
+        record_id = data.pop("id", None)  # Keep ids from the JSONL log when importing it
+        all_code = data.pop("all_code", None) or {}
+        code_files = data.pop("code_files", None)
+        review = data.pop("review", None)
+        if data.get("final_code") == build_final_code(all_code):
+            data.pop("final_code")  # Rebuilt from the files table on read
+        if code_files is None:
+            code_files = list(all_code)
+        elif code_files != list(all_code):
+            data["code_files"] = code_files  # Keep as-is if it doesn't line up with all_code
+
+        cursor = conn.execute(
+            "INSERT INTO projects (id, timestamp, idea, xp_gained, data) VALUES (?, ?, ?, ?, ?)",
+            (record_id, record.get("timestamp"), record.get("idea", ""), record.get("xp_gained", 0), json.dumps(data)),
+        )
+        project_id = cursor.lastrowid
+        conn.executemany(
+            "INSERT INTO files (project_id, position, path, language, content) VALUES (?, ?, ?, ?, ?)",
+            [(project_id, i, path, file_language(path), all_code.get(path)) for i, path in enumerate(code_files)],
+        )
+        if review is not None:
+            score = review.get("score") if isinstance(review, dict) else None
+            conn.execute(
+                "INSERT INTO reviews (project_id, score, data) VALUES (?, ?, ?)",
+                (project_id, score, json.dumps(review)),
+            )
+
+    def compact(self):
+        """Reclaim space left by deleted rows."""
+        with self._lock:
+            self._connect().execute("VACUUM")
+
+    def clear(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+            for suffix in ("", "-wal", "-shm"):
+                Path(str(self.path) + suffix).unlink(missing_ok=True)
+
+    # ---------- reads ----------
+
+    def count(self) -> int:
+        with self._lock:
+            return self._connect().execute("SELECT COUNT(*) FROM projects").fetchone()[0]
+
+    def size_bytes(self) -> int:
+        return sum(
+            Path(str(self.path) + suffix).stat().st_size
+            for suffix in ("", "-wal")
+            if Path(str(self.path) + suffix).exists()
+        )
+
+    def _load(self, conn: sqlite3.Connection, rows, with_code: bool) -> list:
+        """Attach files and reviews to project rows with one query per table."""
+        if not rows:
+            return []
+        ids = [row[0] for row in rows]
+        marks = ",".join("?" * len(ids))
+
+        files = {}
+        columns = "project_id, path, content" if with_code else "project_id, path, NULL"
+        for project_id, path, content in conn.execute(
+            f"SELECT {columns} FROM files WHERE project_id IN ({marks}) ORDER BY project_id, position", ids
+        ):
+            files.setdefault(project_id, []).append((path, content))
+        reviews = dict(conn.execute(f"SELECT project_id, data FROM reviews WHERE project_id IN ({marks})", ids))
+
+        records = []
+        for project_id, data in rows:
+            record = {**json.loads(data), "id": project_id}
+            project_files = files.get(project_id, [])
+            record.setdefault("code_files", [path for path, _ in project_files])
+            if with_code and "file_refs" not in record:
+                all_code = {path: content for path, content in project_files if content is not None}
+                record["all_code"] = all_code
+                record.setdefault("final_code", build_final_code(all_code))
+            if project_id in reviews:
+                record["review"] = json.loads(reviews[project_id])
+            records.append((project_id, record))
+        return records
+
+    def iter_records(self, reverse: bool = False):
+        """Stream full records in id order, one batch per query."""
+        last_id = None
+        while True:
+            with self._lock:
+                conn = self._connect()
+                if reverse:
+                    query = "SELECT id, data FROM projects WHERE id < ? ORDER BY id DESC LIMIT ?"
+                    start = last_id if last_id is not None else 2 ** 63 - 1
+                else:
+                    query = "SELECT id, data FROM projects WHERE id > ? ORDER BY id LIMIT ?"
+                    start = last_id if last_id is not None else 0
+                batch = self._load(conn, conn.execute(query, (start, BATCH_SIZE)).fetchall(), with_code=True)
+            if not batch:
+                return
+            for _, record in batch:
+                yield record
+            last_id = batch[-1][0]
+
+    def get(self, project_id: int):
+        """Full record for one project id, or None."""
+        with self._lock:
+            conn = self._connect()
+            rows = conn.execute("SELECT id, data FROM projects WHERE id = ?", (project_id,)).fetchall()
+            records = self._load(conn, rows, with_code=True)
+        return records[0][1] if records else None
+
+    def page(self, offset: int = 0, limit: int = 20, language: str = None) -> list:
+        """Newest-first (id, record) pairs without generated code."""
+        with self._lock:
+            conn = self._connect()
+            if language:
+                rows = conn.execute(
+                    "SELECT id, data FROM projects WHERE id IN "
+                    "(SELECT project_id FROM files WHERE language = ?) "
+                    "ORDER BY id DESC LIMIT ? OFFSET ?",
+                    (language, limit, offset),
+                ).fetchall()
+            else:
+                rows = conn.execute(
+                    "SELECT id, data FROM projects ORDER BY id DESC LIMIT ? OFFSET ?", (limit, offset)
+                ).fetchall()
+            return self._load(conn, rows, with_code=False)
@@ -0,0 +1,318 @@
+"""
+Memory Store - Append-only segment log for project memory.
+Each project is one JSON line in storage/memory/segment-NNNNNN.jsonl.
+A small index.json tracks segments and counts so appends never touch
+older records; sealed segments are merged by periodic compaction.
+Records carry a stable "id" that survives compaction.
+"""
+import json
+import os
+import threading
+from itertools import islice
+from pathlib import Path
+
+SEGMENT_MAX_BYTES = int(os.getenv("MEMORY_SEGMENT_MB", "4")) * 1024 * 1024
+MAX_SEALED_SEGMENTS = int(os.getenv("MEMORY_MAX_SEGMENTS", "8"))
+READ_BLOCK = 64 * 1024
+
+LANGUAGE_BY_EXTENSION = {".py": "Python", ".html": "HTML", ".css": "CSS", ".js": "JavaScript"}
+
+
+def file_language(path: str):
+    """Language shown in Memory View for a generated file, or None."""
+    return LANGUAGE_BY_EXTENSION.get(os.path.splitext(path)[1].lower())
+
+
+class JsonlMemoryStore:
+    """Segment log of project records with O(1) appends and streaming reads."""
+
+    def __init__(self, root: Path, legacy_file: Path = None, prepare=None):
+        self.root = Path(root)
+        self.index_file = self.root / "index.json"
+        self.legacy_file = legacy_file
+        self.prepare = prepare  # Applied to legacy records as they are imported
+        self._lock = threading.Lock()
+        self._index = None
+        self._readers = 0  # Open iter_records/get calls
+        self._retired = []  # Segments merged away while readers were open; deleted when they finish
+
+    # ---------- index ----------
+
+    def _load_index(self) -> dict:
+        if self._index is not None:
+            return self._index
+        self.root.mkdir(parents=True, exist_ok=True)
+        index = None
+        if self.index_file.exists():
+            try:
+                index = json.loads(self.index_file.read_text())
+            except ValueError:
+                index = None
+        if index is None:
+            index = self._rebuild_index()
+        else:
+            self._index = index
+            if "next_id" not in index or not self._active_matches(index):
+                self._assign_ids()  # Written before ids existed, or a crash left the index behind
+            self._remove_stale_segments()
+        self._index = index
+        if self.legacy_file is not None and self.legacy_file.exists():
+            self._migrate_legacy()
+        return self._index
+
+    def _write_index(self):
+        tmp = self.index_file.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self._index))
+        os.replace(tmp, self.index_file)
+
+    def _segment_path(self, name: str) -> Path:
+        return self.root / name
+
+    def _rebuild_index(self) -> dict:
+        """Recreate the index by scanning segment files (index lost or corrupt)."""
+        names = sorted(p.name for p in self.root.glob("segment-*.jsonl"))
+        self._index = {"segments": [{"name": name} for name in names]}
+        self._assign_ids()
+        return self._index
+
+    def _active_matches(self, index: dict) -> bool:
+        """False if a crash between appending and updating the index left the active segment ahead of it."""
+        if not index["segments"]:
+            return True
+        path = self._segment_path(index["segments"][-1]["name"])
+        size = path.stat().st_size if path.exists() else 0
+        return size == index["segments"][-1]["bytes"]
+
+    def _assign_ids(self):
+        """
+        Rewrite every segment so each record has an id, in log order: records
+        from before ids existed get their old 1-based position. Torn lines and
+        records repeated by an interrupted compaction are dropped. Only runs
+        on upgrade or crash recovery.
+        """
+        next_id, segments = 1, []
+        for segment in self._index["segments"]:
+            path = self._segment_path(segment["name"])
+            records = []
+            for record in self._read_segment(segment["name"]):
+                if "id" not in record:
+                    record = {**record, "id": next_id}
+                elif record["id"] < next_id:
+                    continue  # Already kept from an earlier segment
+                records.append(record)
+                next_id = record["id"] + 1
+            if not records:
+                path.unlink(missing_ok=True)
+                continue
+            tmp = path.with_suffix(".tmp")
+            with open(tmp, "wb") as out:
+                for record in records:
+                    out.write(self._encode(record))
+            os.replace(tmp, path)
+            segments.append({"name": segment["name"], "count": len(records),
+                             "bytes": path.stat().st_size, "first_id": records[0]["id"]})
+        self._index.update(segments=segments, total=sum(s["count"] for s in segments), next_id=next_id)
+        self._write_index()
+
+    def _remove_stale_segments(self):
+        """Segments left behind by a compaction that was interrupted before deleting them."""
+        live = {s["name"] for s in self._index["segments"]}
+        for path in self.root.glob("segment-*.jsonl"):
+            if path.name not in live:
+                path.unlink(missing_ok=True)
+
+    @staticmethod
+    def _encode(record: dict) -> bytes:
+        return (json.dumps(record, separators=(",", ":")) + "\n").encode("utf-8")
+
+    def _migrate_legacy(self):
+        """Import records from the old single-file memory.json once."""
+        try:
+            records = json.loads(self.legacy_file.read_text())
+        except ValueError:
+            records = []
+        for record in records:
+            self._append_locked(self.prepare(record) if self.prepare else record)
+        os.replace(self.legacy_file, self.legacy_file.with_suffix(".json.migrated"))
+        print(f"📦 Migrated {len(records)} projects from {self.legacy_file} to {self.root}")
+
+    # ---------- writes ----------
+
+    def append(self, record: dict):
+        """Append one record and give it the next id. Cost is independent of history size."""
+        with self._lock:
+            self._load_index()
+            self._append_locked(record)
+            if len(self._index["segments"]) - 1 > MAX_SEALED_SEGMENTS:
+                self._compact_locked()
+
+    def _append_locked(self, record: dict):
+        index = self._index
+        segments = index["segments"]
+        record = {**record, "id": index["next_id"]}
+        if not segments or segments[-1]["bytes"] >= SEGMENT_MAX_BYTES:
+            number = int(segments[-1]["name"][8:14]) + 1 if segments else 1
+            segments.append({"name": f"segment-{number:06d}.jsonl", "count": 0, "bytes": 0, "first_id": record["id"]})
+
+        line = self._encode(record)
+        active = segments[-1]
+        with open(self._segment_path(active["name"]), "ab") as f:
+            f.write(line)
+        active["count"] += 1
+        active["bytes"] += len(line)
+        index["total"] += 1
+        index["next_id"] += 1
+        self._write_index()
+
+    def compact(self):
+        """Merge sealed segments into one and drop torn/corrupt lines."""
+        with self._lock:
+            self._load_index()
+            self._compact_locked()
+
+    def _compact_locked(self):
+        segments = self._index["segments"]
+        sealed, active = segments[:-1], segments[-1:]
+        if len(sealed) < 2:
+            return
+
+        # A new name, so readers still working through the old segments see them unchanged
+        generation = self._index.get("compactions", 0) + 1
+        merged_name = f"segment-{int(sealed[0]['name'][8:14]):06d}.{generation}.jsonl"
+        tmp = self._segment_path(merged_name + ".compacting")
+        count, first_id = 0, None
+        with open(tmp, "wb") as out:
+            for segment in sealed:
+                for record in self._read_segment(segment["name"]):
+                    out.write(self._encode(record))
+                    count += 1
+                    first_id = record["id"] if first_id is None else first_id
+        size = tmp.stat().st_size
+        os.replace(tmp, self._segment_path(merged_name))
+
+        merged = [{"name": merged_name, "count": count, "bytes": size, "first_id": first_id}] if count else []
+        self._index["segments"] = merged + active
+        self._index["total"] = count + sum(s["count"] for s in active)
+        self._index["compactions"] = generation
+        self._write_index()
+        retired = [s["name"] for s in sealed]
+        if self._readers:
+            self._retired.extend(retired)
+        else:
+            self._delete_segments(retired)
+
+    def _delete_segments(self, names: list):
+        for name in names:
+            self._segment_path(name).unlink(missing_ok=True)
+
+    def clear(self):
+        """Delete every segment and the index."""
+        with self._lock:
+            if self.root.exists():
+                for path in self.root.iterdir():
+                    path.unlink()
+            self._index = None
+            self._retired = []
+
+    # ---------- reads ----------
+
+    def _start_reading(self) -> list:
+        """Snapshot the segments; none of them is deleted until _stop_reading()."""
+        with self._lock:
+            self._readers += 1
+            return [dict(s) for s in self._load_index()["segments"]]
+
+    def _stop_reading(self):
+        with self._lock:
+            self._readers -= 1
+            if self._readers == 0 and self._retired:
+                self._delete_segments(self._retired)
+                self._retired = []
+
+    def count(self) -> int:
+        with self._lock:
+            return self._load_index()["total"]
+
+    def size_bytes(self) -> int:
+        with self._lock:
+            return sum(s["bytes"] for s in self._load_index()["segments"])
+
+    def _read_segment(self, name: str):
+        path = self._segment_path(name)
+        if not path.exists():
+            return
+        with open(path, "rb") as f:
+            for line in f:
+                record = self._parse(line)
+                if record is not None:
+                    yield record
+
+    def _read_segment_reversed(self, name: str):
+        """Yield a segment's records newest-first by reading blocks from the end."""
+        path = self._segment_path(name)
+        if not path.exists():
+            return
+        with open(path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            position = f.tell()
+            tail = b""
+            while position > 0:
+                step = min(READ_BLOCK, position)
+                position -= step
+                f.seek(position)
+                lines = (f.read(step) + tail).split(b"\n")
+                tail = lines.pop(0)  # May be a partial line; completed by the next block
+                for line in reversed(lines):
+                    record = self._parse(line)
+                    if record is not None:
+                        yield record
+            record = self._parse(tail)
+            if record is not None:
+                yield record
+
+    @staticmethod
+    def _parse(line: bytes):
+        line = line.strip()
+        if not line:
+            return None
+        try:
+            return json.loads(line)
+        except ValueError:
+            return None  # Torn write from a crash; compaction drops it
+
+    def iter_records(self, reverse: bool = False):
+        """Stream records oldest-first (or newest-first) without loading the history."""
+        names = [s["name"] for s in self._start_reading()]
+        try:
+            if reverse:
+                for name in reversed(names):
+                    yield from self._read_segment_reversed(name)
+            else:
+                for name in names:
+                    yield from self._read_segment(name)
+        finally:
+            self._stop_reading()
+
+    def get(self, record_id: int):
+        """Record with this id, scanning only the segment holding it."""
+        segments = self._start_reading()
+        try:
+            holding = [s for s in segments if s["first_id"] <= record_id]
+            if not holding:
+                return None
+            for record in self._read_segment(holding[-1]["name"]):
+                if record["id"] >= record_id:
+                    return record if record["id"] == record_id else None
+            return None
+        finally:
+            self._stop_reading()
+
+    def page(self, offset: int = 0, limit: int = 20, language: str = None) -> list:
+        """Newest-first (id, record) pairs."""
+        numbered = ((record["id"], record) for record in self.iter_records(reverse=True))
+        if language:
+            numbered = (
+                (n, r) for n, r in numbered
+                if any(file_language(f) == language for f in r.get("code_files", []))
+            )
+        return list(islice(numbered, offset, offset + limit))
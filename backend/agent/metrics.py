@@ -0,0 +1,161 @@
+"""
+Metrics - In-process counters and histograms for /metrics.
+Rendered in the Prometheus text exposition format, so any scraper can
+read them without a client library or a separate collector.
+"""
+import threading
+
+# Seconds; covers fast API routes through multi-minute builds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+_registry = []  # Metrics in registration order
+_lock = threading.Lock()
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic count per label set."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values = {}
+        _register(self)
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(str(labels[name]) for name in self.labels)
+        with _lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        key = tuple(str(labels[name]) for name in self.labels)
+        with _lock:
+            return self._values.get(key, 0)
+
+    def lines(self) -> list:
+        with _lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labels, key)} {_format_value(value)}" for key, value in items]
+
+
+class Histogram:
+    """Cumulative bucket counts, sum and count per label set."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        self._series = {}  # labels -> [bucket counts, sum, count]
+        _register(self)
+
+    def observe(self, value: float, **labels):
+        key = tuple(str(labels[name]) for name in self.labels)
+        with _lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+                    break
+            series[1] += value
+            series[2] += 1
+
+    def count(self, **labels) -> int:
+        key = tuple(str(labels[name]) for name in self.labels)
+        with _lock:
+            series = self._series.get(key)
+            return series[2] if series else 0
+
+    def lines(self) -> list:
+        with _lock:
+            items = sorted((key, [list(s[0]), s[1], s[2]]) for key, s in self._series.items())
+        lines = []
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(float(bound))}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {_format_value(round(total, 6))}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {count}")
+        return lines
+
+
+class Collected:
+    """
+    A gauge or counter read from elsewhere at scrape time.
+    fn returns a number, or a dict of label-value tuples -> number.
+    """
+
+    def __init__(self, name: str, help: str, fn, labels=(), kind: str = "gauge"):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.kind = kind
+        self.fn = fn
+        _register(self)
+
+    def lines(self) -> list:
+        try:
+            values = self.fn()
+        except Exception as e:
+            print(f"⚠️ Metric {self.name} failed: {e}")
+            return []
+        if not isinstance(values, dict):
+            values = {(): values}
+        return [
+            f"{self.name}{_format_labels(self.labels, key)} {_format_value(float(value))}"
+            for key, value in sorted(values.items())
+        ]
+
+
+def _register(metric):
+    with _lock:
+        _registry[:] = [m for m in _registry if m.name != metric.name]  # Re-registration replaces
+        _registry.append(metric)
+
+
+def render_metrics() -> str:
+    """Every registered metric in the text exposition format."""
+    with _lock:
+        metrics = list(_registry)
+    out = []
+    for metric in metrics:
+        out.append(f"# HELP {metric.name} {metric.help}")
+        out.append(f"# TYPE {metric.name} {metric.kind}")
+        out.extend(metric.lines())
+    return "\n".join(out) + "\n"
+
+
+# ---------- metrics recorded by the backend ----------
+
+HTTP_REQUESTS = Counter("autogenesis_http_requests_total", "HTTP requests by route and status.", ("method", "route", "status"))
+HTTP_LATENCY = Histogram("autogenesis_http_request_duration_seconds", "Time until response headers, by route.", ("method", "route"))
+LLM_REQUESTS = Counter("autogenesis_llm_requests_total", "Provider requests by outcome (ok, error, throttled, timeout).", ("provider", "mode", "outcome"))
+LLM_LATENCY = Histogram("autogenesis_llm_request_duration_seconds", "Latency of successful provider requests.", ("provider", "mode"))
+LLM_FALLBACKS = Counter("autogenesis_llm_fallbacks_total", "Calls answered with mock output because no provider could.", ("mode",))
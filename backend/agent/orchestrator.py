@@ -3,14 +3,34 @@ Advanced Orchestrator with All Features.
 Generates: Code, Tests, CI/CD, Deploy configs
 """
 from .planner import generate_plan
-from .coder import generate_file
+from .coder import generate_file, patch_code
 from .reviewer import review_code
-from .memory import save_memory, get_learning_context
+from .memory import save_memory, get_learning_context, find_project
 from .intelligence import add_project_xp, get_intelligence
-from .capabilities import generate_cicd_pipeline, generate_unit_tests, generate_dockerfile
+from .capabilities import generate_cicd_pipeline, generate_unit_tests, generate_dockerfile, get_test_filename, CICD_PATH
+from .scheduler import run_graph
+from .singleflight import SharedStream
+from .workspaces import new_job_id, create_workspace, release_workspace, get_workspace
+from .checkpoints import Checkpoints
+from .agent import fallback_count
+from .tracing import Trace, mark_checkpoint
 import os
 import json
-import shutil
+import threading
+
+# Max number of pipeline phases (LLM calls) in flight at once
+MAX_PARALLEL_PHASES = int(os.getenv("MAX_PARALLEL_PHASES", "4"))
+
+# Forward generated code token-by-token as "code_delta" events
+STREAM_CODE = os.getenv("STREAM_CODE", "true").lower() == "true"
+
+# Improve mode patches the previous build's files instead of regenerating them
+INCREMENTAL_IMPROVE = os.getenv("INCREMENTAL_IMPROVE", "true").lower() == "true"
+
+# Concurrent builds of the same idea share one pipeline run
+COALESCE_BUILDS = os.getenv("COALESCE_BUILDS", "true").lower() == "true"
+_running_builds = {}  # (idea, auto_deploy, improve_mode, previous_job) -> SharedStream
+_builds_lock = threading.Lock()
 
 # Improvement prompts for "Build Again But Better"
 IMPROVEMENT_INSTRUCTIONS = """
@@ -22,8 +42,69 @@ IMPROVEMENT MODE - Generate ENHANCED code with:
 5. PRODUCTION READY: Add logging, type hints, docstrings
 """
 
-def run_pipeline_streaming(idea: str, auto_deploy: bool = False, improve_mode: bool = False):
-    """Generator that yields progress updates."""
+def review_issues(review: dict) -> list:
+    """Problems listed by a review (reviewers report "errors", older records "issues")."""
+    return (review or {}).get("errors") or (review or {}).get("issues") or []
+
+def load_previous_build(idea: str, previous_job: str = None):
+    """
+    Files, plan and known reviews of the last build of this idea, taken from
+    its workspace (when previous_job is given) or from memory. None if unknown.
+    """
+    workspace = get_workspace(previous_job) if previous_job else None
+    if workspace is not None:
+        previous_checkpoints = Checkpoints(workspace)
+        plan = previous_checkpoints.latest("plan")
+        if plan and plan.get("files"):
+            files = {}
+            for file_info in plan["files"]:
+                path = workspace / file_info.get("path", "")
+                if path.is_file():
+                    files[file_info["path"]] = path.read_text(encoding="utf-8")
+            main_file = plan["files"][0].get("path")
+            reviews = {p: previous_checkpoints.latest(f"review:{p}") for p in files}
+            reviews[main_file] = previous_checkpoints.latest("review")
+            return {
+                "plan": plan,
+                "files": files,
+                "reviews": {p: r for p, r in reviews.items() if r is not None},
+                "checkpoints": previous_checkpoints,
+            }
+    
+    project = find_project(idea)
+    if project and project.get("plan", {}).get("files") and project.get("all_code"):
+        main_file = project["plan"]["files"][0].get("path")
+        reviews = {main_file: project["review"]} if project.get("review") else {}
+        return {"plan": project["plan"], "files": project["all_code"], "reviews": reviews, "checkpoints": None}
+    return None
+
+def traced_node(trace: Trace, name: str, fn):
+    """Run a graph node inside a trace span; all file:* nodes share the "code" stage."""
+    stage = "code" if name.startswith("file:") else name
+    def run(*args):
+        with trace.span(name, stage):
+            return fn(*args)
+    return run
+
+def run_pipeline_streaming(idea: str, auto_deploy: bool = False, improve_mode: bool = False, job_id: str = None, resume: bool = False, previous_job: str = None, stream_code: bool = None):
+    """
+    Generator that yields progress updates. Files go to the build's own workspace.
+    With resume=True and the job_id of an earlier build, phases whose
+    checkpointed inputs are unchanged are reused instead of rerun.
+    In improve mode, previous_job (or the newest build of the idea in memory)
+    is patched file by file instead of regenerated.
+    stream_code=False skips code_delta events (defaults to STREAM_CODE).
+    """
+    resume = resume and job_id is not None
+    job_id = job_id or new_job_id()
+    output_dir = str(create_workspace(job_id, keep_existing=resume, previous_job=previous_job))
+    try:
+        yield from _run_build(idea, auto_deploy, improve_mode, job_id, output_dir, resume, previous_job,
+                              STREAM_CODE if stream_code is None else stream_code)
+    finally:
+        release_workspace(job_id, previous_job)
+
+def _run_build(idea: str, auto_deploy: bool, improve_mode: bool, job_id: str, output_dir: str, resume: bool, previous_job: str, stream_code: bool):
     def progress(step: str, message: str, percent: int, data: dict = None):
         return json.dumps({
             "step": step,
@@ -32,35 +113,61 @@ def run_pipeline_streaming(idea: str, auto_deploy: bool = False, improve_mode: b
             "data": data or {}
         })
     
+    previous = load_previous_build(idea, previous_job) if improve_mode and INCREMENTAL_IMPROVE else None
+    
+    checkpoints = Checkpoints(output_dir)
+    sources = [checkpoints] if resume else []
+    if previous and previous["checkpoints"]:
+        sources.append(previous["checkpoints"])  # Unchanged inputs reuse the previous build's work
+    restored = set()  # Phases reused from a checkpoint
+    trace = Trace(job_id)
+    
+    def checkpointed(phase: str, inputs, fn):
+        """Run a phase, or reuse a checkpoint saved with the same inputs."""
+        for source in sources:
+            saved = source.load(phase, inputs)
+            if saved is not None:
+                restored.add(phase)
+                mark_checkpoint()
+                if source is not checkpoints:
+                    checkpoints.save(phase, inputs, saved)
+                return saved
+        before = fallback_count()
+        result = fn()
+        if fallback_count() == before:  # Don't keep mock output from a provider failure
+            checkpoints.save(phase, inputs, result)
+        return result
+    
     mode_label = "IMPROVED" if improve_mode else "standard"
+    if previous:
+        mode_label = "incremental IMPROVED"
     intel_start = get_intelligence()
-    yield progress("start", f"Starting {mode_label} build... (Level {intel_start['level']}%)", 3, {"intelligence": intel_start})
-    
-    # Clear output folder
-    output_dir = "output"
-    if os.path.exists(output_dir):
-        shutil.rmtree(output_dir)
-    os.makedirs(output_dir, exist_ok=True)
+    yield progress("start", f"Starting {mode_label} build... (Level {intel_start['level']}%)", 3, {"intelligence": intel_start, "job_id": job_id})
     
     # Phase 1: Learning
     yield progress("learning", "Checking context...", 5)
-    learning_context = get_learning_context(idea)
+    with trace.span("learning"):
+        learning_context = get_learning_context(idea)
     learned = bool(learning_context)
     
     # Phase 2: Planning
-    yield progress("planning", "Planning project...", 10)
     plan_idea = idea
     if improve_mode:
         plan_idea = f"{idea}\n\nCREATE AN IMPROVED VERSION with better architecture and more modular design."
-    plan = generate_plan(plan_idea)
+    if previous:
+        yield progress("planning", "Reusing previous plan...", 10)
+        plan = previous["plan"]
+        checkpoints.save("plan", {"idea": plan_idea}, plan)
+    else:
+        yield progress("planning", "Planning project...", 10)
+        with trace.span("plan"):
+            plan = checkpointed("plan", {"idea": plan_idea}, lambda: generate_plan(plan_idea))
     files_to_generate = plan.get("files", [{"path": "main.py", "description": "Main"}])
-    tech_stack = plan.get("tech_stack", ["Python"])
     yield progress("planning", f"{len(files_to_generate)} files planned", 15, {"plan": plan})
     
-    # Phase 3: Generate source files
-    generated_files = {}
+    # Phase 3: Build the prompt for every planned source file
     languages_used = set()
-    total_files = len(files_to_generate)
+    file_prompts = {}
     
     for i, file_info in enumerate(files_to_generate):
         file_path = file_info.get("path", f"file_{i}.py")
@@ -68,9 +175,6 @@ def run_pipeline_streaming(idea: str, auto_deploy: bool = False, improve_mode: b
         file_lang = file_info.get("language", "Python")
         languages_used.add(file_lang)
         
-        file_percent = 20 + int((i / total_files) * 30)
-        yield progress("coding", f"Writing {file_path}..." + (" (enhanced)" if improve_mode else ""), file_percent)
-        
         other_files = [f["path"] for f in files_to_generate if f["path"] != file_path]
         full_prompt = f"PROJECT: {idea}\nFILE: {file_path}\nPURPOSE: {file_desc}\nLANGUAGE: {file_lang}\nOTHER FILES: {other_files}"
         
@@ -78,67 +182,170 @@ def run_pipeline_streaming(idea: str, auto_deploy: bool = False, improve_mode: b
         if improve_mode:
             full_prompt = IMPROVEMENT_INSTRUCTIONS + "\n\n" + full_prompt
         
-        code = generate_file(full_prompt, file_path)
-        generated_files[file_path] = code
-        
-        output_path = os.path.join(output_dir, file_path)
+        file_prompts[file_path] = full_prompt
+    
+    # Phases 4-7 only need the file list or the main file, so they are
+    # scheduled as a dependency graph alongside the per-file generation.
+    main_file = list(file_prompts.keys())[0]
+    project_type = "python" if any("Python" in lang for lang in languages_used) else "javascript"
+    planned_paths = list(file_prompts.keys()) + [get_test_filename(main_file)]
+    
+    def write_output(path: str, content: str):
+        output_path = os.path.join(output_dir, path)
         os.makedirs(os.path.dirname(output_path) if os.path.dirname(output_path) else output_dir, exist_ok=True)
         with open(output_path, "w", encoding="utf-8") as f:
-            f.write(code)
+            f.write(content)
+    
+    def file_node(path: str, prompt: str):
+        def run(deps, emit):
+            on_delta = None
+            if stream_code:
+                on_delta = lambda text, reset=False: emit({"delta": text, "reset": reset})
+            code = checkpointed(f"file:{path}", {"prompt": prompt}, lambda: generate_file(prompt, path, on_delta=on_delta))
+            write_output(path, code)
+            return code
+        return run
+    
+    outcomes = {}  # Incremental improve: path -> "kept" | "patched" | "rewritten" | "generated"
     
-    yield progress("coding", f"Generated {len(generated_files)} source files", 50)
+    def improve_node(path: str, prompt: str):
+        """
+        Patch the previous version of a file if its stored review lists issues.
+        Files with no stored review are kept: the plan is reused, so nothing
+        changed them, and reviewing each one would cost a call per file.
+        """
+        generate = file_node(path, prompt)
+        def run(deps, emit):
+            code = previous["files"].get(path)
+            if code is None:
+                outcomes[path] = "generated"  # New in the plan; nothing to patch
+                return generate(deps, emit)
+            review = previous["reviews"].get(path)
+            if review is not None:
+                checkpoints.save(f"review:{path}", {"code": code}, review)
+            issues = review_issues(review)
+            if issues:
+                inputs = {"code": code, "issues": issues}
+                outcomes[path] = "patched"
+                def patch():
+                    new_code, how = patch_code(code, issues, idea, path)
+                    outcomes[path] = how
+                    return new_code
+                code = checkpointed(f"patch:{path}", inputs, patch)
+            else:
+                outcomes[path] = "kept"
+            write_output(path, code)
+            return code
+        return run
     
-    # Phase 4: Generate Unit Tests
-    yield progress("testing", "Generating unit tests...", 55)
-    main_file = list(generated_files.keys())[0]
-    main_code = generated_files[main_file]
-    test_result = generate_unit_tests(main_code, main_file)
+    def tests_node(deps):
+        code = deps[f"file:{main_file}"]
+        result = checkpointed("tests", {"code": code, "file": main_file}, lambda: generate_unit_tests(code, main_file))
+        if result["content"]:
+            write_output(result["path"], result["content"])
+        return result
+    
+    def cicd_node(deps):
+        inputs = {"type": project_type, "paths": planned_paths}
+        result = checkpointed("cicd", inputs, lambda: generate_cicd_pipeline(project_type, planned_paths))
+        if result["content"]:
+            write_output(result["path"], result["content"])
+        return result
+    
+    def dockerfile_node(deps):
+        paths = planned_paths + [CICD_PATH]
+        result = checkpointed("dockerfile", {"type": project_type, "paths": paths}, lambda: generate_dockerfile(project_type, paths))
+        if result["content"]:
+            write_output("Dockerfile", result["content"])
+        return result
+    
+    def review_node(deps):
+        code = deps[f"file:{main_file}"]
+        if previous and previous["files"].get(main_file) == code and main_file in previous["reviews"]:
+            restored.add("review")  # Main file unchanged since its last review
+            mark_checkpoint()
+            return previous["reviews"][main_file]
+        return checkpointed("review", {"code": code}, lambda: review_code(code))
+    
+    make_node = improve_node if previous else file_node
+    graph = {f"file:{path}": {"fn": make_node(path, prompt), "deps": [], "emits": True} for path, prompt in file_prompts.items()}
+    graph["tests"] = {"fn": tests_node, "deps": [f"file:{main_file}"]}
+    graph["review"] = {"fn": review_node, "deps": [f"file:{main_file}"]}
+    graph["cicd"] = {"fn": cicd_node, "deps": []}
+    graph["dockerfile"] = {"fn": dockerfile_node, "deps": []}
+    for name, node in graph.items():
+        node["fn"] = traced_node(trace, name, node["fn"])
+    
+    phase_messages = {
+        "tests": ("testing", "Generating unit tests...", lambda r: f"Tests generated: {r['path']}"),
+        "review": ("reviewing", "Reviewing code...", lambda r: "Review complete"),
+        "cicd": ("cicd", "Creating CI/CD pipeline...", lambda r: "CI/CD pipeline ready"),
+        "dockerfile": ("deploy", "Creating Dockerfile...", lambda r: "Dockerfile ready"),
+    }
+    enhanced = " (enhanced)" if improve_mode else ""
+    
+    # Progress runs from 20% to 85% as graph nodes complete
+    results = {}
+    completed = 0
+    percent = 20
+    for event, name, result in run_graph(graph, max_workers=MAX_PARALLEL_PHASES):
+        if name.startswith("file:"):
+            step = "coding"
+            started_msg = f"Improving {name[5:]}..." if previous else f"Writing {name[5:]}...{enhanced}"
+            done_msg = {
+                "kept": f"Kept {name[5:]} (no issues)",
+                "patched": f"Patched {name[5:]}",
+                "rewritten": f"Rewrote {name[5:]}",
+            }.get(outcomes.get(name[5:]), f"Wrote {name[5:]}")
+        else:
+            step, started_msg, done_fn = phase_messages[name]
+            done_msg = done_fn(result) if event == "done" else ""
+        
+        if event == "started":
+            yield progress(step, started_msg, percent)
+            continue
+        
+        if event == "emit":
+            # Raw tokens as they stream in; "reset" means drop what was sent for this file
+            yield progress("code_delta", started_msg, percent, {"file": name[5:], **result})
+            continue
+        
+        results[name] = result
+        completed += 1
+        percent = 20 + int((completed / len(graph)) * 65)
+        if name in restored:
+            done_msg += " (from checkpoint)"
+        yield progress(step, f"{done_msg} ({completed}/{len(graph)})", percent)
+    
+    # Assemble outputs in the same order as the sequential pipeline
+    generated_files = {path: results[f"file:{path}"] for path in file_prompts}
+    test_result = results["tests"]
+    cicd_result = results["cicd"]
+    docker_result = results["dockerfile"]
+    review = results["review"]
     if test_result["content"]:
         generated_files[test_result["path"]] = test_result["content"]
-        with open(os.path.join(output_dir, test_result["path"]), "w", encoding="utf-8") as f:
-            f.write(test_result["content"])
-    yield progress("testing", f"Tests generated: {test_result['path']}", 60)
-    
-    # Phase 5: Generate CI/CD Pipeline
-    yield progress("cicd", "Creating CI/CD pipeline...", 65)
-    project_type = "python" if any("Python" in lang for lang in languages_used) else "javascript"
-    cicd_result = generate_cicd_pipeline(project_type, list(generated_files.keys()))
     if cicd_result["content"]:
-        cicd_path = cicd_result["path"]
-        generated_files[cicd_path] = cicd_result["content"]
-        full_cicd_path = os.path.join(output_dir, cicd_path)
-        os.makedirs(os.path.dirname(full_cicd_path), exist_ok=True)
-        with open(full_cicd_path, "w", encoding="utf-8") as f:
-            f.write(cicd_result["content"])
-    yield progress("cicd", "CI/CD pipeline ready", 70)
-    
-    # Phase 6: Generate Dockerfile
-    yield progress("deploy", "Creating Dockerfile...", 75)
-    docker_result = generate_dockerfile(project_type, list(generated_files.keys()))
+        generated_files[cicd_result["path"]] = cicd_result["content"]
     if docker_result["content"]:
         generated_files["Dockerfile"] = docker_result["content"]
-        with open(os.path.join(output_dir, "Dockerfile"), "w", encoding="utf-8") as f:
-            f.write(docker_result["content"])
-    yield progress("deploy", "Dockerfile ready", 80)
-    
-    # Phase 7: Review
-    yield progress("reviewing", "Reviewing code...", 85)
-    review = review_code(main_code)
-    issues_count = len(review.get("issues", []))
+    issues_count = len(review_issues(review))
     
     # Phase 8: Update Intelligence
     yield progress("learning", "Learning from project...", 90)
-    xp_result = add_project_xp(
-        files_generated=len(generated_files),
-        issues_found=issues_count,
-        languages=list(languages_used)
-    )
+    with trace.span("intelligence"):
+        xp_result = add_project_xp(
+            files_generated=len(generated_files),
+            issues_found=issues_count,
+            languages=list(languages_used)
+        )
     
     intel_end = get_intelligence()
     yield progress("learning", f"+{xp_result['xp_gained']} XP", 95, {"xp_gained": xp_result["xp_gained"], "intelligence": intel_end})
     
     # Build result
     result = {
+        "job_id": job_id,
         "idea": idea,
         "plan": plan,
         "code_files": list(generated_files.keys()),
@@ -149,6 +356,7 @@ def run_pipeline_streaming(idea: str, auto_deploy: bool = False, improve_mode: b
         "total_iterations": 1,
         "deploy": {"success": True, "message": "Dockerfile + CI/CD ready"},
         "learned_from": learned,
+        "improvements": outcomes,
         "xp_gained": xp_result["xp_gained"],
         "intelligence": intel_end,
         "extras": {
@@ -157,14 +365,45 @@ def run_pipeline_streaming(idea: str, auto_deploy: bool = False, improve_mode: b
             "dockerfile": "Dockerfile"
         }
     }
-    save_memory(result)
+    with trace.span("save"):
+        save_memory(result)
+    result["trace"] = trace.summary()  # Per-build timings; not stored in memory
     
     yield progress("complete", f"Done! {len(generated_files)} files", 100, result)
 
-def run_pipeline(idea: str, auto_deploy: bool = False, improve_mode: bool = False):
-    """Non-streaming version."""
+def run_pipeline_shared(idea: str, auto_deploy: bool = False, improve_mode: bool = False, previous_job: str = None, stream_code: bool = None):
+    """
+    Streaming pipeline with single-flight coalescing.
+    Concurrent requests for the same idea attach to one running build and
+    all receive its full event stream, including events sent before they joined.
+    stream_code applies to a build this call starts, not to one it joins.
+    """
+    idea = idea.strip()
+    if not COALESCE_BUILDS:
+        yield from run_pipeline_streaming(idea, auto_deploy, improve_mode, previous_job=previous_job, stream_code=stream_code)
+        return
+    
+    key = (idea, auto_deploy, improve_mode, previous_job)
+    
+    def release(stream):
+        with _builds_lock:
+            if _running_builds.get(key) is stream:
+                del _running_builds[key]
+    
+    with _builds_lock:
+        stream = _running_builds.get(key)
+        if stream is None:
+            build = run_pipeline_streaming(idea, auto_deploy, improve_mode, previous_job=previous_job, stream_code=stream_code)
+            stream = SharedStream(build, on_finish=release)
+            _running_builds[key] = stream
+            stream.start()
+    
+    yield from stream.subscribe()
+
+def run_pipeline(idea: str, auto_deploy: bool = False, improve_mode: bool = False, previous_job: str = None):
+    """Non-streaming version. Code is not streamed, so file calls can be coalesced and hedged."""
     result = None
-    for update in run_pipeline_streaming(idea, auto_deploy, improve_mode):
+    for update in run_pipeline_shared(idea, auto_deploy, improve_mode, previous_job, stream_code=False):
         data = json.loads(update)
         if data["step"] == "complete":
             result = data["data"]
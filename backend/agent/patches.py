@@ -0,0 +1,80 @@
+"""
+Patch Utilities - Apply unified diffs returned by the LLM to local files.
+Hunks are matched by their context lines, so small line-number drift in
+model output is tolerated; anything else raises PatchError.
+"""
+import re
+
+HUNK_HEADER = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+
+
+class PatchError(ValueError):
+    pass
+
+
+def extract_diff(text: str) -> str:
+    """Pull the diff out of a model reply that may wrap it in a code fence."""
+    match = re.search(r"```(?:diff|patch)?\n([\s\S]*?)```", text)
+    return match.group(1) if match else text
+
+
+def parse_hunks(diff: str) -> list:
+    """[(old_start, old_lines, new_lines)] from a unified diff."""
+    hunks = []
+    current = None
+    for line in diff.splitlines():
+        header = HUNK_HEADER.match(line)
+        if header:
+            current = (int(header.group(1)), [], [])
+            hunks.append(current)
+            continue
+        if current is None or line.startswith(("---", "+++")):
+            continue
+        if line.startswith("\\"):  # "\ No newline at end of file"
+            continue
+        tag, text = (line[0], line[1:]) if line else (" ", "")
+        if tag == " ":
+            current[1].append(text)
+            current[2].append(text)
+        elif tag == "-":
+            current[1].append(text)
+        elif tag == "+":
+            current[2].append(text)
+        else:
+            raise PatchError(f"Unexpected diff line: {line[:40]!r}")
+    if not hunks:
+        raise PatchError("No hunks found in diff")
+    return hunks
+
+
+def _find(lines: list, block: list, hint: int, start: int) -> int:
+    """Index where block occurs in lines at or after start, nearest to hint."""
+    if not block:
+        return max(start, min(hint, len(lines)))
+    matches = [
+        i for i in range(start, len(lines) - len(block) + 1)
+        if lines[i:i + len(block)] == block
+    ]
+    if not matches:
+        # Models often get trailing whitespace wrong; retry ignoring it
+        stripped = [l.rstrip() for l in block]
+        matches = [
+            i for i in range(start, len(lines) - len(block) + 1)
+            if [l.rstrip() for l in lines[i:i + len(block)]] == stripped
+        ]
+    if not matches:
+        raise PatchError(f"Hunk context not found near line {hint + 1}")
+    return min(matches, key=lambda i: abs(i - hint))
+
+
+def apply_patch(original: str, diff: str) -> str:
+    """Apply a unified diff to a file's text and return the new text."""
+    lines = original.split("\n")
+    result = []
+    position = 0
+    for old_start, old_lines, new_lines in parse_hunks(diff):
+        at = _find(lines, old_lines, max(0, old_start - 1), position)
+        result += lines[position:at] + new_lines
+        position = at + len(old_lines)
+    result += lines[position:]
+    return "\n".join(result)
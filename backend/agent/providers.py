@@ -0,0 +1,219 @@
+"""
+Provider Pool - Load balances LLM calls across several Groq keys and Gemini.
+Routes by weighted least-outstanding-requests and trips a circuit breaker
+on backends that keep failing, so each request can fail over on its own.
+"""
+import os
+import threading
+import time
+
+from .ratelimit import RateLimiter
+
+# Circuit breaker: open after N consecutive errors, retry after the cooldown
+FAILURE_THRESHOLD = int(os.getenv("PROVIDER_FAILURE_THRESHOLD", "3"))
+COOLDOWN_SECONDS = float(os.getenv("PROVIDER_COOLDOWN", "30"))
+
+# Provider kind -> {"client": fn(api_key), "async_client": fn(api_key, http_client) or None}.
+# Factories import their SDK when first called, so no SDK loads until a request needs it.
+_registry = {}
+
+
+def register_provider(kind: str, client, async_client=None):
+    """Register how to build SDK clients for a provider kind."""
+    _registry[kind] = {"client": client, "async_client": async_client}
+
+
+def registered_kinds() -> list:
+    return list(_registry)
+
+
+def _groq_client(api_key: str):
+    from groq import Groq
+    # SDK retries are off so 429s reach our limiter instead of being retried blindly
+    return Groq(api_key=api_key, max_retries=0)
+
+
+def _groq_async_client(api_key: str, http_client):
+    from groq import AsyncGroq
+    return AsyncGroq(api_key=api_key, http_client=http_client, max_retries=0)
+
+
+def _gemini_client(api_key: str):
+    import google.generativeai as genai
+    genai.configure(api_key=api_key)
+    return genai
+
+
+register_provider("groq", _groq_client, _groq_async_client)
+register_provider("gemini", _gemini_client)
+
+
+class Backend:
+    """One provider endpoint (a single API key) with its own limiter and health."""
+
+    def __init__(self, name: str, kind: str, api_key: str, weight: float = 1.0,
+                 rpm: int = 0, tpm: int = 0, max_in_flight: int = 8):
+        self.name = name
+        self.kind = kind  # "groq" or "gemini"
+        self.api_key = api_key
+        self.weight = max(weight, 0.01)
+        self.limiter = RateLimiter(name, rpm=rpm, tpm=tpm, max_in_flight=max_in_flight)
+        self.outstanding = 0
+        self.consecutive_errors = 0
+        self.open_until = 0.0
+        self.requests = 0
+        self.errors = 0
+        self._client = None
+        self._async_client = None
+
+    def available(self, now: float) -> bool:
+        """Closed circuit, or open circuit whose cooldown has passed (half-open)."""
+        return now >= self.open_until
+
+    def get_client(self):
+        """Lazily build the sync SDK client."""
+        if self._client is None:
+            self._client = _registry[self.kind]["client"](self.api_key)
+        return self._client
+
+    def get_async_client(self, http_client):
+        """Lazily build the async client on the shared pooled connection."""
+        if self._async_client is None:
+            factory = _registry[self.kind]["async_client"]
+            if factory is None:
+                raise ValueError(f"Provider '{self.kind}' has no async client")
+            self._async_client = factory(self.api_key, http_client)
+        return self._async_client
+
+    def reset_async_client(self):
+        self._async_client = None
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        return {
+            "name": self.name,
+            "kind": self.kind,
+            "weight": self.weight,
+            "healthy": self.open_until <= now,
+            "outstanding": self.outstanding,
+            "requests": self.requests,
+            "errors": self.errors,
+            "consecutive_errors": self.consecutive_errors,
+            "circuit_open_for": round(max(0.0, self.open_until - now), 1),
+            "rate_limiter": self.limiter.stats(),
+        }
+
+
+class ProviderPool:
+    """Picks a backend per request and tracks its health."""
+
+    def __init__(self, backends: list):
+        self.backends = backends
+        self._lock = threading.Lock()
+
+    def kinds(self) -> list:
+        """Provider kinds in the pool, in priority order."""
+        seen = []
+        for backend in self.backends:
+            if backend.kind not in seen:
+                seen.append(backend.kind)
+        return seen
+
+    def pick(self, exclude=()):
+        """
+        Reserve the backend with the fewest outstanding requests per unit of weight.
+        Returns None when every backend is excluded or its circuit is open.
+        """
+        with self._lock:
+            now = time.monotonic()
+            candidates = [b for b in self.backends if b.name not in exclude and b.available(now)]
+            if not candidates:
+                return None
+            backend = min(candidates, key=lambda b: (b.outstanding + 1) / b.weight)
+            backend.outstanding += 1
+            backend.requests += 1
+            if backend.open_until:
+                # Half-open: let this one trial through, hold others back until it reports
+                backend.open_until = now + COOLDOWN_SECONDS
+            return backend
+
+    def record_success(self, backend: Backend):
+        with self._lock:
+            backend.outstanding -= 1
+            backend.consecutive_errors = 0
+            backend.open_until = 0.0
+
+    def record_failure(self, backend: Backend, counts_as_error: bool = True):
+        """Throttling (counts_as_error=False) doesn't trip the breaker."""
+        with self._lock:
+            backend.outstanding -= 1
+            if not counts_as_error:
+                return
+            backend.errors += 1
+            backend.consecutive_errors += 1
+            if backend.consecutive_errors >= FAILURE_THRESHOLD:
+                backend.open_until = time.monotonic() + COOLDOWN_SECONDS
+                print(f"⚠️ Provider {backend.name} marked unhealthy for {COOLDOWN_SECONDS}s")
+
+    def stats(self) -> list:
+        with self._lock:
+            return [b.stats() for b in self.backends]
+
+
+class LazyPool:
+    """
+    Stands in for the provider pool until first use, then builds it.
+    Importing the agent never reads keys or touches SDKs.
+    """
+
+    def __init__(self, build):
+        self._build = build
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def get(self) -> ProviderPool:
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = self._build()
+        return self._pool
+
+    def loaded(self) -> bool:
+        return self._pool is not None
+
+    def __getattr__(self, name):
+        return getattr(self.get(), name)
+
+
+def build_pool_from_env() -> ProviderPool:
+    """
+    Build the pool from env:
+    GROQ_API_KEY / GROQ_API_KEYS (comma separated), GEMINI_API_KEY,
+    GROQ_WEIGHT / GEMINI_WEIGHT, GROQ_RPM / GROQ_TPM, GEMINI_RPM / GEMINI_TPM.
+    """
+    groq_keys = []
+    for key in [os.getenv("GROQ_API_KEY")] + os.getenv("GROQ_API_KEYS", "").split(","):
+        key = (key or "").strip()
+        if key and key not in groq_keys:
+            groq_keys.append(key)
+    gemini_key = os.getenv("GEMINI_API_KEY")
+    max_in_flight = int(os.getenv("LLM_MAX_IN_FLIGHT", "8"))
+
+    backends = []
+    for i, key in enumerate(groq_keys):
+        backends.append(Backend(
+            f"groq-{i + 1}", "groq", key,
+            weight=float(os.getenv("GROQ_WEIGHT", "1.0")),
+            rpm=int(os.getenv("GROQ_RPM", "30")),
+            tpm=int(os.getenv("GROQ_TPM", "30000")),
+            max_in_flight=max_in_flight,
+        ))
+    if gemini_key:
+        backends.append(Backend(
+            "gemini", "gemini", gemini_key,
+            weight=float(os.getenv("GEMINI_WEIGHT", "0.5")),
+            rpm=int(os.getenv("GEMINI_RPM", "15")),
+            tpm=int(os.getenv("GEMINI_TPM", "0")),
+            max_in_flight=max_in_flight,
+        ))
+    return ProviderPool(backends)
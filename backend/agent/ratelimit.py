@@ -0,0 +1,184 @@
+"""
+Client-side Rate Limiter - Token buckets for requests/min and tokens/min.
+Callers queue (FIFO) for capacity instead of failing, and the limiter backs
+off on 429 / retry-after responses with adaptive concurrency (AIMD).
+"""
+import asyncio
+import threading
+import time
+from collections import deque
+
+POLL_INTERVAL = 0.05  # seconds between checks while waiting on a concurrency slot
+
+
+class QueueTimeout(Exception):
+    """Raised when a caller waited longer than its timeout for capacity."""
+
+
+class RateLimiter:
+    """Requests-per-minute and tokens-per-minute buckets plus an in-flight cap."""
+
+    def __init__(self, name: str, rpm: int = 0, tpm: int = 0, max_in_flight: int = 8):
+        self.name = name
+        self.rpm = rpm  # 0 disables the bucket
+        self.tpm = tpm
+        self.max_in_flight = max(1, max_in_flight)
+        self.limit = self.max_in_flight  # Current adaptive concurrency limit
+        self.rate_scale = 1.0  # Multiplier on refill rates, shrinks after 429s
+        self.requests = float(rpm)
+        self.tokens = float(tpm)
+        self.in_flight = 0
+        self.blocked_until = 0.0
+        self._updated = time.monotonic()
+        self._queue = deque()
+        self._lock = threading.Lock()
+        self._stats = {"acquired": 0, "throttled": 0, "timeouts": 0, "total_wait": 0.0, "max_wait": 0.0}
+
+    def _refill(self, now: float):
+        elapsed = now - self._updated
+        self._updated = now
+        if self.rpm:
+            self.requests = min(self.rpm, self.requests + elapsed * self.rpm * self.rate_scale / 60)
+        if self.tpm:
+            self.tokens = min(self.tpm, self.tokens + elapsed * self.tpm * self.rate_scale / 60)
+
+    def _try_acquire(self, ticket, tokens: int) -> float:
+        """Take capacity for ticket and return 0, or return how long to wait."""
+        now = time.monotonic()
+        self._refill(now)
+        if self._queue[0] is not ticket:
+            return POLL_INTERVAL
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        if self.in_flight >= self.limit:
+            return POLL_INTERVAL
+
+        tokens = min(tokens, self.tpm)  # A single oversized call must still fit eventually
+        wait = 0.0
+        if self.rpm and self.requests < 1:
+            wait = max(wait, (1 - self.requests) * 60 / (self.rpm * self.rate_scale))
+        if self.tpm and self.tokens < tokens:
+            wait = max(wait, (tokens - self.tokens) * 60 / (self.tpm * self.rate_scale))
+        if wait > 0:
+            return wait
+
+        if self.rpm:
+            self.requests -= 1
+        if self.tpm:
+            self.tokens -= tokens
+        self.in_flight += 1
+        self._queue.popleft()
+        return 0.0
+
+    def _enqueue(self):
+        ticket = object()
+        with self._lock:
+            self._queue.append(ticket)
+        return ticket
+
+    def _finish_wait(self, ticket, started: float, acquired: bool) -> float:
+        waited = time.monotonic() - started
+        with self._lock:
+            if acquired:
+                self._stats["acquired"] += 1
+                self._stats["total_wait"] += waited
+                self._stats["max_wait"] = max(self._stats["max_wait"], waited)
+            else:
+                self._queue.remove(ticket)
+                self._stats["timeouts"] += 1
+        return waited
+
+    def acquire(self, tokens: int = 0, timeout: float = None) -> float:
+        """Block until there is capacity. Returns seconds spent queued."""
+        ticket = self._enqueue()
+        started = time.monotonic()
+        while True:
+            with self._lock:
+                wait = self._try_acquire(ticket, tokens)
+            if wait == 0:
+                return self._finish_wait(ticket, started, True)
+            if timeout is not None and time.monotonic() - started + wait > timeout:
+                self._finish_wait(ticket, started, False)
+                raise QueueTimeout(f"{self.name}: waited {timeout}s for rate limit capacity")
+            time.sleep(min(wait, 1.0))
+
+    async def acquire_async(self, tokens: int = 0, timeout: float = None) -> float:
+        """Async acquire; yields to the event loop while queued."""
+        ticket = self._enqueue()
+        started = time.monotonic()
+        try:
+            while True:
+                with self._lock:
+                    wait = self._try_acquire(ticket, tokens)
+                if wait == 0:
+                    return self._finish_wait(ticket, started, True)
+                if timeout is not None and time.monotonic() - started + wait > timeout:
+                    self._finish_wait(ticket, started, False)
+                    raise QueueTimeout(f"{self.name}: waited {timeout}s for rate limit capacity")
+                await asyncio.sleep(min(wait, 1.0))
+        except asyncio.CancelledError:
+            with self._lock:
+                if ticket in self._queue:
+                    self._queue.remove(ticket)
+            raise
+
+    def release(self, reserved: int = 0, used: int = None, throttled: bool = False, retry_after: float = None):
+        """
+        Return a slot after a call finishes.
+        reserved/used reconcile the token estimate with the provider's usage.
+        throttled=True halves rate and concurrency and pauses for retry_after.
+        """
+        with self._lock:
+            self.in_flight = max(0, self.in_flight - 1)
+            if self.tpm and used is not None:
+                self.tokens = min(self.tpm, self.tokens + min(reserved, self.tpm) - used)
+
+            if throttled:
+                self._stats["throttled"] += 1
+                self.rate_scale = max(0.1, self.rate_scale * 0.5)
+                self.limit = max(1, self.limit // 2)
+                pause = retry_after if retry_after is not None else 2.0
+                self.blocked_until = max(self.blocked_until, time.monotonic() + pause)
+            else:
+                self.rate_scale = min(1.0, self.rate_scale + 0.05)
+                self.limit = min(self.max_in_flight, self.limit + 1)
+
+    def stats(self) -> dict:
+        """Queue depth, wait times and current limits for /status."""
+        with self._lock:
+            acquired = self._stats["acquired"]
+            return {
+                "queue_depth": len(self._queue),
+                "in_flight": self.in_flight,
+                "concurrency_limit": self.limit,
+                "rpm": self.rpm,
+                "tpm": self.tpm,
+                "rate_scale": round(self.rate_scale, 2),
+                "paused_for": round(max(0.0, self.blocked_until - time.monotonic()), 2),
+                "acquired": acquired,
+                "throttled": self._stats["throttled"],
+                "timeouts": self._stats["timeouts"],
+                "avg_wait": round(self._stats["total_wait"] / acquired, 3) if acquired else 0.0,
+                "max_wait": round(self._stats["max_wait"], 3),
+            }
+
+
+def estimate_tokens(prompt: str, max_tokens: int = 0) -> int:
+    """Rough token estimate (~4 chars per token) plus the completion budget."""
+    return len(prompt) // 4 + max_tokens
+
+
+def retry_after_seconds(error: Exception):
+    """Read retry-after from a provider error's HTTP response, if any."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    value = headers.get("retry-after")
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """True for HTTP 429 errors from either SDK."""
+    return getattr(error, "status_code", None) == 429 or "429" in str(error)
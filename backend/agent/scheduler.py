@@ -0,0 +1,89 @@
+"""
+Phase Scheduler - Runs pipeline phases as a dependency graph.
+Each node starts as soon as every phase it depends on has finished.
+"""
+import queue
+from concurrent.futures import ThreadPoolExecutor
+
+
+def validate_graph(nodes: dict):
+    """Raise ValueError on unknown dependencies or cycles."""
+    for name, node in nodes.items():
+        for dep in node.get("deps", []):
+            if dep not in nodes:
+                raise ValueError(f"Phase '{name}' depends on unknown phase '{dep}'")
+
+    visiting, visited = set(), set()
+
+    def visit(name):
+        if name in visited:
+            return
+        if name in visiting:
+            raise ValueError(f"Dependency cycle detected at phase '{name}'")
+        visiting.add(name)
+        for dep in nodes[name].get("deps", []):
+            visit(dep)
+        visiting.discard(name)
+        visited.add(name)
+
+    for name in nodes:
+        visit(name)
+
+
+def run_graph(nodes: dict, max_workers: int = 4):
+    """
+    Execute a phase graph on a bounded thread pool.
+
+    nodes: {name: {"fn": callable(results) -> value, "deps": [names], "emits": bool}}
+    Each fn receives a dict with the results of its dependencies. Nodes
+    with "emits": True also get an emit(payload) callback for live updates.
+
+    Yields ("started", name, None) when a node begins running on a worker,
+    ("emit", name, payload) for each emitted update, and
+    ("done", name, result) as nodes finish, in completion order.
+    """
+    validate_graph(nodes)
+
+    results = {}
+    pending = {name: set(node.get("deps", [])) for name, node in nodes.items()}
+    finished = queue.Queue()  # ("started"|"emit", name, payload) or ("done", name, future)
+    in_flight = 0
+    pool = ThreadPoolExecutor(max_workers=max(1, max_workers))
+
+    def submit(name):
+        node = nodes[name]
+        dep_results = {dep: results[dep] for dep in node.get("deps", [])}
+        args = (dep_results,)
+        if node.get("emits"):
+            args += (lambda payload, n=name: finished.put(("emit", n, payload)),)
+
+        def run():
+            # Queued nodes wait for a free worker; report them only once they run
+            finished.put(("started", name, None))
+            return node["fn"](*args)
+
+        future = pool.submit(run)
+        future.add_done_callback(lambda f, n=name: finished.put(("done", n, f)))
+
+    try:
+        while pending or in_flight:
+            ready = [name for name, deps in pending.items() if not deps]
+            for name in ready:
+                del pending[name]
+                submit(name)
+                in_flight += 1
+
+            kind, name, item = finished.get()
+            if kind != "done":
+                yield (kind, name, item)
+                continue
+
+            future = item
+            in_flight -= 1
+            results[name] = future.result()
+            for deps in pending.values():
+                deps.discard(name)
+            yield ("done", name, results[name])
+    finally:
+        # Drop queued phases if the consumer stopped early or a phase failed
+        pool.shutdown(wait=False, cancel_futures=True)
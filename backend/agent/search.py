@@ -0,0 +1,168 @@
+"""
+Project Search - Persistent BM25 inverted index over past projects.
+Indexes ideas, plans and file names in storage/search.db. New projects
+are added incrementally; queries only read the posting lists of their terms.
+"""
+import json
+import math
+import re
+import sqlite3
+import threading
+from collections import Counter
+from pathlib import Path
+
+SEARCH_DB = Path("storage/search.db")
+BM25_K1 = 1.2
+BM25_B = 0.75
+MAX_POSTINGS = 5000  # Terms in more docs than this are treated like stop words
+
+STOP_WORDS = {
+    "a", "an", "and", "app", "application", "are", "as", "at", "be", "build", "by", "can", "create",
+    "for", "from", "has", "have", "i", "in", "into", "is", "it", "its", "make", "me", "my", "of", "on",
+    "or", "simple", "that", "the", "this", "to", "use", "uses", "using", "want", "was", "we", "with",
+    "would", "you",
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS docs (
+    doc_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    length INTEGER,
+    project TEXT
+);
+CREATE TABLE IF NOT EXISTS postings (
+    term TEXT,
+    doc_id INTEGER,
+    tf INTEGER,
+    PRIMARY KEY (term, doc_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS terms (
+    term TEXT PRIMARY KEY,
+    df INTEGER
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS stats (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    docs INTEGER,
+    total_length INTEGER
+);
+INSERT OR IGNORE INTO stats VALUES (0, 0, 0);
+"""
+
+
+def tokenize(text: str) -> list:
+    """Lowercase word tokens without stop words or single characters."""
+    return [t for t in re.findall(r"[a-z0-9]+", text.lower()) if len(t) > 1 and t not in STOP_WORDS]
+
+
+def project_text(project: dict) -> str:
+    """Searchable text for a project: idea, plan summary and file names."""
+    plan = project.get("plan") or {}
+    parts = [project.get("idea", ""), plan.get("project_name", ""), plan.get("description", "")]
+    parts += plan.get("tech_stack", [])
+    parts += [f.get("description", "") for f in plan.get("files", []) if isinstance(f, dict)]
+    parts += project.get("code_files", [])
+    return " ".join(p for p in parts if isinstance(p, str))
+
+
+def project_summary(project: dict) -> dict:
+    """What search results carry back: the project without its generated code."""
+    return {k: v for k, v in project.items() if k not in ("all_code", "final_code")}
+
+
+class SearchIndex:
+    """BM25 index stored in SQLite, safe to share across threads."""
+
+    def __init__(self, path: Path = SEARCH_DB):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def add(self, project: dict):
+        """Index one project. Cost depends on its own length, not the index size."""
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                self._add(conn, project)
+
+    def add_many(self, projects) -> int:
+        count = 0
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                for project in projects:
+                    self._add(conn, project)
+                    count += 1
+        return count
+
+    def _add(self, conn: sqlite3.Connection, project: dict):
+        tokens = tokenize(project_text(project))
+        counts = Counter(tokens)
+        cursor = conn.execute(
+            "INSERT INTO docs (length, project) VALUES (?, ?)",
+            (len(tokens), json.dumps(project_summary(project))),
+        )
+        doc_id = cursor.lastrowid
+        conn.executemany("INSERT INTO postings VALUES (?, ?, ?)", [(t, doc_id, tf) for t, tf in counts.items()])
+        conn.executemany(
+            "INSERT INTO terms VALUES (?, 1) ON CONFLICT(term) DO UPDATE SET df = df + 1",
+            [(t,) for t in counts],
+        )
+        conn.execute("UPDATE stats SET docs = docs + 1, total_length = total_length + ? WHERE id = 0", (len(tokens),))
+
+    def count(self) -> int:
+        with self._lock:
+            return self._connect().execute("SELECT docs FROM stats WHERE id = 0").fetchone()[0]
+
+    def search(self, query: str, limit: int = 3) -> list:
+        """Top `limit` projects by BM25 score for the query, best first."""
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return []
+
+        with self._lock:
+            conn = self._connect()
+            docs, total_length = conn.execute("SELECT docs, total_length FROM stats WHERE id = 0").fetchone()
+            if not docs:
+                return []
+            avg_length = total_length / docs or 1
+
+            marks = ",".join("?" * len(terms))
+            df = dict(conn.execute(f"SELECT term, df FROM terms WHERE term IN ({marks})", terms))
+            # Skip very common terms unless nothing rarer matched
+            usable = [t for t in df if df[t] <= MAX_POSTINGS] or list(df)
+
+            scores = Counter()
+            for term in usable:
+                idf = math.log(1 + (docs - df[term] + 0.5) / (df[term] + 0.5))
+                for doc_id, tf, length in conn.execute(
+                    "SELECT p.doc_id, p.tf, d.length FROM postings p JOIN docs d ON d.doc_id = p.doc_id "
+                    "WHERE p.term = ?",
+                    (term,),
+                ):
+                    norm = tf + BM25_K1 * (1 - BM25_B + BM25_B * length / avg_length)
+                    scores[doc_id] += idf * tf * (BM25_K1 + 1) / norm
+
+            top = scores.most_common(limit)
+            if not top:
+                return []
+            ids = [doc_id for doc_id, _ in top]
+            projects = dict(conn.execute(
+                f"SELECT doc_id, project FROM docs WHERE doc_id IN ({','.join('?' * len(ids))})", ids
+            ))
+        return [json.loads(projects[doc_id]) for doc_id in ids]
+
+    def clear(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+            for suffix in ("", "-wal", "-shm"):
+                Path(str(self.path) + suffix).unlink(missing_ok=True)
@@ -0,0 +1,124 @@
+"""
+Single-flight Coalescing - Concurrent identical work shares one execution.
+SingleFlight dedupes function calls; SharedStream fans one generator's
+events out to every subscriber that attaches while it is running.
+"""
+import asyncio
+import copy
+import threading
+
+
+class SingleFlight:
+    """Run at most one call per key at a time; late callers share its result."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}  # key -> {"event", "result", "error"}
+        self._async_calls = {}  # key -> asyncio.Future
+        self.shared = 0  # Calls answered by someone else's in-flight request
+
+    def do(self, key, fn):
+        """Call fn() once for all concurrent callers with the same key."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = {"event": threading.Event(), "result": None, "error": None}
+                self._calls[key] = call
+            else:
+                self.shared += 1
+
+        if leader:
+            try:
+                call["result"] = fn()
+            except Exception as e:
+                call["error"] = e
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call["event"].set()
+        else:
+            call["event"].wait()
+
+        if call["error"] is not None:
+            raise call["error"]
+        # Every caller gets its own copy so mutations don't leak between them
+        return copy.deepcopy(call["result"])
+
+    async def do_async(self, key, coro_fn):
+        """Async variant: await coro_fn() once for all concurrent callers."""
+        future = self._async_calls.get(key)
+        if future is not None:
+            self.shared += 1
+            return copy.deepcopy(await asyncio.shield(future))
+
+        future = asyncio.get_running_loop().create_future()
+        self._async_calls[key] = future
+        try:
+            result = await coro_fn()
+            future.set_result(result)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Mark retrieved; the leader re-raises it below
+            raise
+        finally:
+            del self._async_calls[key]
+        return copy.deepcopy(result)
+
+
+class SharedStream:
+    """
+    Runs a generator on a background thread and buffers its events.
+    Any number of subscribers can replay the buffer and follow new events.
+    """
+
+    def __init__(self, source, on_finish=None):
+        self.events = []
+        self.finished = False
+        self.error = None
+        self._source = source
+        self._on_finish = on_finish
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, daemon=True)  # Unused when started on an executor
+
+    def start(self, executor=None):
+        """Run the source on its own thread, or on `executor` to share a worker cap."""
+        if executor is not None:
+            executor.submit(self._run)
+        else:
+            self._thread.start()
+        return self
+
+    def _run(self):
+        try:
+            for event in self._source:
+                with self._cond:
+                    self.events.append(event)
+                    self._cond.notify_all()
+        except Exception as e:
+            self.error = e
+        finally:
+            with self._cond:
+                self.finished = True
+                self._cond.notify_all()
+            if self._on_finish:
+                self._on_finish(self)
+
+    def subscribe(self, offset: int = 0):
+        """Yield every event from offset onward, waiting for new ones until the source ends."""
+        while True:
+            with self._cond:
+                while offset >= len(self.events) and not self.finished:
+                    self._cond.wait()
+                batch = self.events[offset:]
+                done = self.finished
+            for event in batch:
+                yield event
+            offset += len(batch)
+            if done and offset >= len(self.events):
+                if self.error is not None:
+                    raise self.error
+                return
@@ -0,0 +1,43 @@
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from bench.mock_provider import MockProvider, InjectedRateLimit
+from bench.run import parse_args, run_benchmark
+from agent.agent import parse_groq_content, build_groq_prompt
+from agent.ratelimit import is_rate_limit_error, retry_after_seconds
+
+def test_completions_parse_like_real_ones():
+    plan = parse_groq_content(MockProvider.complete(build_groq_prompt("todo web app", "plan")), "plan")
+    assert [f["path"] for f in plan["files"]] == ["index.html", "styles.css", "main.js"]
+    code = parse_groq_content(MockProvider.complete(build_groq_prompt("FILE: styles.css", "code")), "code")
+    assert "```" not in code["code"] and code["code"]
+
+def test_injected_429_looks_like_provider_429():
+    provider = MockProvider(latency_ms=0, rate_limit_rate=1.0, retry_after=0.5)
+    try:
+        provider.create(messages=[{"role": "user", "content": "hi"}])
+    except InjectedRateLimit as e:
+        assert is_rate_limit_error(e)
+        assert retry_after_seconds(e) == 0.5
+    else:
+        raise AssertionError("429 not injected")
+    assert provider.snapshot() == {"calls": 1, "errors": 0, "rate_limits": 1}
+
+def test_pipeline_benchmark_reports_percentiles():
+    args = parse_args(["--target", "pipeline", "--builds", "3", "--concurrency", "3", "--latency-ms", "5", "--latency-sigma", "0"])
+    cwd = os.getcwd()
+    report = run_benchmark(args)
+    result = report["results"]["pipeline"]
+    assert result["ok"] == 3 and result["failed"] == 0
+    assert result["llm_calls"] >= 3 and result["fallbacks"] == 0
+    assert 0 < result["p50"] <= result["p95"] <= result["p99"]
+    assert report["config"]["builds"] == 3
+    assert os.getcwd() == cwd
+
+if __name__ == "__main__":
+    test_completions_parse_like_real_ones()
+    test_injected_429_looks_like_provider_429()
+    test_pipeline_benchmark_reports_percentiles()
+    print("SUCCESS: Benchmark harness tests passed")
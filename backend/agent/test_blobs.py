@@ -0,0 +1,35 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from agent import blobs
+
+def test_identical_files_are_stored_once():
+    original = blobs.BLOB_DIR
+    with tempfile.TemporaryDirectory() as tmp:
+        blobs.BLOB_DIR = Path(tmp) / "blobs"
+        try:
+            check_dedup()
+        finally:
+            blobs.BLOB_DIR = original
+
+def check_dedup():
+    css = "body { margin: 0; }\n" * 50
+
+    first = blobs.put_blob(css)
+    second = blobs.put_blob(css)
+    other = blobs.put_blob("print('hi')")
+
+    assert first == second != other
+    assert len(list(blobs.BLOB_DIR.glob("*/*"))) == 2
+    assert blobs.get_blob(first) == css
+    assert blobs.get_blob("0" * 64) is None
+    # Compressed on disk
+    assert next(blobs.BLOB_DIR.glob(f"*/{first}*")).stat().st_size < len(css)
+
+if __name__ == "__main__":
+    test_identical_files_are_stored_once()
+    print("SUCCESS: Blob store tests passed")
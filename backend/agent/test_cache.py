@@ -0,0 +1,70 @@
+import os
+import sys
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from agent import cache
+
+@contextmanager
+def temp_cache():
+    original = cache.CACHE_DIR
+    with tempfile.TemporaryDirectory() as tmp:
+        cache.CACHE_DIR = Path(tmp) / "llm_cache"
+        cache.clear_cache()
+        try:
+            yield
+        finally:
+            cache.clear_cache()  # Memory entries point at the temporary disk tier
+            cache.CACHE_DIR = original
+
+def test_roundtrip_and_disk_tier():
+    with temp_cache():
+        key = cache.cache_key("groq", "model", "code", "print hello", 0.7)
+        assert cache.get_cached(key) is None
+
+        cache.put_cached(key, {"code": "print('hello')"})
+        assert cache.get_cached(key) == {"code": "print('hello')"}
+
+        # Drop the memory tier; the disk tier should still answer
+        cache._memory.clear()
+        assert cache.get_cached(key) == {"code": "print('hello')"}
+        assert cache.get_cache_stats()["disk_hits"] >= 1
+
+def test_key_depends_on_every_field():
+    base = cache.cache_key("groq", "model", "code", "prompt", 0.7)
+    assert base != cache.cache_key("gemini", "model", "code", "prompt", 0.7)
+    assert base != cache.cache_key("groq", "model", "plan", "prompt", 0.7)
+    assert base != cache.cache_key("groq", "model", "code", "prompt", 0.2)
+
+def test_ttl_expiry():
+    with temp_cache():
+        key = cache.cache_key("groq", "model", "code", "old", 0.7)
+        cache.put_cached(key, {"code": "x"})
+        ttl = cache.CACHE_TTL
+        cache.CACHE_TTL = -1
+        try:
+            assert cache.get_cached(key) is None
+        finally:
+            cache.CACHE_TTL = ttl
+
+def test_lru_eviction():
+    with temp_cache():
+        limit = cache.CACHE_MAX_ENTRIES
+        cache.CACHE_MAX_ENTRIES = 2
+        try:
+            for i in range(3):
+                cache.put_cached(f"key{i}", {"i": i})
+            assert "key0" not in cache._memory
+            assert "key2" in cache._memory
+        finally:
+            cache.CACHE_MAX_ENTRIES = limit
+
+if __name__ == "__main__":
+    test_roundtrip_and_disk_tier()
+    test_key_depends_on_every_field()
+    test_ttl_expiry()
+    test_lru_eviction()
+    print("SUCCESS: Cache tests passed")
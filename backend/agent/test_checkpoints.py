@@ -0,0 +1,20 @@
+import os
+import sys
+import tempfile
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from agent.checkpoints import Checkpoints
+
+def test_checkpoint_reused_only_for_same_inputs():
+    with tempfile.TemporaryDirectory() as tmp:
+        checkpoints = Checkpoints(tmp)
+        checkpoints.save("file:src/app.js", {"prompt": "todo app"}, "console.log(1)")
+
+        assert checkpoints.load("file:src/app.js", {"prompt": "todo app"}) == "console.log(1)"
+        assert checkpoints.load("file:src/app.js", {"prompt": "todo app v2"}) is None
+        assert checkpoints.load("review", {"code": ""}) is None
+
+if __name__ == "__main__":
+    test_checkpoint_reused_only_for_same_inputs()
+    print("SUCCESS: Checkpoint tests passed")
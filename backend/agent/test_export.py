@@ -0,0 +1,56 @@
+import io
+import os
+import sys
+import tempfile
+import zipfile
+from pathlib import Path
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from agent import export
+
+def test_streamed_zip_is_valid_and_cached():
+    original, tmp = export.EXPORT_CACHE_DIR, tempfile.TemporaryDirectory()
+    export.EXPORT_CACHE_DIR = Path(tmp.name) / "exports"
+    try:
+        workspace = Path(tmp.name) / "workspace"
+        workspace.mkdir()
+        (workspace / "main.py").write_text("print('hi')\n" * 10000)
+        entries = [("main.py", workspace / "main.py"), ("README.md", "# Demo\n")]
+
+        key = export.file_set_hash(entries)
+        assert export.cached_archive(key) is None
+        chunks = list(export.stream_zip(entries, key))
+        assert len(chunks) > 1  # Sent while being built, not all at once
+
+        archive = zipfile.ZipFile(io.BytesIO(b"".join(chunks)))
+        assert archive.read("main.py") == (workspace / "main.py").read_bytes()
+        assert archive.read("README.md") == b"# Demo\n"
+        assert export.cached_archive(key).read_bytes() == b"".join(chunks)
+
+        # Same files from a different source hash the same; changed content doesn't
+        assert export.file_set_hash([("main.py", (workspace / "main.py").read_text()), ("README.md", "# Demo\n")]) == key
+        assert export.file_set_hash([("main.py", "print()"), ("README.md", "# Demo\n")]) != key
+    finally:
+        export.EXPORT_CACHE_DIR = original
+        tmp.cleanup()
+
+def test_abandoned_download_is_not_cached():
+    original, tmp = export.EXPORT_CACHE_DIR, tempfile.TemporaryDirectory()
+    export.EXPORT_CACHE_DIR = Path(tmp.name) / "exports"
+    try:
+        entries = [("a.txt", os.urandom(300000))]
+        key = export.file_set_hash(entries)
+        stream = export.stream_zip(entries, key)
+        next(stream)
+        stream.close()  # Client disconnected
+        assert export.cached_archive(key) is None
+        assert list(export.EXPORT_CACHE_DIR.iterdir()) == []
+    finally:
+        export.EXPORT_CACHE_DIR = original
+        tmp.cleanup()
+
+if __name__ == "__main__":
+    test_streamed_zip_is_valid_and_cached()
+    test_abandoned_download_is_not_cached()
+    print("SUCCESS: Export tests passed")
@@ -0,0 +1,51 @@
+import json
+import os
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# Milliseconds for a cold import in a fresh interpreter; IMPORT_BUDGET_SCALE loosens them on slow machines
+BUDGETS_MS = {"agent.intelligence": 50, "agent.orchestrator": 300}
+SCALE = float(os.getenv("IMPORT_BUDGET_SCALE", "1"))
+
+# Loaded only when an LLM call, semantic search or blob write needs them
+DEFERRED = ["groq", "google.generativeai", "httpx", "numpy", "zstandard"]
+
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import {module}
+elapsed = (time.perf_counter() - started) * 1000
+report = {{"ms": elapsed, "modules": [m for m in {deferred!r} + ["dotenv", "agent.agent"] if m in sys.modules]}}
+if "agent.agent" in sys.modules:
+    agent = sys.modules["agent.agent"]
+    report["pool_loaded"] = agent.provider_pool.loaded()
+    report["env_file"] = agent.ENV_FILE is not None
+print(json.dumps(report))
+"""
+
+def probe(module: str) -> dict:
+    code = PROBE.format(module=module, deferred=DEFERRED)
+    out = subprocess.run([sys.executable, "-c", code], cwd=BACKEND_DIR, capture_output=True, text=True, timeout=60)
+    assert out.returncode == 0, out.stderr
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+def test_stats_path_skips_the_agent():
+    # The CLI's `stats` command only needs intelligence.py
+    report = probe("agent.intelligence")
+    assert "agent.agent" not in report["modules"]
+    assert report["ms"] < BUDGETS_MS["agent.intelligence"] * SCALE, report
+
+def test_pipeline_import_defers_providers():
+    report = probe("agent.orchestrator")
+    assert not report["pool_loaded"]
+    assert not [m for m in DEFERRED if m in report["modules"]], report
+    if not report["env_file"]:
+        assert "dotenv" not in report["modules"]
+    assert report["ms"] < BUDGETS_MS["agent.orchestrator"] * SCALE, report
+
+if __name__ == "__main__":
+    test_stats_path_skips_the_agent()
+    test_pipeline_import_defers_providers()
+    print("SUCCESS: Import time tests passed")
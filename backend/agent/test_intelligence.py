@@ -0,0 +1,77 @@
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from agent import intelligence
+
+def test_stats_are_written_behind():
+    original, tmp = intelligence.STATS_FILE, tempfile.TemporaryDirectory()
+    intelligence.STATS_FILE = Path(tmp.name) / "intelligence.json"
+    intelligence.reset_stats()
+    try:
+        result = intelligence.add_project_xp(files_generated=3, issues_found=0, languages=["Python"])
+        assert result["xp_gained"] == 10 + 6 + 15 + 10
+        assert intelligence.get_intelligence()["xp"] == result["total_xp"]
+        assert not intelligence.STATS_FILE.exists()  # Nothing written until a flush
+
+        intelligence.flush_stats()
+        on_disk = json.loads(intelligence.STATS_FILE.read_text())
+        assert on_disk["total_projects"] == 1
+        assert on_disk["languages_used"] == ["Python"]
+
+        intelligence.reset_stats()
+        assert intelligence.get_stats()["xp"] == 0
+        assert not intelligence.STATS_FILE.exists()
+    finally:
+        intelligence.reset_stats()
+        intelligence.STATS_FILE = original
+        intelligence._stats = None  # Reload the real stats on next use
+        tmp.cleanup()
+
+def test_reset_waits_for_a_flush_in_progress():
+    original, original_fsync = intelligence.STATS_FILE, intelligence.os.fsync
+    tmp = tempfile.TemporaryDirectory()
+    intelligence.STATS_FILE = Path(tmp.name) / "intelligence.json"
+    intelligence.reset_stats()
+    writing, release = threading.Event(), threading.Event()
+
+    def slow_fsync(fd):
+        writing.set()
+        release.wait(5)
+        original_fsync(fd)
+
+    try:
+        intelligence.add_project_xp(files_generated=1, issues_found=0, languages=["Python"])
+        intelligence.os.fsync = slow_fsync
+        flusher = threading.Thread(target=intelligence.flush_stats)
+        flusher.start()
+        assert writing.wait(5)
+
+        resetter = threading.Thread(target=intelligence.reset_stats)
+        resetter.start()
+        time.sleep(0.05)
+        assert resetter.is_alive()  # Blocked until the write lands
+        release.set()
+        flusher.join(5)
+        resetter.join(5)
+
+        assert not intelligence.STATS_FILE.exists()  # The old write did not survive the reset
+        assert intelligence.get_stats()["xp"] == 0
+    finally:
+        release.set()
+        intelligence.os.fsync = original_fsync
+        intelligence.reset_stats()
+        intelligence.STATS_FILE = original
+        intelligence._stats = None
+        tmp.cleanup()
+
+if __name__ == "__main__":
+    test_stats_are_written_behind()
+    test_reset_waits_for_a_flush_in_progress()
+    print("SUCCESS: Intelligence stats tests passed")
@@ -0,0 +1,26 @@
+import json
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from agent.jobs import submit_job, get_job
+
+def test_job_events_can_be_replayed_from_any_offset():
+    job = submit_job("Create a simple calculator")
+    assert get_job(job.id) is job
+
+    events = list(job.events())
+    assert [i for i, _ in events] == list(range(1, len(events) + 1))
+    assert json.loads(events[-1][1])["step"] == "complete"
+
+    # A client reconnecting with Last-Event-ID: 3 gets everything after event 3
+    assert list(job.events(3)) == events[3:]
+
+    info = job.info()
+    assert info["status"] == "done"
+    assert info["result"]["job_id"] == job.id
+
+if __name__ == "__main__":
+    test_job_events_can_be_replayed_from_any_offset()
+    print("SUCCESS: Job tests passed")
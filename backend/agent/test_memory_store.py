@@ -0,0 +1,146 @@
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from agent import memory_store
+from agent.memory_store import JsonlMemoryStore
+from agent.memory_sqlite import SqliteMemoryStore
+
+def make_project(i, filename):
+    code = {filename: f"# project {i}"}
+    return {
+        "idea": f"project {i}",
+        "code_files": list(code),
+        "all_code": code,
+        "final_code": "\n\n".join([f"// === {k} ===\n{v}" for k, v in code.items()]),
+        "review": {"score": 7, "issues": []},
+        "xp_gained": 10,
+    }
+
+def test_append_and_stream_both_directions(tmp_path):
+    store = JsonlMemoryStore(tmp_path / "memory")
+    for i in range(5):
+        store.append({"idea": f"project {i}"})
+
+    assert store.count() == 5
+    assert [r["idea"] for r in store.iter_records()] == [f"project {i}" for i in range(5)]
+    assert [r["idea"] for r in store.iter_records(reverse=True)][:2] == ["project 4", "project 3"]
+
+def test_legacy_file_is_migrated(tmp_path):
+    root = tmp_path
+    legacy = root / "memory.json"
+    legacy.write_text(json.dumps([{"idea": "old one"}, {"idea": "old two"}]))
+
+    store = JsonlMemoryStore(root / "memory", legacy_file=legacy)
+    store.append({"idea": "new"})
+    assert [r["idea"] for r in store.iter_records()] == ["old one", "old two", "new"]
+    assert not legacy.exists()
+
+def test_segments_roll_and_compact(tmp_path):
+    limit, max_segments = memory_store.SEGMENT_MAX_BYTES, memory_store.MAX_SEALED_SEGMENTS
+    memory_store.SEGMENT_MAX_BYTES, memory_store.MAX_SEALED_SEGMENTS = 10, 2
+    try:
+        store = JsonlMemoryStore(tmp_path / "memory")
+        for i in range(10):
+            store.append({"idea": f"project {i}"})
+        segments = json.loads(store.index_file.read_text())["segments"]
+        assert len(segments) <= 3
+        assert [r["idea"] for r in store.iter_records()] == [f"project {i}" for i in range(10)]
+    finally:
+        memory_store.SEGMENT_MAX_BYTES, memory_store.MAX_SEALED_SEGMENTS = limit, max_segments
+
+def test_recovers_when_index_lags_log(tmp_path):
+    root = tmp_path / "memory"
+    store = JsonlMemoryStore(root)
+    store.append({"idea": "indexed"})
+    # Simulate a crash after the log write but before the index update
+    with open(root / "segment-000001.jsonl", "a") as f:
+        f.write(json.dumps({"idea": "unindexed"}) + "\n")
+        f.write('{"idea": "torn')
+
+    reopened = JsonlMemoryStore(root)
+    assert [r["idea"] for r in reopened.iter_records()] == ["indexed", "unindexed"]
+
+def test_sqlite_round_trip_and_paging(tmp_path):
+    store = SqliteMemoryStore(tmp_path / "memory.db")
+    projects = [make_project(i, "main.py" if i % 2 else "index.html") for i in range(7)]
+    store.import_records(projects[:3])
+    for project in projects[3:]:
+        store.append(project)
+
+    assert store.count() == 7
+    assert list(store.iter_records()) == [{**p, "id": i + 1} for i, p in enumerate(projects)]
+    assert [r["idea"] for r in store.iter_records(reverse=True)][0] == "project 6"
+
+    page = store.page(offset=2, limit=2)
+    assert [r["idea"] for _, r in page] == ["project 4", "project 3"]
+    assert "all_code" not in page[0][1]  # Pages skip the generated code
+    python_only = store.page(limit=10, language="Python")
+    assert [r["idea"] for _, r in python_only] == ["project 5", "project 3", "project 1"]
+
+def test_jsonl_paging_matches_sqlite(tmp_path):
+    log = JsonlMemoryStore(tmp_path / "memory")
+    for i in range(5):
+        log.append(make_project(i, "main.py" if i % 2 else "index.html"))
+    assert [(n, r["idea"]) for n, r in log.page(offset=1, limit=2)] == [(4, "project 3"), (3, "project 2")]
+    assert [n for n, _ in log.page(language="HTML")] == [5, 3, 1]
+
+def test_ids_survive_compaction_and_readers_keep_their_view(tmp_path):
+    limit, max_segments = memory_store.SEGMENT_MAX_BYTES, memory_store.MAX_SEALED_SEGMENTS
+    memory_store.SEGMENT_MAX_BYTES, memory_store.MAX_SEALED_SEGMENTS = 10, 100
+    try:
+        root = tmp_path / "memory"
+        store = JsonlMemoryStore(root)
+        for i in range(6):
+            store.append({"idea": f"project {i}"})
+        with open(root / "segment-000001.jsonl", "a") as f:
+            f.write('{"idea": "torn\n')  # Dropped by compaction
+
+        reader = store.iter_records()
+        assert next(reader)["idea"] == "project 0"
+        store.compact()  # Merges the segments the reader has not opened yet
+        assert [r["idea"] for r in reader] == [f"project {i}" for i in range(1, 6)]
+        assert len(list(root.glob("segment-*.jsonl"))) == 2  # Old segments deleted once it finished
+
+        assert [store.get(i)["idea"] for i in range(1, 7)] == [f"project {i}" for i in range(6)]
+        assert store.get(7) is None
+        store.append({"idea": "after"})
+        assert store.get(7)["idea"] == "after"
+    finally:
+        memory_store.SEGMENT_MAX_BYTES, memory_store.MAX_SEALED_SEGMENTS = limit, max_segments
+
+def test_records_from_before_ids_get_their_old_positions(tmp_path):
+    root = tmp_path / "memory"
+    root.mkdir(parents=True)
+    lines = [json.dumps({"idea": f"old {i}"}) + "\n" for i in range(3)]
+    (root / "segment-000001.jsonl").write_text("".join(lines))
+    size = (root / "segment-000001.jsonl").stat().st_size
+    (root / "index.json").write_text(json.dumps({"segments": [{"name": "segment-000001.jsonl", "count": 3, "bytes": size}], "total": 3}))
+
+    store = JsonlMemoryStore(root)
+    assert store.get(2)["idea"] == "old 1"
+    store.append({"idea": "new"})
+    assert [(n, r["idea"]) for n, r in store.page(limit=2)] == [(4, "new"), (3, "old 2")]
+
+    imported = SqliteMemoryStore(tmp_path / "memory.db")
+    imported.import_records(store.iter_records())
+    assert imported.get(2)["idea"] == "old 1"
+
+if __name__ == "__main__":
+    for test in (
+        test_append_and_stream_both_directions,
+        test_legacy_file_is_migrated,
+        test_segments_roll_and_compact,
+        test_recovers_when_index_lags_log,
+        test_sqlite_round_trip_and_paging,
+        test_jsonl_paging_matches_sqlite,
+        test_ids_survive_compaction_and_readers_keep_their_view,
+        test_records_from_before_ids_get_their_old_positions,
+    ):
+        with tempfile.TemporaryDirectory() as tmp:
+            test(Path(tmp))
+    print("SUCCESS: Memory store tests passed")
@@ -0,0 +1,47 @@
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from agent.metrics import Counter, Histogram, Collected, render_metrics
+
+def test_counter_lines():
+    requests = Counter("test_requests_total", "Test requests.", ("route", "status"))
+    requests.inc(route="/ping", status=200)
+    requests.inc(route="/ping", status=200)
+    requests.inc(route='/say "hi"', status=500)
+    text = render_metrics()
+    assert "# TYPE test_requests_total counter" in text
+    assert 'test_requests_total{route="/ping",status="200"} 2' in text
+    assert 'test_requests_total{route="/say \\"hi\\"",status="500"} 1' in text
+
+def test_histogram_buckets_are_cumulative():
+    latency = Histogram("test_latency_seconds", "Test latency.", ("mode",), buckets=(0.1, 1))
+    for value in (0.05, 0.5, 0.7, 3):
+        latency.observe(value, mode="code")
+    text = render_metrics()
+    assert 'test_latency_seconds_bucket{mode="code",le="0.1"} 1' in text
+    assert 'test_latency_seconds_bucket{mode="code",le="1"} 3' in text
+    assert 'test_latency_seconds_bucket{mode="code",le="+Inf"} 4' in text
+    assert 'test_latency_seconds_count{mode="code"} 4' in text
+    assert 'test_latency_seconds_sum{mode="code"} 4.25' in text
+
+def test_collected_values_read_at_scrape():
+    size = [10]
+    Collected("test_store_bytes", "Test size.", lambda: size[0])
+    assert "test_store_bytes 10\n" in render_metrics()
+    size[0] = 2048
+    assert "test_store_bytes 2048\n" in render_metrics()
+
+def test_failing_collector_is_skipped():
+    Collected("test_broken", "Raises.", lambda: 1 / 0)
+    text = render_metrics()
+    assert "# TYPE test_broken gauge" in text
+    assert not any(line.startswith("test_broken ") for line in text.splitlines())
+
+if __name__ == "__main__":
+    test_counter_lines()
+    test_histogram_buckets_are_cumulative()
+    test_collected_values_read_at_scrape()
+    test_failing_collector_is_skipped()
+    print("SUCCESS: Metrics tests passed")
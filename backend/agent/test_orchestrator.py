@@ -1,12 +1,6 @@
 from agent.orchestrator import run_pipeline
 from agent.memory import read_memory
-import shutil
-
-# Clean previous output
-try:
-    shutil.rmtree("output")
-except:
-    pass
+from agent.workspaces import get_workspace
 
 print("Testing Orchestrator...")
 result = run_pipeline("Create a simple calculator")
@@ -20,8 +14,8 @@ if "plan" in result and "code_files" in result and "review" in result:
 else:
     print("FAILURE: Pipeline structure missing keys. Got:", result.keys())
 
-import os
-if os.path.exists("output/main.py"):
+workspace = get_workspace(result.get("job_id"))
+if workspace and (workspace / "main.py").exists():
     print("SUCCESS: Output file created")
 else:
     print("FAILURE: Output file not created")
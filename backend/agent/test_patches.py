@@ -0,0 +1,33 @@
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from agent.patches import apply_patch, extract_diff, PatchError
+
+ORIGINAL = "def add(a, b):\n    return a - b\n\n\ndef main():\n    print(add(1, 2))\n"
+
+def test_patch_applies_despite_line_drift():
+    reply = """Here is the fix:
+```diff
+--- a/main.py
++++ b/main.py
+@@ -5,2 +5,2 @@
+ def add(a, b):
+-    return a - b
++    return a + b
+```"""
+    assert apply_patch(ORIGINAL, extract_diff(reply)) == ORIGINAL.replace("a - b", "a + b")
+
+def test_patch_with_wrong_context_is_rejected():
+    diff = "@@ -1,2 +1,2 @@\n def sub(a, b):\n-    return a\n+    return b\n"
+    try:
+        apply_patch(ORIGINAL, diff)
+    except PatchError:
+        return
+    raise AssertionError("bad patch applied")
+
+if __name__ == "__main__":
+    test_patch_applies_despite_line_drift()
+    test_patch_with_wrong_context_is_rejected()
+    print("SUCCESS: Patch tests passed")
@@ -0,0 +1,130 @@
+import json
+import os
+import sys
+import threading
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from agent import orchestrator
+from agent.workspaces import active_builds
+from agent.testing import isolated_workdir
+
+def test_reviewer_errors_are_counted_as_issues():
+    review = {"has_errors": True, "errors": [{"line": 1, "message": "unused import"}], "summary": "1 issue"}
+    original = orchestrator.review_code
+    orchestrator.review_code = lambda code: review
+    try:
+        with isolated_workdir():
+            result = orchestrator.run_pipeline("pipeline review count calculator")
+    finally:
+        orchestrator.review_code = original
+    assert result["iterations"][0]["issues_found"] == 1
+
+def test_improve_reuses_stored_reviews():
+    reviews = []
+
+    def review(code):
+        reviews.append(code)
+        return {"has_errors": False, "errors": [], "summary": "clean", "score": 9}
+
+    original = orchestrator.review_code
+    orchestrator.review_code = review
+    try:
+        with isolated_workdir():
+            orchestrator.run_pipeline("improve review todo web app")
+            assert len(reviews) == 1  # The main file
+            result = orchestrator.run_pipeline("improve review todo web app", improve_mode=True)
+    finally:
+        orchestrator.review_code = original
+    assert len(reviews) == 1  # Nothing reviewed again
+    assert set(result["improvements"].values()) == {"kept"}
+
+def run_with_generate_file(idea, generate_file):
+    original = orchestrator.generate_file
+    orchestrator.generate_file = generate_file
+    try:
+        with isolated_workdir():
+            return [json.loads(update) for update in orchestrator.run_pipeline_streaming(idea)]
+    finally:
+        orchestrator.generate_file = original
+
+def test_independent_files_are_generated_in_parallel():
+    barrier = threading.Barrier(3, timeout=2)  # The mock plan for a web app has three files
+
+    def slow_generate(prompt, path, on_delta=None):
+        barrier.wait()  # Only passes if all three files are written at the same time
+        time.sleep(0.1)
+        for chunk in ("// ", path):
+            on_delta and on_delta(chunk)
+        return f"// {path}"
+
+    updates = run_with_generate_file("parallel todo web app", slow_generate)
+    assert updates[-1]["step"] == "complete"
+    assert updates[-1]["data"]["all_code"]["main.js"] == "// main.js"
+
+    percents = [u["percent"] for u in updates]
+    assert percents == sorted(percents)
+    for path in ("index.html", "styles.css", "main.js"):
+        coding = [u["message"] for u in updates if u["step"] == "coding" and path in u["message"]]
+        assert coding[0].startswith(f"Writing {path}") and coding[-1].startswith(f"Wrote {path}")
+        deltas = [u["data"]["delta"] for u in updates if u["step"] == "code_delta" and u["data"]["file"] == path]
+        assert "".join(deltas) == f"// {path}"
+
+def test_non_streaming_build_sends_no_code_deltas():
+    def generate(prompt, path, on_delta=None):
+        assert on_delta is None  # Lets the provider call be coalesced and hedged
+        return f"// {path}"
+
+    original = orchestrator.generate_file
+    orchestrator.generate_file = generate
+    try:
+        with isolated_workdir():
+            updates = [json.loads(u) for u in orchestrator.run_pipeline_shared("quiet todo web app", stream_code=False)]
+    finally:
+        orchestrator.generate_file = original
+    assert updates[-1]["step"] == "complete"
+    assert not [u for u in updates if u["step"] == "code_delta"]
+
+def test_failing_file_does_not_hang_the_build():
+    def flaky_generate(prompt, path, on_delta=None):
+        if path == "styles.css":
+            raise RuntimeError("provider exploded")
+        time.sleep(0.2)
+        return f"// {path}"
+
+    outcome = []
+    def build():
+        try:
+            run_with_generate_file("failing todo web app", flaky_generate)
+        except RuntimeError as e:
+            outcome.append(str(e))
+
+    worker = threading.Thread(target=build)
+    worker.start()
+    worker.join(5)
+    assert not worker.is_alive()
+    assert outcome == ["provider exploded"]
+    assert active_builds() == 0
+
+def test_shared_build_uses_the_stripped_idea():
+    original = orchestrator.run_pipeline_streaming
+    seen = []
+    def fake_streaming(idea, *args, **kwargs):
+        seen.append(idea)
+        yield json.dumps({"status": "completed"})
+    orchestrator.run_pipeline_streaming = fake_streaming
+    try:
+        list(orchestrator.run_pipeline_shared("  todo app \n"))
+    finally:
+        orchestrator.run_pipeline_streaming = original
+    assert seen == ["todo app"]
+
+if __name__ == "__main__":
+    test_reviewer_errors_are_counted_as_issues()
+    test_improve_reuses_stored_reviews()
+    test_independent_files_are_generated_in_parallel()
+    test_non_streaming_build_sends_no_code_deltas()
+    test_failing_file_does_not_hang_the_build()
+    test_shared_build_uses_the_stripped_idea()
+    print("SUCCESS: Pipeline tests passed")
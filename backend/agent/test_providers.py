@@ -0,0 +1,189 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from agent import agent
+from agent.providers import Backend, ProviderPool, FAILURE_THRESHOLD
+
+def make_pool(*weights):
+    return ProviderPool([Backend(f"groq-{i + 1}", "groq", f"key-{i}", weight=w) for i, w in enumerate(weights)])
+
+def test_least_outstanding_by_weight():
+    pool = make_pool(2.0, 1.0)
+    picks = [pool.pick().name for _ in range(3)]
+    # Weight 2 backend takes two of the first three requests
+    assert picks.count("groq-1") == 2
+
+def test_breaker_opens_after_consecutive_errors():
+    pool = make_pool(1.0, 1.0)
+    bad = pool.backends[0]
+    for _ in range(FAILURE_THRESHOLD):
+        pool.record_failure(pool.pick(exclude={"groq-2"}))
+    assert not bad.stats()["healthy"]
+    assert pool.pick().name == "groq-2"
+    assert pool.pick(exclude={"groq-2"}) is None
+
+def test_request_fails_over_to_next_backend():
+    pool = make_pool(1.0, 1.0)
+    original_pool, original_request = agent.provider_pool, agent.groq_request
+
+    def fake_request(backend, idea, mode):
+        if backend.name == "groq-1":
+            raise RuntimeError("connection reset")
+        return {"code": f"from {backend.name}"}
+
+    agent.provider_pool, agent.groq_request = pool, fake_request
+    try:
+        pool.backends[1].outstanding = 5  # Make groq-1 the first choice
+        result = agent.pool_request("hello", "code", store=False)
+    finally:
+        agent.provider_pool, agent.groq_request = original_pool, original_request
+
+    assert result == {"code": "from groq-2"}
+    assert pool.backends[0].errors == 1
+
+def test_async_request_fails_over_to_next_backend():
+    pool = make_pool(1.0, 1.0)
+    original_pool, original_request = agent.provider_pool, agent.groq_request_async
+
+    async def fake_request(backend, idea, mode):
+        if backend.name == "groq-1":
+            raise RuntimeError("connection reset")
+        return {"code": f"from {backend.name}"}
+
+    agent.provider_pool, agent.groq_request_async = pool, fake_request
+    try:
+        pool.backends[1].outstanding = 5  # Make groq-1 the first choice
+        picked = []
+        result = asyncio.run(agent.pool_request_async("hello", "code", store=False, picked=picked))
+    finally:
+        agent.provider_pool, agent.groq_request_async = original_pool, original_request
+
+    assert result == {"code": "from groq-2"}
+    assert picked == ["groq-1", "groq-2"]
+    assert pool.backends[0].errors == 1
+
+def test_identical_async_calls_are_coalesced():
+    pool = make_pool(1.0)
+    original = agent.provider_pool, agent.groq_request_async, agent.MOCK_MODE
+    calls = []
+
+    async def fake_request(backend, idea, mode):
+        calls.append(idea)
+        await asyncio.sleep(0.1)
+        return {"code": "print('shared')"}
+
+    async def main():
+        return await asyncio.gather(*(agent.run_agent_async("FILE: coalesce_async.py", "code", use_cache=False, hedge=False) for _ in range(3)))
+
+    agent.provider_pool, agent.groq_request_async, agent.MOCK_MODE = pool, fake_request, False
+    try:
+        results = asyncio.run(main())
+    finally:
+        agent.provider_pool, agent.groq_request_async, agent.MOCK_MODE = original
+
+    assert len(calls) == 1
+    assert results == [{"code": "print('shared')"}] * 3
+
+def test_streamed_and_plain_calls_are_coalesced():
+    pool = make_pool(1.0)
+    original = agent.provider_pool, agent.groq_stream, agent.groq_request, agent.MOCK_MODE
+    streams = []
+
+    def fake_stream(backend, idea, mode, on_delta):
+        streams.append(idea)
+        for chunk in ("print(", "'shared'", ")"):
+            time.sleep(0.05)
+            on_delta(chunk)
+        return {"code": "print('shared')"}
+
+    def unexpected_request(backend, idea, mode):
+        raise AssertionError("plain call was not coalesced")
+
+    idea = "FILE: coalesce_stream.py"
+    leader_chunks, follower_chunks, results = [], [], {}
+    agent.provider_pool, agent.groq_stream, agent.groq_request, agent.MOCK_MODE = pool, fake_stream, unexpected_request, False
+    try:
+        leader = threading.Thread(target=lambda: results.update(leader=agent.run_agent_stream(idea, "code", leader_chunks.append, use_cache=False)))
+        leader.start()
+        time.sleep(0.05)
+        followers = [
+            threading.Thread(target=lambda: results.update(plain=agent.run_agent(idea, "code", use_cache=False, hedge=False))),
+            threading.Thread(target=lambda: results.update(stream=agent.run_agent_stream(idea, "code", follower_chunks.append, use_cache=False))),
+        ]
+        for t in followers:
+            t.start()
+        for t in [leader] + followers:
+            t.join(5)
+    finally:
+        agent.provider_pool, agent.groq_stream, agent.groq_request, agent.MOCK_MODE = original
+
+    assert streams == [idea]
+    assert leader_chunks == ["print(", "'shared'", ")"]
+    assert follower_chunks == ["print('shared')"]  # Joined mid-stream: the answer arrives whole
+    assert results["leader"] == results["plain"] == results["stream"] == {"code": "print('shared')"}
+
+def test_slow_request_is_hedged():
+    pool = make_pool(1.0, 1.0)
+    original_pool, original_request = agent.provider_pool, agent.groq_request
+
+    def fake_request(backend, idea, mode):
+        if backend.name == "groq-1":
+            time.sleep(1.0)  # Tail-latency straggler
+        return {"code": f"from {backend.name}"}
+
+    agent.provider_pool, agent.groq_request = pool, fake_request
+    for _ in range(agent.HEDGE_MIN_SAMPLES):
+        agent.latency.record("hedge-test", 0.05)
+    try:
+        pool.backends[1].outstanding = 5  # Make groq-1 the primary
+        start = time.time()
+        result = agent.hedged_request("hello", "hedge-test", store=False)
+        elapsed = time.time() - start
+    finally:
+        agent.provider_pool, agent.groq_request = original_pool, original_request
+
+    assert result == {"code": "from groq-2"}
+    assert elapsed < 0.5
+
+def test_hedge_delay_starts_when_the_primary_runs():
+    pool = make_pool(1.0, 1.0)
+    original = agent.provider_pool, agent.groq_request, agent._hedge_executor
+    busy = threading.Event()
+
+    def fake_request(backend, idea, mode):
+        time.sleep(0.02)  # Well under the hedge delay once it is running
+        return {"code": f"from {backend.name}"}
+
+    executor = ThreadPoolExecutor(max_workers=1)
+    executor.submit(busy.wait, 2)  # Every hedge worker is taken for a while
+    agent.provider_pool, agent.groq_request, agent._hedge_executor = pool, fake_request, executor
+    for _ in range(agent.HEDGE_MIN_SAMPLES):
+        agent.latency.record("hedge-queue-test", 0.1)
+    fired = agent.get_hedge_stats()["fired"]
+    try:
+        threading.Timer(0.3, busy.set).start()
+        result = agent.hedged_request("hello", "hedge-queue-test", store=False)
+    finally:
+        busy.set()
+        agent.provider_pool, agent.groq_request, agent._hedge_executor = original
+        executor.shutdown()
+
+    assert result["code"].startswith("from groq-")
+    assert agent.get_hedge_stats()["fired"] == fired  # 0.3s queued, but the call itself was fast
+
+if __name__ == "__main__":
+    test_least_outstanding_by_weight()
+    test_breaker_opens_after_consecutive_errors()
+    test_request_fails_over_to_next_backend()
+    test_async_request_fails_over_to_next_backend()
+    test_identical_async_calls_are_coalesced()
+    test_streamed_and_plain_calls_are_coalesced()
+    test_slow_request_is_hedged()
+    test_hedge_delay_starts_when_the_primary_runs()
+    print("SUCCESS: Provider pool tests passed")
@@ -0,0 +1,76 @@
+import asyncio
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from agent.ratelimit import RateLimiter, QueueTimeout
+
+def test_requests_bucket_queues_callers():
+    limiter = RateLimiter("test", rpm=600)  # 10 requests/second
+    limiter.requests = 1  # One request left in the bucket
+    assert limiter.acquire() < 0.05
+    limiter.release()
+    waited = limiter.acquire()  # Must wait ~0.1s for a refill
+    limiter.release()
+    assert waited >= 0.05
+
+def test_async_acquire_waits_without_blocking_the_loop():
+    limiter = RateLimiter("test", rpm=600)  # 10 requests/second
+    limiter.requests = 1
+    ticks = []
+
+    async def ticker():
+        for _ in range(5):
+            ticks.append(time.monotonic())
+            await asyncio.sleep(0.01)
+
+    async def main():
+        assert await limiter.acquire_async() < 0.05
+        limiter.release()
+        waited, _ = await asyncio.gather(limiter.acquire_async(), ticker())
+        limiter.release()
+        return waited
+
+    start = time.monotonic()
+    waited = asyncio.run(main())
+    assert waited >= 0.05
+    assert len(ticks) == 5 and ticks[-1] - start < waited  # Other tasks ran while it queued
+
+def test_token_budget_is_reconciled():
+    limiter = RateLimiter("test", tpm=1000)
+    limiter.acquire(tokens=800)
+    limiter.release(reserved=800, used=100)
+    assert limiter.tokens >= 900
+
+def test_throttle_backs_off_and_pauses():
+    limiter = RateLimiter("test", max_in_flight=8)
+    limiter.acquire()
+    limiter.release(throttled=True, retry_after=0.2)
+    stats = limiter.stats()
+    assert stats["concurrency_limit"] == 4
+    assert stats["throttled"] == 1
+
+    start = time.monotonic()
+    limiter.acquire()
+    assert time.monotonic() - start >= 0.15
+    limiter.release()
+
+def test_timeout_instead_of_waiting_forever():
+    limiter = RateLimiter("test", max_in_flight=1)
+    limiter.acquire()
+    try:
+        limiter.acquire(timeout=0.1)
+    except QueueTimeout:
+        assert limiter.stats()["queue_depth"] == 0
+        return
+    raise AssertionError("expected QueueTimeout")
+
+if __name__ == "__main__":
+    test_requests_bucket_queues_callers()
+    test_async_acquire_waits_without_blocking_the_loop()
+    test_token_budget_is_reconciled()
+    test_throttle_backs_off_and_pauses()
+    test_timeout_instead_of_waiting_forever()
+    print("SUCCESS: Rate limiter tests passed")
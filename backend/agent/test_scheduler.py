@@ -0,0 +1,91 @@
+import os
+import sys
+import threading
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from agent.scheduler import run_graph, validate_graph
+
+def test_dependencies_finish_first():
+    order = []
+    graph = {
+        "plan": {"fn": lambda deps: order.append("plan") or "p", "deps": []},
+        "code": {"fn": lambda deps: order.append("code") or deps["plan"] + "c", "deps": ["plan"]},
+        "review": {"fn": lambda deps: order.append("review") or deps["code"] + "r", "deps": ["code"]},
+    }
+    done = {name: result for event, name, result in run_graph(graph) if event == "done"}
+    assert order == ["plan", "code", "review"]
+    assert done["review"] == "pcr"
+
+def test_independent_nodes_overlap():
+    barrier = threading.Barrier(3, timeout=2)
+
+    def wait(deps):
+        barrier.wait()  # Only passes if all three run at the same time
+        return True
+
+    graph = {name: {"fn": wait, "deps": []} for name in ("tests", "cicd", "dockerfile")}
+    start = time.time()
+    events = list(run_graph(graph, max_workers=3))
+    assert len([e for e in events if e[0] == "done"]) == 3
+    assert time.time() - start < 2
+
+def test_nodes_can_stream_updates():
+    def stream(deps, emit):
+        for token in ("def ", "main", "():"):
+            emit(token)
+        return "def main():"
+
+    graph = {"file:main.py": {"fn": stream, "deps": [], "emits": True}}
+    events = list(run_graph(graph))
+    deltas = [payload for event, name, payload in events if event == "emit"]
+    assert deltas == ["def ", "main", "():"]
+    assert events[-1] == ("done", "file:main.py", "def main():")
+
+def test_queued_nodes_start_when_a_worker_is_free():
+    graph = {name: {"fn": lambda deps: True, "deps": []} for name in ("a.py", "b.py")}
+    events = [(event, name) for event, name, _ in run_graph(graph, max_workers=1)]
+    first, second = events[0][1], events[2][1]
+    assert events == [("started", first), ("done", first), ("started", second), ("done", second)]
+
+def test_failing_node_stops_the_graph():
+    release = threading.Event()
+
+    def fail(deps):
+        raise RuntimeError("provider exploded")
+
+    graph = {
+        "file:slow.py": {"fn": lambda deps: release.wait(2), "deps": []},
+        "file:bad.py": {"fn": fail, "deps": []},
+        "review": {"fn": lambda deps: True, "deps": ["file:bad.py"]},
+    }
+    start = time.time()
+    try:
+        list(run_graph(graph, max_workers=2))
+    except RuntimeError:
+        assert time.time() - start < 1  # Does not wait for the slow sibling
+        return
+    finally:
+        release.set()
+    raise AssertionError("failure not raised")
+
+def test_cycle_is_rejected():
+    graph = {
+        "a": {"fn": lambda deps: None, "deps": ["b"]},
+        "b": {"fn": lambda deps: None, "deps": ["a"]},
+    }
+    try:
+        validate_graph(graph)
+    except ValueError:
+        return
+    raise AssertionError("cycle not detected")
+
+if __name__ == "__main__":
+    test_dependencies_finish_first()
+    test_independent_nodes_overlap()
+    test_nodes_can_stream_updates()
+    test_queued_nodes_start_when_a_worker_is_free()
+    test_failing_node_stops_the_graph()
+    test_cycle_is_rejected()
+    print("SUCCESS: Scheduler tests passed")
@@ -0,0 +1,36 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from agent.search import SearchIndex, tokenize
+
+def project(idea, files=(), tech=()):
+    return {"idea": idea, "code_files": list(files), "plan": {"tech_stack": list(tech)}, "all_code": {"x": "code"}}
+
+def test_tokenize_drops_stop_words():
+    assert tokenize("Build a simple To-Do app with Flask") == ["do", "flask"]
+
+def test_bm25_ranks_specific_matches_first():
+    with tempfile.TemporaryDirectory() as tmp:
+        index = SearchIndex(Path(tmp) / "search.db")
+        index.add_many([
+            project("weather dashboard", ["index.html"], ["JavaScript"]),
+            project("todo list api", ["main.py"], ["Python", "Flask"]),
+            project("todo list with drag and drop", ["index.html", "app.js"], ["JavaScript"]),
+            project("markdown blog", ["main.py"], ["Python"]),
+        ])
+        index.add(project("expense tracker api", ["main.py"], ["Python", "FastAPI"]))
+
+        results = index.search("flask todo api", limit=2)
+        assert [r["idea"] for r in results] == ["todo list api", "expense tracker api"]
+        assert "all_code" not in results[0]  # Results don't carry generated code
+        assert index.search("quantum compiler") == []
+        assert index.count() == 5
+
+if __name__ == "__main__":
+    test_tokenize_drops_stop_words()
+    test_bm25_ranks_specific_matches_first()
+    print("SUCCESS: Search index tests passed")
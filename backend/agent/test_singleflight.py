@@ -0,0 +1,73 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from agent.singleflight import SingleFlight, SharedStream
+
+def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight()
+    calls = []
+
+    def slow_call():
+        calls.append(1)
+        time.sleep(0.2)
+        return {"code": "shared"}
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flight.do("key", slow_call))) for _ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert results == [{"code": "shared"}] * 5
+    # Callers get independent copies
+    results[0]["code"] = "changed"
+    assert results[1]["code"] == "shared"
+
+def test_concurrent_async_calls_share_one_execution():
+    flight = SingleFlight()
+    calls = []
+
+    async def slow_call():
+        calls.append(1)
+        await asyncio.sleep(0.1)
+        return {"code": "shared"}
+
+    async def main():
+        return await asyncio.gather(*(flight.do_async("key", slow_call) for _ in range(5)))
+
+    results = asyncio.run(main())
+    assert len(calls) == 1
+    assert results == [{"code": "shared"}] * 5
+    results[0]["code"] = "changed"
+    assert results[1]["code"] == "shared"
+    assert flight.shared == 4
+
+def test_late_subscriber_replays_events():
+    release = threading.Event()
+
+    def source():
+        yield "start"
+        release.wait()
+        yield "complete"
+
+    stream = SharedStream(source()).start()
+    first = stream.subscribe()
+    assert next(first) == "start"
+
+    late = stream.subscribe()
+    release.set()
+    assert list(late) == ["start", "complete"]
+    assert list(first) == ["complete"]
+
+if __name__ == "__main__":
+    test_concurrent_calls_share_one_execution()
+    test_concurrent_async_calls_share_one_execution()
+    test_late_subscriber_replays_events()
+    print("SUCCESS: Single-flight tests passed")
@@ -0,0 +1,73 @@
+import os
+import sys
+from types import SimpleNamespace
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from agent import agent
+from agent.providers import Backend, ProviderPool
+from agent.tracing import Trace, llm_call, note_attempt, mark_checkpoint, get_stage_stats
+
+class FakeCompletions:
+    def __init__(self):
+        self.calls = 0
+
+    def create(self, **kwargs):
+        self.calls += 1
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content="def main():\n    pass"))],
+            usage=SimpleNamespace(prompt_tokens=120, completion_tokens=30, total_tokens=150),
+        )
+
+def test_span_collects_calls_and_tokens():
+    trace = Trace("build-1")
+    with trace.span("plan"):
+        with llm_call("plan"):
+            note_attempt("groq-1", 0.25, 100, 40)
+        with llm_call("plan") as cached:
+            cached["source"] = "cache"
+    with trace.span("file:main.py", "code"):
+        mark_checkpoint()
+
+    summary = trace.summary()
+    assert summary["build_id"] == "build-1"
+    assert summary["llm_calls"] == 2
+    assert summary["prompt_tokens"] == 100 and summary["completion_tokens"] == 40
+    assert summary["cache_hits"] == 1
+    plan, code = summary["stages"]
+    assert plan["queue_wait"] == 0.25
+    assert [c["source"] for c in plan["calls"]] == ["provider", "cache"]
+    assert code["stage"] == "code" and code["checkpoint"]
+    assert get_stage_stats()["code"]["checkpoints"] >= 1
+
+def test_call_without_attempts_is_coalesced():
+    with llm_call("code") as call:
+        pass
+    assert call["source"] == "coalesced"
+
+def test_run_agent_reports_provider_usage():
+    backend = Backend("groq-1", "groq", "key")
+    completions = FakeCompletions()
+    backend._client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    original_pool, original_mock = agent.provider_pool, agent.MOCK_MODE
+    agent.provider_pool, agent.MOCK_MODE = ProviderPool([backend]), False
+    trace = Trace("build-2")
+    try:
+        with trace.span("review"):
+            agent.run_agent("tracing test idea", "code", use_cache=False)
+    finally:
+        agent.provider_pool, agent.MOCK_MODE = original_pool, original_mock
+
+    call = trace.summary()["stages"][0]["calls"][0]
+    assert completions.calls == 1
+    assert call["source"] == "provider"
+    assert call["attempts"][0]["provider"] == "groq-1"
+    assert call["attempts"][0]["prompt_tokens"] == 120
+    assert call["attempts"][0]["completion_tokens"] == 30
+    assert not call["attempts"][0]["estimated"]
+
+if __name__ == "__main__":
+    test_span_collects_calls_and_tokens()
+    test_call_without_attempts_is_coalesced()
+    test_run_agent_reports_provider_usage()
+    print("SUCCESS: Tracing tests passed")
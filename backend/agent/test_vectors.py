@@ -0,0 +1,40 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from agent.vectors import VectorIndex
+
+def test_paraphrases_are_close():
+    with tempfile.TemporaryDirectory() as tmp:
+        index = VectorIndex(Path(tmp) / "vectors")
+        index.add_many([
+            {"idea": "weather forecast dashboard", "all_code": {"main.py": "x"}},
+            {"idea": "task tracker", "code_files": ["index.html"]},
+        ])
+        index.add({"idea": "markdown blog engine"})
+
+        results = index.search("todo list", limit=2)
+        assert results[0][1]["idea"] == "task tracker"
+        assert results[0][0] > results[1][0]
+        assert index.search("quantum compiler", min_score=0.5) == []
+
+def test_recovers_from_torn_append():
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp) / "vectors"
+        index = VectorIndex(root)
+        index.add({"idea": "url shortener"})
+        with open(root / "vectors.f32", "ab") as f:
+            f.write(b"\0" * 100)  # Partial vector from a crash mid-append
+
+        reopened = VectorIndex(root)
+        assert reopened.count() == 1
+        reopened.add({"idea": "bookmark manager"})
+        assert reopened.search("link shortener", limit=1)[0][1]["idea"] == "url shortener"
+
+if __name__ == "__main__":
+    test_paraphrases_are_close()
+    test_recovers_from_torn_append()
+    print("SUCCESS: Vector index tests passed")
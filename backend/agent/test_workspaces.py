@@ -0,0 +1,97 @@
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from agent import workspaces
+
+def test_workspaces_are_isolated_and_collected():
+    original, tmp = workspaces.WORKSPACE_DIR, tempfile.TemporaryDirectory()
+    workspaces.WORKSPACE_DIR = Path(tmp.name) / "workspaces"
+    try:
+        first, second = workspaces.new_job_id(), workspaces.new_job_id()
+        (workspaces.create_workspace(first) / "main.py").write_text("print(1)")
+        (workspaces.create_workspace(second) / "main.py").write_text("print(2)")
+        assert (workspaces.get_workspace(first) / "main.py").read_text() == "print(1)"
+        assert workspaces.get_workspace("../etc") is None
+
+        # Both are old, but only the finished one may be collected
+        old = time.time() - 3600
+        for job in (first, second):
+            os.utime(workspaces.WORKSPACE_DIR / job, (old, old))
+        workspaces.release_workspace(first)
+        assert workspaces.gc_workspaces(max_age=60) == [first]
+        assert workspaces.get_workspace(second) is not None
+
+        workspaces.release_workspace(second)
+        assert workspaces.gc_workspaces(max_bytes=0) == [second]
+    finally:
+        workspaces.WORKSPACE_DIR = original
+        tmp.cleanup()
+
+def test_finished_build_is_copied_out():
+    original, tmp = workspaces.WORKSPACE_DIR, tempfile.TemporaryDirectory()
+    workspaces.WORKSPACE_DIR = Path(tmp.name) / "workspaces"
+    try:
+        finished, running = workspaces.new_job_id(), workspaces.new_job_id()
+        workspace = workspaces.create_workspace(finished)
+        (workspace / "src").mkdir()
+        (workspace / "src" / "main.py").write_text("print(1)")
+        (workspace / ".checkpoints").mkdir()
+        (workspace / ".checkpoints" / "plan.json").write_text("{}")
+        workspaces.release_workspace(finished)
+        workspaces.create_workspace(running)  # Newer, but still being written
+        assert workspaces.latest_workspace() == workspace
+        assert workspaces.build_running(running) and not workspaces.build_running(finished)
+
+        dest = Path(tmp.name) / "output"
+        assert workspaces.copy_project(workspace, dest) == 1
+        assert (dest / "src" / "main.py").read_text() == "print(1)"
+        assert not (dest / ".checkpoints").exists()
+        workspaces.release_workspace(running)
+    finally:
+        workspaces.WORKSPACE_DIR = original
+        tmp.cleanup()
+
+def test_resumed_and_previous_workspaces_are_not_collected():
+    original, original_size = workspaces.WORKSPACE_DIR, workspaces._dir_size
+    tmp = tempfile.TemporaryDirectory()
+    workspaces.WORKSPACE_DIR = Path(tmp.name) / "workspaces"
+    try:
+        old_build, improved, resumed = (workspaces.new_job_id() for _ in range(3))
+        for job in (old_build, resumed):
+            (workspaces.create_workspace(job) / "main.py").write_text("print(1)")
+            workspaces.release_workspace(job)
+            old = time.time() - 3600
+            os.utime(workspaces.WORKSPACE_DIR / job, (old, old))
+
+        # An improve build reads old_build's workspace until it is released
+        workspaces.create_workspace(improved, previous_job=old_build)
+
+        # A resume reopens its workspace after collection has listed it
+        def size_then_resume(path):
+            if path.name == resumed:
+                workspaces.create_workspace(resumed, keep_existing=True)
+            return original_size(path)
+
+        workspaces._dir_size = size_then_resume
+        assert workspaces.gc_workspaces(max_age=60) == []
+        assert (workspaces.get_workspace(resumed) / "main.py").exists()
+        assert (workspaces.get_workspace(old_build) / "main.py").exists()
+
+        workspaces._dir_size = original_size
+        workspaces.release_workspace(improved, previous_job=old_build)
+        assert workspaces.gc_workspaces(max_age=60) == [old_build]
+        workspaces.release_workspace(resumed)
+    finally:
+        workspaces.WORKSPACE_DIR, workspaces._dir_size = original, original_size
+        tmp.cleanup()
+
+if __name__ == "__main__":
+    test_workspaces_are_isolated_and_collected()
+    test_finished_build_is_copied_out()
+    test_resumed_and_previous_workspaces_are_not_collected()
+    print("SUCCESS: Workspace tests passed")
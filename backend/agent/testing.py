@@ -0,0 +1,36 @@
+"""
+Testing Helpers - Run builds without touching the real storage/ and workspaces/.
+Shared by the test scripts and the benchmark runner.
+"""
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+
+@contextmanager
+def isolated_workdir():
+    """
+    Run inside a throwaway directory: storage/ and workspaces/ are relative paths.
+    Memory and stats handles opened earlier in this process are swapped out too,
+    so nothing is written to the real storage/ and it is all restored after.
+    """
+    from agent import intelligence, memory
+    from agent.search import SearchIndex
+
+    intelligence.flush_stats()  # Pending stats belong to the real storage/
+    saved = (memory._store, memory._index, memory._index_checked, memory._vectors, memory._vectors_loaded)
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="autogenesis-test-") as workdir:
+        os.chdir(workdir)
+        memory._store, memory._index, memory._index_checked = memory._open_store(), SearchIndex(), False
+        memory._vectors, memory._vectors_loaded = None, False
+        intelligence._stats = None
+        try:
+            yield Path(workdir)
+        finally:
+            intelligence.flush_stats()
+            intelligence._stats = None  # Reloaded from the real storage/ on next use
+            memory._index.clear()  # Closes the temporary database
+            memory._store, memory._index, memory._index_checked, memory._vectors, memory._vectors_loaded = saved
+            os.chdir(cwd)
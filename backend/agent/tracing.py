@@ -0,0 +1,193 @@
+"""
+Build Tracing - Where a build's time and tokens go.
+Each pipeline phase runs inside a span; every run_agent call inside it is
+recorded with wall time, queue wait, tokens, provider and where the answer
+came from (provider, cache, mock, fallback...). Spans form a per-build
+trace and also feed process-wide per-stage aggregates for /status.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from .latency import RollingHistogram
+from .metrics import Histogram
+
+_current_span = ContextVar("trace_span", default=None)
+_current_call = ContextVar("llm_call", default=None)
+
+_lock = threading.Lock()
+_stage_stats = {}  # stage -> counters
+_stage_latency = RollingHistogram()
+STAGE_LATENCY = Histogram("autogenesis_pipeline_stage_duration_seconds", "Wall time of pipeline stages.", ("stage",))
+
+
+def _empty_counters() -> dict:
+    return {
+        "count": 0, "seconds": 0.0, "max_seconds": 0.0, "queue_wait": 0.0,
+        "llm_calls": 0, "prompt_tokens": 0, "completion_tokens": 0,
+        "cache_hits": 0, "fallbacks": 0, "checkpoints": 0,
+    }
+
+
+class Trace:
+    """Spans of one build, safe to add to from the scheduler's worker threads."""
+
+    def __init__(self, build_id: str):
+        self.build_id = build_id
+        self.started = time.monotonic()
+        self.spans = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name: str, stage: str = None):
+        """Time a phase and collect the LLM calls made inside it (same thread)."""
+        record = {
+            "name": name,
+            "stage": stage or name,
+            "offset": round(time.monotonic() - self.started, 3),
+            "seconds": 0.0,
+            "calls": [],
+            "checkpoint": False,
+        }
+        token = _current_span.set(record)
+        started = time.monotonic()
+        try:
+            yield record
+        finally:
+            _current_span.reset(token)
+            record["seconds"] = round(time.monotonic() - started, 3)
+            with self._lock:
+                self.spans.append(record)
+            _aggregate(record)
+
+    def summary(self) -> dict:
+        """Trace for the "complete" event: per-span detail plus build totals."""
+        with self._lock:
+            spans = list(self.spans)
+        totals = _empty_counters()
+        stages = []
+        for span in sorted(spans, key=lambda s: s["offset"]):
+            counters = _span_counters(span)
+            for key in ("llm_calls", "prompt_tokens", "completion_tokens", "cache_hits", "fallbacks"):
+                totals[key] += counters[key]
+            totals["queue_wait"] += counters["queue_wait"]
+            stages.append({
+                "name": span["name"],
+                "stage": span["stage"],
+                "offset": span["offset"],
+                "seconds": span["seconds"],
+                "checkpoint": span["checkpoint"],
+                "queue_wait": round(counters["queue_wait"], 3),
+                "llm_calls": counters["llm_calls"],
+                "prompt_tokens": counters["prompt_tokens"],
+                "completion_tokens": counters["completion_tokens"],
+                "calls": span["calls"],
+            })
+        return {
+            "build_id": self.build_id,
+            "total_seconds": round(time.monotonic() - self.started, 3),
+            "llm_calls": totals["llm_calls"],
+            "prompt_tokens": totals["prompt_tokens"],
+            "completion_tokens": totals["completion_tokens"],
+            "queue_wait": round(totals["queue_wait"], 3),
+            "cache_hits": totals["cache_hits"],
+            "fallbacks": totals["fallbacks"],
+            "stages": stages,
+        }
+
+
+def mark_checkpoint():
+    """The current span's result came from a checkpoint."""
+    span = _current_span.get()
+    if span is not None:
+        span["checkpoint"] = True
+
+
+@contextmanager
+def llm_call(mode: str):
+    """
+    Wrap one run_agent call. The yielded dict starts with source "provider";
+    shortcuts set it to "preloaded", "mock" or "cache" and note_attempt()
+    adds each provider attempt (hedges and failovers included).
+    """
+    call = {"mode": mode, "source": "provider", "seconds": 0.0, "attempts": []}
+    token = _current_call.set(call)
+    started = time.monotonic()
+    try:
+        yield call
+    finally:
+        _current_call.reset(token)
+        call["seconds"] = round(time.monotonic() - started, 3)
+        if call["source"] == "provider" and not call["attempts"]:
+            call["source"] = "coalesced"  # Answered by an identical call already in flight
+        span = _current_span.get()
+        if span is not None:
+            span["calls"].append(call)
+        else:
+            _aggregate({"stage": "api", "seconds": call["seconds"], "calls": [call], "checkpoint": False})
+
+
+def note_attempt(provider: str, queue_wait: float, prompt_tokens: int = 0, completion_tokens: int = 0,
+                 estimated: bool = False, error: bool = False):
+    """
+    Record one provider request made for the current run_agent call.
+    estimated=True when the provider didn't report usage and tokens were
+    guessed from text length; failed attempts still count their queue wait.
+    """
+    call = _current_call.get()
+    if call is None:
+        return
+    call["attempts"].append({
+        "provider": provider,
+        "queue_wait": round(queue_wait, 3),
+        "prompt_tokens": prompt_tokens or 0,
+        "completion_tokens": completion_tokens or 0,
+        "estimated": estimated,
+        "error": error,
+    })
+
+
+def _span_counters(span: dict) -> dict:
+    counters = _empty_counters()
+    for call in span["calls"]:
+        counters["llm_calls"] += 1
+        counters["cache_hits"] += call["source"] == "cache"
+        counters["fallbacks"] += call["source"] == "fallback"
+        for attempt in call["attempts"]:
+            counters["queue_wait"] += attempt["queue_wait"]
+            counters["prompt_tokens"] += attempt["prompt_tokens"]
+            counters["completion_tokens"] += attempt["completion_tokens"]
+    return counters
+
+
+def _aggregate(span: dict):
+    counters = _span_counters(span)
+    stage = span["stage"]
+    _stage_latency.record(stage, span["seconds"])
+    STAGE_LATENCY.observe(span["seconds"], stage=stage)
+    with _lock:
+        stats = _stage_stats.setdefault(stage, _empty_counters())
+        stats["count"] += 1
+        stats["seconds"] += span["seconds"]
+        stats["max_seconds"] = max(stats["max_seconds"], span["seconds"])
+        stats["checkpoints"] += bool(span["checkpoint"])
+        for key in ("queue_wait", "llm_calls", "prompt_tokens", "completion_tokens", "cache_hits", "fallbacks"):
+            stats[key] += counters[key]
+
+
+def get_stage_stats() -> dict:
+    """Per-stage totals and recent latency percentiles for /status."""
+    latency = _stage_latency.snapshot()
+    with _lock:
+        result = {}
+        for stage, stats in _stage_stats.items():
+            result[stage] = {
+                **stats,
+                "seconds": round(stats["seconds"], 3),
+                "queue_wait": round(stats["queue_wait"], 3),
+                "avg_seconds": round(stats["seconds"] / stats["count"], 3) if stats["count"] else 0.0,
+                "p50": latency.get(stage, {}).get("p50", 0),
+                "p95": latency.get(stage, {}).get("p95", 0),
+            }
+        return result
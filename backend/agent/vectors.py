@@ -0,0 +1,148 @@
+"""
+Semantic Index - Local hashed n-gram embeddings for similar-project lookup.
+Vectors are appended to a float32 file under storage/vectors/ and read
+through a memory map, so top-k search is one matrix-vector product.
+Everything runs on the CPU; nothing leaves the machine.
+"""
+import json
+import os
+import re
+import threading
+import zlib
+from pathlib import Path
+
+import numpy as np
+
+from .search import STOP_WORDS, project_summary, project_text
+
+VECTOR_DIR = Path("storage/vectors")
+EMBED_DIM = int(os.getenv("EMBED_DIM", "512"))
+
+# Words that mean the same thing in project ideas share an extra feature,
+# so "todo list" lands near "task tracker" even with no words in common
+SYNONYM_GROUPS = [
+    {"todo", "todos", "task", "tasks", "checklist", "chores", "reminder", "reminders"},
+    {"list", "tracker", "manager", "organizer", "planner", "board"},
+    {"note", "notes", "notebook", "memo", "journal", "diary"},
+    {"blog", "article", "articles", "post", "posts", "cms"},
+    {"chat", "chatbot", "messenger", "messaging", "message", "messages", "bot"},
+    {"shop", "store", "ecommerce", "cart", "checkout", "marketplace"},
+    {"weather", "forecast", "climate"},
+    {"expense", "expenses", "budget", "finance", "spending", "money"},
+    {"quiz", "trivia", "flashcard", "flashcards", "exam"},
+    {"api", "rest", "backend", "endpoint", "endpoints", "server"},
+    {"website", "site", "page", "landing", "portfolio", "frontend"},
+    {"game", "puzzle", "arcade", "snake", "tetris"},
+    {"url", "link", "links", "shortener", "bookmark", "bookmarks"},
+    {"calculator", "converter", "calc"},
+    {"timer", "stopwatch", "pomodoro", "countdown", "clock"},
+]
+_CONCEPTS = {word: f"concept:{i}" for i, group in enumerate(SYNONYM_GROUPS) for word in group}
+
+
+def _features(text: str) -> list:
+    """Weighted features: words, concepts, word bigrams and character trigrams."""
+    words = [w for w in re.findall(r"[a-z0-9]+", text.lower()) if w not in STOP_WORDS]
+    features = []
+    for word in words:
+        features.append((f"w:{word}", 1.0))
+        if word in _CONCEPTS:
+            features.append((_CONCEPTS[word], 1.0))
+        padded = f"<{word}>"
+        features += [(f"c:{padded[i:i + 3]}", 0.3) for i in range(len(padded) - 2)]
+    features += [(f"b:{a} {b}", 0.5) for a, b in zip(words, words[1:])]
+    return features
+
+
+def embed(text: str) -> np.ndarray:
+    """L2-normalised hashed feature vector of length EMBED_DIM."""
+    vector = np.zeros(EMBED_DIM, dtype=np.float32)
+    for feature, weight in _features(text):
+        h = zlib.crc32(feature.encode("utf-8"))
+        sign = 1.0 if h & 0x80000000 else -1.0  # Signed hashing keeps collisions from piling up
+        vector[h % EMBED_DIM] += sign * weight
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+class VectorIndex:
+    """Append-only embedding matrix plus a JSON-lines sidecar of project summaries."""
+
+    def __init__(self, root: Path = VECTOR_DIR):
+        self.root = Path(root)
+        self.vectors_file = self.root / "vectors.f32"
+        self.meta_file = self.root / "projects.jsonl"
+        self._lock = threading.Lock()
+        self._offsets = None  # Byte offset of each sidecar line
+
+    def _load(self) -> list:
+        if self._offsets is None:
+            self.root.mkdir(parents=True, exist_ok=True)
+            offsets, end = [], 0
+            if self.meta_file.exists():
+                with open(self.meta_file, "rb") as f:
+                    for line in f:
+                        if not line.endswith(b"\n"):
+                            break  # Torn final line
+                        offsets.append(end)
+                        end += len(line)
+            rows = self.vectors_file.stat().st_size // (EMBED_DIM * 4) if self.vectors_file.exists() else 0
+            # A crash between the two appends leaves one file ahead; trim both to the shorter
+            count = min(rows, len(offsets))
+            if self.vectors_file.exists():
+                os.truncate(self.vectors_file, count * EMBED_DIM * 4)
+            if self.meta_file.exists():
+                os.truncate(self.meta_file, offsets[count] if count < len(offsets) else end)
+            self._offsets = offsets[:count]
+        return self._offsets
+
+    def add(self, project: dict):
+        self.add_many([project])
+
+    def add_many(self, projects) -> int:
+        count = 0
+        with self._lock:
+            offsets = self._load()
+            with open(self.vectors_file, "ab") as vectors, open(self.meta_file, "ab") as meta:
+                position = meta.tell()
+                for project in projects:
+                    line = (json.dumps(project_summary(project), separators=(",", ":")) + "\n").encode("utf-8")
+                    vectors.write(embed(project_text(project)).tobytes())
+                    meta.write(line)
+                    offsets.append(position)
+                    position += len(line)
+                    count += 1
+        return count
+
+    def count(self) -> int:
+        with self._lock:
+            return len(self._load())
+
+    def search(self, query: str, limit: int = 3, min_score: float = 0.0) -> list:
+        """(score, project) pairs for the most similar projects, best first."""
+        query_vector = embed(query)
+        with self._lock:
+            offsets = list(self._load())
+        if not offsets or not query_vector.any():
+            return []
+
+        matrix = np.memmap(self.vectors_file, dtype=np.float32, mode="r", shape=(len(offsets), EMBED_DIM))
+        scores = matrix @ query_vector
+        k = min(limit, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+
+        results = []
+        with open(self.meta_file, "rb") as f:
+            for row in top:
+                if scores[row] < min_score:
+                    break
+                f.seek(offsets[row])
+                results.append((float(scores[row]), json.loads(f.readline())))
+        return results
+
+    def clear(self):
+        with self._lock:
+            for path in (self.vectors_file, self.meta_file):
+                path.unlink(missing_ok=True)
+            self._offsets = None
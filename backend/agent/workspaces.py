@@ -0,0 +1,205 @@
+"""
+Build Workspaces - Each build writes into its own workspaces/<job_id>/ folder.
+Concurrent builds never touch each other's files. Finished workspaces
+are garbage-collected in the background by age and by total size.
+"""
+import os
+import re
+import shutil
+import threading
+import time
+import uuid
+from collections import Counter
+from pathlib import Path
+
+from .metrics import Collected
+
+WORKSPACE_DIR = Path(os.getenv("WORKSPACE_DIR", "workspaces"))
+WORKSPACE_MAX_AGE = float(os.getenv("WORKSPACE_MAX_AGE_HOURS", "24")) * 3600
+WORKSPACE_MAX_BYTES = int(os.getenv("WORKSPACE_MAX_MB", "500")) * 1024 * 1024
+WORKSPACE_GC_INTERVAL = float(os.getenv("WORKSPACE_GC_INTERVAL", "600"))  # seconds
+
+INTERNAL_DIRS = {".checkpoints"}  # Build bookkeeping, not part of the exported project
+
+_JOB_ID = re.compile(r"^[a-f0-9]{8,32}$")
+_lock = threading.Lock()
+_active = set()  # Job ids with a build still running; never collected
+_pinned = Counter()  # Job ids whose workspace a running build reads (improve mode); never collected
+_gc_timer = None
+
+
+def new_job_id() -> str:
+    return uuid.uuid4().hex[:16]
+
+
+def valid_job_id(job_id: str) -> bool:
+    return bool(job_id) and bool(_JOB_ID.match(job_id))
+
+
+def create_workspace(job_id: str, keep_existing: bool = False, previous_job: str = None) -> Path:
+    """
+    Make a fresh workspace for a build (or reopen it to resume) and mark it active.
+    previous_job's workspace is kept from collection until the build is released.
+    """
+    if not valid_job_id(job_id):
+        raise ValueError(f"Invalid job id: {job_id!r}")
+    path = WORKSPACE_DIR / job_id
+    with _lock:  # Before touching the directory, so collection skips it from here on
+        _active.add(job_id)
+        if previous_job:
+            _pinned[previous_job] += 1
+    if path.exists() and not keep_existing:
+        shutil.rmtree(path)
+    path.mkdir(parents=True, exist_ok=True)
+    _schedule_gc()
+    return path
+
+
+def release_workspace(job_id: str, previous_job: str = None):
+    """The build finished; its workspace (and previous_job's) may now be collected."""
+    with _lock:
+        _active.discard(job_id)
+        if previous_job:
+            _pinned[previous_job] -= 1
+            if _pinned[previous_job] <= 0:
+                del _pinned[previous_job]
+
+
+def build_running(job_id: str) -> bool:
+    """True while a build is still writing to this job's workspace."""
+    with _lock:
+        return job_id in _active
+
+
+def active_builds() -> int:
+    """Number of builds currently writing to a workspace."""
+    with _lock:
+        return len(_active)
+
+
+Collected("autogenesis_pipelines_in_flight", "Builds currently running.", active_builds)
+
+
+def get_workspace(job_id: str):
+    """Workspace path for a job, or None if the id is unknown."""
+    if not valid_job_id(job_id):
+        return None
+    path = WORKSPACE_DIR / job_id
+    return path if path.is_dir() else None
+
+
+def latest_workspace():
+    """Most recently created workspace whose build has finished, or None."""
+    with _lock:
+        active = set(_active)
+    workspaces = [w for w in _list_workspaces() if w[0].name not in active]
+    return max(workspaces, key=lambda w: w[1])[0] if workspaces else None
+
+
+def iter_project_files(workspace: Path):
+    """(relative path, absolute path) of every project file, sorted, skipping internal dirs."""
+    workspace = Path(workspace)
+    for root, dirs, files in os.walk(workspace):
+        dirs[:] = sorted(d for d in dirs if d not in INTERNAL_DIRS)
+        for name in sorted(files):
+            full = Path(root) / name
+            yield full.relative_to(workspace).as_posix(), full
+
+
+def copy_project(workspace: Path, dest: Path) -> int:
+    """Copy a workspace's project files into dest (merged); returns the file count."""
+    dest = Path(dest)
+    count = 0
+    for rel, full in iter_project_files(workspace):
+        target = dest / rel
+        target.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy2(full, target)
+        count += 1
+    return count
+
+
+def _dir_size(path: Path) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+def _list_workspaces() -> list:
+    """(path, mtime) for every workspace directory."""
+    if not WORKSPACE_DIR.exists():
+        return []
+    result = []
+    for path in WORKSPACE_DIR.iterdir():
+        if path.name.startswith("."):
+            continue  # Being deleted
+        try:
+            if path.is_dir():
+                result.append((path, path.stat().st_mtime))
+        except OSError:
+            pass
+    return result
+
+
+def gc_workspaces(max_age: float = None, max_bytes: int = None) -> list:
+    """Delete expired workspaces, then the oldest ones until under the size cap."""
+    max_age = WORKSPACE_MAX_AGE if max_age is None else max_age
+    max_bytes = WORKSPACE_MAX_BYTES if max_bytes is None else max_bytes
+    with _lock:  # A build starting now is either already active or not listed yet
+        candidates = sorted(
+            (mtime, path) for path, mtime in _list_workspaces()
+            if path.name not in _active and path.name not in _pinned
+        )
+    for leftover in WORKSPACE_DIR.glob(".deleting-*"):  # From a collection that was interrupted
+        shutil.rmtree(leftover, ignore_errors=True)
+    sizes = {path: _dir_size(path) for _, path in candidates}
+    total = sum(sizes.values())
+    now = time.time()
+
+    removed = []
+    for mtime, path in candidates:
+        if now - mtime <= max_age and total <= max_bytes:
+            break
+        with _lock:
+            if path.name in _active or path.name in _pinned:
+                continue  # Reopened to resume, or read by an improve build, since the listing
+            trash = path.with_name(f".deleting-{path.name}")
+            try:
+                path.rename(trash)
+            except OSError:
+                continue
+        shutil.rmtree(trash, ignore_errors=True)
+        total -= sizes[path]
+        removed.append(path.name)
+    return removed
+
+
+def _schedule_gc():
+    """Collect every WORKSPACE_GC_INTERVAL seconds in the background, never in a request."""
+    global _gc_timer
+    with _lock:
+        if _gc_timer is not None:
+            return
+        _gc_timer = threading.Timer(WORKSPACE_GC_INTERVAL, _run_gc)
+        _gc_timer.daemon = True
+        _gc_timer.start()
+
+
+def _run_gc():
+    global _gc_timer
+    with _lock:
+        _gc_timer = None
+    try:
+        gc_workspaces()
+    except OSError as e:
+        print(f"⚠️  Workspace cleanup failed: {e}")
+    _schedule_gc()
+
+
+def clear_workspaces() -> list:
+    """Delete every workspace that has no build running."""
+    return gc_workspaces(max_age=-1, max_bytes=0)
@@ -1,11 +1,12 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Header, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, StreamingResponse
+from fastapi.responses import FileResponse, StreamingResponse, PlainTextResponse
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel
-from agent.orchestrator import run_pipeline, run_pipeline_streaming
+from agent.orchestrator import run_pipeline, run_pipeline_shared
 
-import shutil
 import os
+import time
 
 # -------------------------------
 # MODELS
@@ -13,6 +14,10 @@ import os
 class Prompt(BaseModel):
     idea: str
     improve: bool = False
+    previous_job: str = None  # Build to patch in improve mode (defaults to the last build of the idea)
+
+class JobRequest(Prompt):
+    resume_job: str = None  # Rerun this job, reusing its checkpointed phases
 
 
 
@@ -30,6 +35,22 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Count requests and time them per route template (streams: until headers are sent)."""
+    from agent.metrics import HTTP_REQUESTS, HTTP_LATENCY
+    started = time.monotonic()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        path = getattr(route, "path", "unmatched")  # Templates keep job/project ids out of labels
+        HTTP_REQUESTS.inc(method=request.method, route=path, status=status)
+        HTTP_LATENCY.observe(time.monotonic() - started, method=request.method, route=path)
+
 
 class OptimizeRequest(BaseModel):
     idea: str
@@ -37,8 +58,8 @@ class OptimizeRequest(BaseModel):
 @app.post("/optimize")
 async def optimize_prompt(req: OptimizeRequest):
     """Optimize the user's prompt using AI."""
-    from agent.agent import run_agent
-    result = run_agent(req.idea, mode="optimize")
+    from agent.agent import run_agent_async
+    result = await run_agent_async(req.idea, mode="optimize")
     return {"optimized_prompt": result.get("response", req.idea)}
 
 @app.on_event("startup")
@@ -56,13 +77,22 @@ async def startup_event():
     print(f"⚠️ MOCK_MODE: {mock}")
     print("="*50 + "\n")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    from agent.agent import close_async_clients
+    from agent.intelligence import flush_stats
+    from agent.jobs import shutdown_jobs
+    shutdown_jobs()
+    await close_async_clients()
+    flush_stats()
+
 # -------------------------------
 # ROUTES
 # -------------------------------
 
 @app.get("/")
 async def root():
-    return {"status": "Autogenesis Backend Running", "endpoints": ["/run", "/run-stream", "/export", "/templates", "/ping"]}
+    return {"status": "Autogenesis Backend Running", "endpoints": ["/run", "/run-stream", "/jobs", "/export", "/templates", "/ping"]}
 
 @app.get("/templates")
 async def get_templates():
@@ -71,22 +101,33 @@ async def get_templates():
     return get_templates()
 
 @app.get("/memory")
-async def get_memory():
-    """Get project history for Memory View."""
+async def get_memory(page: int = 1, page_size: int = 20, language: str = None):
+    """Get project history for Memory View, one page at a time (newest first)."""
     from agent.memory import get_memory_history
-    return get_memory_history()
+    page_size = max(1, min(page_size, 100))
+    return await run_in_threadpool(get_memory_history, page, page_size, language)
+
+@app.get("/memory/{project_id}")
+async def get_memory_project(project_id: int):
+    """Full stored project, including generated code, for one Memory View entry."""
+    from agent.memory import get_project
+    project = await run_in_threadpool(get_project, project_id)
+    if project is None:
+        return {"error": "Project not found"}
+    return project
 
 @app.post("/run")
 async def run(prompt: Prompt):
     """Standard endpoint - returns final result only."""
-    result = run_pipeline(prompt.idea, improve_mode=prompt.improve)
+    # The pipeline fans out blocking LLM calls on its own pool; keep it off the event loop
+    result = await run_in_threadpool(run_pipeline, prompt.idea, improve_mode=prompt.improve, previous_job=prompt.previous_job)
     return {"result": result}
 
 @app.post("/run-stream")
 async def run_stream(prompt: Prompt):
     """SSE streaming endpoint - yields progress updates."""
     def generate():
-        for update in run_pipeline_streaming(prompt.idea, improve_mode=prompt.improve):
+        for update in run_pipeline_shared(prompt.idea, improve_mode=prompt.improve, previous_job=prompt.previous_job):
             yield f"data: {update}\n\n"
     
     return StreamingResponse(
@@ -99,18 +140,91 @@ async def run_stream(prompt: Prompt):
         }
     )
 
+@app.post("/jobs")
+async def create_job(prompt: JobRequest):
+    """Queue a background build and return its job id straight away."""
+    from agent.jobs import submit_job, QueueFull
+    try:
+        job = submit_job(prompt.idea, improve_mode=prompt.improve, resume_job=prompt.resume_job, previous_job=prompt.previous_job)
+    except QueueFull as e:
+        return {"error": f"Build queue is full: {e}"}
+    except ValueError as e:
+        return {"error": str(e)}
+    return {"job_id": job.id, "status": job.status}
+
+@app.get("/jobs/{job_id}")
+async def get_job_status(job_id: str):
+    """Job status, event count and (once done) the build result."""
+    from agent.jobs import get_job
+    job = get_job(job_id)
+    if job is None:
+        return {"error": f"Unknown job: {job_id}"}
+    return job.info()
+
+@app.get("/jobs/{job_id}/events")
+async def job_events(job_id: str, last_event_id: int = None, last_event_id_header: str = Header(None, alias="Last-Event-ID")):
+    """
+    SSE stream of a job's progress. Replays buffered events after the given
+    Last-Event-ID (header, or ?last_event_id= for the first connection)
+    and then follows the build live. Disconnecting does not stop the build.
+    """
+    from agent.jobs import get_job
+    job = get_job(job_id)
+    if job is None:
+        return {"error": f"Unknown job: {job_id}"}
+
+    offset = last_event_id or 0
+    if last_event_id_header and last_event_id_header.isdigit():
+        offset = int(last_event_id_header)
+
+    def generate():
+        for event_id, update in job.events(offset):
+            yield f"id: {event_id}\ndata: {update}\n\n"
+
+    return StreamingResponse(
+        generate(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no"
+        }
+    )
+
 @app.get("/export")
-async def export_project():
-    """Zips the output directory and returns it."""
-    output_dir = "output"
-    if not os.path.exists(output_dir):
-        return {"error": "No project generated yet."}
-
-    shutil.make_archive("project", 'zip', output_dir)
-    return FileResponse(
-        "project.zip",
+async def export_project(job_id: str = None, project_id: int = None):
+    """
+    Streams a zip of a finished build's workspace (?job_id=),
+    or of a stored project from memory with ?project_id=.
+    """
+    from agent.workspaces import get_workspace, build_running, iter_project_files
+    from agent.export import file_set_hash, cached_archive, stream_zip
+
+    if project_id is not None:
+        from agent.memory import get_project
+        project = await run_in_threadpool(get_project, project_id)
+        if project is None:
+            return {"error": f"Unknown project: {project_id}"}
+        entries = list(project.get("all_code", {}).items())
+    else:
+        if not job_id:
+            return {"error": "Pass job_id (or project_id) to choose what to export."}
+        workspace = get_workspace(job_id)
+        if workspace is None:
+            return {"error": f"Unknown job: {job_id}"}
+        if build_running(job_id):
+            return {"error": f"Job {job_id} is still building."}
+        entries = list(iter_project_files(workspace))
+
+    key = await run_in_threadpool(file_set_hash, entries)
+    filename = "autogenesis_project.zip"
+    cached = cached_archive(key)
+    if cached is not None:
+        return FileResponse(cached, media_type="application/zip", filename=filename)
+    return StreamingResponse(
+        stream_zip(entries, key),
         media_type="application/zip",
-        filename="autogenesis_project.zip"
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
     )
 
 @app.get("/ping")
@@ -138,24 +252,40 @@ class FixRequest(BaseModel):
 @app.post("/fix")
 async def auto_fix(req: FixRequest):
     """Auto-fix code based on error."""
-    from agent.capabilities import auto_fix_code
-    result = auto_fix_code(req.code, req.error)
+    from agent.capabilities import auto_fix_code_async
+    result = await auto_fix_code_async(req.code, req.error)
     return result
 
 @app.get("/status")
 async def get_status():
     """Get API status including rate limit state."""
-    from agent.agent import is_rate_limited, USE_GROQ, USE_GEMINI, MOCK_MODE
+    from agent.agent import is_rate_limited, USE_GROQ, USE_GEMINI, MOCK_MODE, provider_pool, get_hedge_stats
+    from agent.cache import get_cache_stats
+    from agent.jobs import get_job_stats
+    from agent.tracing import get_stage_stats
+    from agent.cassette import get_cassette_stats
     return {
         "rate_limited": is_rate_limited(),
         "provider": "groq" if USE_GROQ else "gemini" if USE_GEMINI else "mock",
         "mock_mode": MOCK_MODE,
+        "cache": get_cache_stats(),
+        "providers": provider_pool.stats(),
+        "hedging": get_hedge_stats(),
+        "jobs": get_job_stats(),
+        "stages": get_stage_stats(),
+        "cassette": get_cassette_stats(),
         "env_check": {
             "GROQ": bool(os.getenv("GROQ_API_KEY")),
             "GEMINI": bool(os.getenv("GEMINI_API_KEY"))
         }
     }
 
+@app.get("/metrics")
+async def get_metrics():
+    """Counters and latency histograms in the Prometheus text format."""
+    from agent.metrics import render_metrics
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
 @app.get("/debug")
 async def debug_agent():
     """Debug endpoint to check preloaded logic and env."""
@@ -174,7 +304,7 @@ class ExplainRequest(BaseModel):
 @app.post("/explain")
 async def explain_code(req: ExplainRequest):
     """Get AI explanation of code."""
-    from agent.agent import run_agent
+    from agent.agent import run_agent_async
     prompt = f"""Explain this {req.language} code line by line in simple terms.
 Be concise. Format as a list of explanations.
 
@@ -183,7 +313,7 @@ CODE:
 
 Return JSON: {{"explanations": [{{"line": 1, "code": "...", "explanation": "..."}}]}}"""
     
-    result = run_agent(prompt, mode="review")
+    result = await run_agent_async(prompt, mode="review")
     
     # Parse or fallback
     if "explanations" in result:
@@ -208,26 +338,33 @@ class DeployRequest(BaseModel):
 async def reset_demo():
     """RESET ENDPOINT FOR DEMO: Wipes all memory and intelligence."""
     
+    from agent.memory import clear_memory, MEMORY_DIR, MEMORY_DB, MEMORY_BACKEND
+    from agent.intelligence import reset_stats, STATS_FILE
+    
     deleted = []
     
-    # Files to delete
-    params = [
-        "storage/memory.json",
-        "storage/intelligence.json"
-    ]
+    try:
+        clear_memory()
+        deleted.append(f"{MEMORY_DIR}/")
+        if MEMORY_BACKEND == "sqlite":
+            deleted.append(str(MEMORY_DB))
+        deleted += ["storage/search.db", "storage/vectors/", "storage/blobs/"]
+    except Exception as e:
+        return {"error": f"Failed to clear memory: {str(e)}"}
     
-    for p in params:
-        try:
-            if os.path.exists(p):
-                os.remove(p)
-                deleted.append(p)
-        except Exception as e:
-            return {"error": f"Failed to delete {p}: {str(e)}"}
+    try:
+        reset_stats()
+        deleted.append(str(STATS_FILE))
+    except Exception as e:
+        return {"error": f"Failed to delete {STATS_FILE}: {str(e)}"}
             
-    # Also clear output folder
-    if os.path.exists("output"):
-        shutil.rmtree("output")
-        deleted.append("output/")
+    # Also clear finished build workspaces and their cached exports
+    from agent.workspaces import clear_workspaces, WORKSPACE_DIR
+    from agent.export import clear_exports, EXPORT_CACHE_DIR
+    if clear_workspaces():
+        deleted.append(f"{WORKSPACE_DIR}/")
+    clear_exports()
+    deleted.append(f"{EXPORT_CACHE_DIR}/")
 
     return {
         "success": True, 
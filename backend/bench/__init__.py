@@ -0,0 +1,4 @@
+"""
+Offline benchmarks - drive the pipeline and the HTTP API against a mock
+provider with injected latency, errors and 429s. See bench/run.py.
+"""
@@ -0,0 +1,138 @@
+"""
+Mock Provider - A stand-in for the Groq SDK client with realistic latency.
+Installed into the real provider pool, so rate limiting, failover, circuit
+breaking and mock fallbacks all behave as they would against the real API.
+"""
+import json
+import math
+import random
+import re
+import threading
+import time
+from types import SimpleNamespace
+
+# Pull the user's idea back out of build_groq_prompt()'s templates
+PROMPT_PATTERNS = [
+    ("plan", re.compile(r"Create a structured project plan for this idea: (.*?)\n\nReturn ONLY valid JSON", re.S)),
+    ("review", re.compile(r"You are an expert code reviewer.*?Code to review:\n(.*)", re.S)),
+    ("code", re.compile(r"Generate clean, working code for: (.*?)\n\nReturn ONLY the code", re.S)),
+    ("optimize", re.compile(r"Idea: (.*?)\n\nReturn ONLY the optimized prompt", re.S)),
+]
+
+
+class InjectedError(Exception):
+    """Simulated provider failure (5xx)."""
+    status_code = 500
+
+
+class InjectedRateLimit(Exception):
+    """Simulated 429 with a retry-after header."""
+    status_code = 429
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"429: Rate limit reached (retry after {retry_after}s)")
+        self.response = SimpleNamespace(headers={"retry-after": str(retry_after)})
+
+
+class MockProvider:
+    """
+    Latency is lognormal around latency_ms (sigma 0 makes it fixed);
+    error_rate and rate_limit_rate are per-request probabilities.
+    """
+
+    def __init__(self, latency_ms: float = 800, sigma: float = 0.5, error_rate: float = 0.0,
+                 rate_limit_rate: float = 0.0, retry_after: float = 1.0, seed: int = None):
+        self.latency_ms = latency_ms
+        self.sigma = sigma
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.stats = {"calls": 0, "errors": 0, "rate_limits": 0}
+
+    def _draw(self):
+        with self._lock:
+            self.stats["calls"] += 1
+            roll = self._random.random()
+            if self.sigma > 0 and self.latency_ms > 0:
+                delay = self._random.lognormvariate(math.log(self.latency_ms), self.sigma) / 1000
+            else:
+                delay = self.latency_ms / 1000
+            if roll < self.rate_limit_rate:
+                self.stats["rate_limits"] += 1
+                return delay, InjectedRateLimit(self.retry_after)
+            if roll < self.rate_limit_rate + self.error_rate:
+                self.stats["errors"] += 1
+                return delay, InjectedError("500: Injected provider error")
+            return delay, None
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return dict(self.stats)
+
+    def create(self, model: str = None, messages: list = None, stream: bool = False, **kwargs):
+        """Same call shape as groq.Groq().chat.completions.create."""
+        delay, error = self._draw()
+        if error is not None:
+            time.sleep(delay / 4)  # Failures come back faster than completions
+            raise error
+        time.sleep(delay)
+        prompt = messages[-1]["content"]
+        content = self.complete(prompt)
+        usage = SimpleNamespace(
+            prompt_tokens=len(prompt) // 4,
+            completion_tokens=len(content) // 4,
+            total_tokens=(len(prompt) + len(content)) // 4,
+        )
+        if stream:
+            return self._stream(content, usage)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))], usage=usage)
+
+    def _stream(self, content: str, usage):
+        step = max(1, len(content) // 8)
+        for i in range(0, len(content), step):
+            delta = SimpleNamespace(content=content[i:i + step])
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=delta)], x_groq=None)
+        yield SimpleNamespace(choices=[], x_groq=SimpleNamespace(usage=usage))
+
+    @staticmethod
+    def complete(prompt: str) -> str:
+        """Completion text in the shape the real model returns for the prompt's mode."""
+        from agent.agent import mock_response
+        mode, idea = "optimize", prompt
+        for name, pattern in PROMPT_PATTERNS:
+            match = pattern.search(prompt)
+            if match:
+                mode, idea = name, match.group(1)
+                break
+        result = mock_response(idea, mode)
+        if mode in ("plan", "review"):
+            return json.dumps(result)
+        if mode == "code":
+            return f"```\n{result['code']}\n```"
+        return result.get("response", "")
+
+    def client(self):
+        """Object to put in Backend._client."""
+        return SimpleNamespace(chat=SimpleNamespace(completions=self))
+
+
+def install(provider: MockProvider, backends: int = 2, rpm: int = 0, tpm: int = 0, max_in_flight: int = 8, cache: bool = False):
+    """Point the agent at a pool of mock backends. Returns the previous agent settings."""
+    from agent import agent
+    from agent.providers import Backend, ProviderPool
+
+    pool = []
+    for i in range(backends):
+        backend = Backend(f"mock-{i + 1}", "groq", "bench", rpm=rpm, tpm=tpm, max_in_flight=max_in_flight)
+        backend._client = provider.client()
+        pool.append(backend)
+    previous = (agent.provider_pool, agent.MOCK_MODE, agent.CACHE_ENABLED)
+    agent.provider_pool, agent.MOCK_MODE, agent.CACHE_ENABLED = ProviderPool(pool), False, cache
+    return previous
+
+
+def uninstall(previous):
+    from agent import agent
+    agent.provider_pool, agent.MOCK_MODE, agent.CACHE_ENABLED = previous
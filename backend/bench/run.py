@@ -0,0 +1,287 @@
+"""
+Benchmark runner.
+
+    cd backend
+    python -m bench.run --builds 20 --concurrency 4 --latency-ms 800 --error-rate 0.02 --rate-limit-rate 0.05
+    python -m bench.run --compare bench/results/old.json bench/results/new.json
+
+Builds run against bench.mock_provider in a throwaway working directory,
+so storage/ and workspaces/ are never touched. --record saves the run's
+LLM answers to a cassette; --replay serves answers from one at recorded
+(or --replay-speed scaled) speed, using the mock provider only for misses. "pipeline" calls
+run_pipeline() directly; "http" posts to the FastAPI app (served by
+uvicorn, or in-process if uvicorn isn't installed). Results are written
+as JSON, tagged with the current git commit.
+"""
+import argparse
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+RESULTS_DIR = BACKEND_DIR / "bench" / "results"
+sys.path.insert(0, str(BACKEND_DIR))
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+    print("⚠️ resource module unavailable; peak RSS will not be reported")
+
+from agent.testing import isolated_workdir
+from bench.mock_provider import MockProvider, install, uninstall
+
+# Headline numbers compared by --compare: (key, lower is better)
+COMPARED = [
+    ("builds_per_sec", False),
+    ("p50", True),
+    ("p95", True),
+    ("p99", True),
+    ("peak_rss_mb", True),
+]
+
+
+def percentile(samples: list, pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return round(ordered[index], 4)
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process so far."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    divisor = 1024 * 1024 if sys.platform == "darwin" else 1024  # bytes on macOS, KB elsewhere
+    return round(peak / divisor, 1)
+
+
+def git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True, timeout=10)
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def fallback_total() -> float:
+    from agent.metrics import LLM_FALLBACKS
+    return sum(LLM_FALLBACKS.value(mode=mode) for mode in ("plan", "code", "review", "optimize"))
+
+
+def run_builds(name: str, build_one, builds: int, concurrency: int, idea: str, provider: MockProvider, same_idea: bool = False) -> dict:
+    """Run `builds` builds with at most `concurrency` at once and summarize them."""
+    from agent.cassette import get_cassette_stats
+    latencies, failures = [], []
+    lock = threading.Lock()
+    calls_before, fallbacks_before = provider.snapshot(), fallback_total()
+    replayed_before = get_cassette_stats()
+
+    def one(i):
+        started = time.monotonic()
+        try:
+            build_one(idea if same_idea else f"{idea} #{i}")
+        except Exception as e:
+            with lock:
+                failures.append(f"{type(e).__name__}: {e}")
+            return
+        with lock:
+            latencies.append(time.monotonic() - started)
+
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(builds)))
+    wall = time.monotonic() - started
+
+    calls = {key: value - calls_before[key] for key, value in provider.snapshot().items()}
+    replayed = get_cassette_stats()
+    result = {
+        "builds": builds,
+        "ok": len(latencies),
+        "failed": len(failures),
+        "wall_seconds": round(wall, 3),
+        "builds_per_sec": round(len(latencies) / wall, 3) if wall else 0.0,
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+        "max": round(max(latencies), 4) if latencies else 0.0,
+        "mean": round(sum(latencies) / len(latencies), 4) if latencies else 0.0,
+        "llm_calls": calls["calls"],
+        "injected_errors": calls["errors"],
+        "injected_rate_limits": calls["rate_limits"],
+        "fallbacks": int(fallback_total() - fallbacks_before),
+        "replayed": replayed["replayed"] - replayed_before["replayed"],
+        "replay_misses": replayed["misses"] - replayed_before["misses"],
+        "peak_rss_mb": peak_rss_mb(),
+        "errors": failures[:5],
+    }
+    print(f"📊 {name}: {result['ok']}/{builds} builds, {result['builds_per_sec']} builds/s, "
+          f"p50 {result['p50']}s p95 {result['p95']}s p99 {result['p99']}s, "
+          f"{result['llm_calls']} LLM calls, {result['fallbacks']} fallbacks, peak RSS {result['peak_rss_mb']} MB")
+    return result
+
+
+def bench_pipeline(args, provider: MockProvider) -> dict:
+    from agent.orchestrator import run_pipeline
+    return run_builds("pipeline", lambda idea: run_pipeline(idea), args.builds, args.concurrency, args.idea, provider, args.same_idea)
+
+
+class _Server:
+    """The FastAPI app on uvicorn in a background thread, or an in-process client without uvicorn."""
+
+    def __init__(self):
+        from api import app
+        self.app = app
+        self.server = None
+        try:
+            import uvicorn
+        except ImportError:
+            print("⚠️ uvicorn not installed; benchmarking the app in-process (no real sockets)")
+            from fastapi.testclient import TestClient
+            self.client = TestClient(app)
+            return
+
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            port = s.getsockname()[1]
+        self.server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+        threading.Thread(target=self.server.run, daemon=True).start()
+        deadline = time.monotonic() + 10
+        while not self.server.started:
+            if time.monotonic() > deadline:
+                raise RuntimeError("uvicorn did not start")
+            time.sleep(0.05)
+        import httpx
+        self.client = httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=600)
+
+    def close(self):
+        self.client.close()
+        if self.server is not None:
+            self.server.should_exit = True
+
+
+def bench_http(args, provider: MockProvider) -> dict:
+    server = _Server()
+
+    def build_one(idea):
+        if args.endpoint == "/run-stream":
+            complete = False
+            with server.client.stream("POST", "/run-stream", json={"idea": idea}) as response:
+                response.raise_for_status()
+                for line in response.iter_lines():
+                    if line.startswith("data: ") and json.loads(line[6:]).get("step") == "complete":
+                        complete = True
+            if not complete:
+                raise RuntimeError("stream ended without a complete event")
+        else:
+            response = server.client.post("/run", json={"idea": idea})
+            response.raise_for_status()
+
+    try:
+        return run_builds(f"http {args.endpoint}", build_one, args.builds, args.concurrency, args.idea, provider, args.same_idea)
+    finally:
+        server.close()
+
+
+def compare(old_path: str, new_path: str):
+    """Print the headline numbers of two result files side by side."""
+    old, new = json.loads(Path(old_path).read_text()), json.loads(Path(new_path).read_text())
+    print(f"{'':24} {old.get('commit') or old_path:>12} {new.get('commit') or new_path:>12}   change")
+    for target in sorted(set(old["results"]) & set(new["results"])):
+        for key, lower_is_better in COMPARED:
+            a, b = old["results"][target].get(key), new["results"][target].get(key)
+            if a is None or b is None:
+                continue
+            change = (b - a) / a * 100 if a else 0.0
+            worse = change > 0 if lower_is_better else change < 0
+            flag = " ⚠️" if worse and abs(change) >= 10 else ""
+            print(f"{target + ' ' + key:24} {a:>12} {b:>12}   {change:+.1f}%{flag}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Offline Autogenesis benchmarks against a mock provider")
+    parser.add_argument("--target", choices=["pipeline", "http", "all"], default="all")
+    parser.add_argument("--builds", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--idea", default="todo web app")
+    parser.add_argument("--same-idea", action="store_true", help="don't number ideas per build (to replay cassettes recorded outside the bench)")
+    parser.add_argument("--endpoint", choices=["/run", "/run-stream"], default="/run")
+    parser.add_argument("--latency-ms", type=float, default=800, help="median provider latency")
+    parser.add_argument("--latency-sigma", type=float, default=0.5, help="lognormal spread; 0 for fixed latency")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=float, default=1.0, help="seconds in injected 429s")
+    parser.add_argument("--backends", type=int, default=2)
+    parser.add_argument("--rpm", type=int, default=0, help="per-backend request limit (0 = none)")
+    parser.add_argument("--tpm", type=int, default=0, help="per-backend token limit (0 = none)")
+    parser.add_argument("--max-in-flight", type=int, default=8)
+    parser.add_argument("--cache", action="store_true", help="allow LLM response cache hits")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--record", help="save LLM answers of this run to a cassette file")
+    parser.add_argument("--replay", help="serve LLM answers from a cassette file")
+    parser.add_argument("--replay-speed", type=float, default=1.0, help="replay speed multiplier; 0 for instant")
+    parser.add_argument("--output", help="result file (default bench/results/<time>-<commit>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"))
+    return parser.parse_args(argv)
+
+
+def run_benchmark(args) -> dict:
+    """Run the selected targets in a temporary directory and return the report."""
+    for name in ("record", "replay"):  # Resolve before moving to the temporary directory
+        if getattr(args, name):
+            setattr(args, name, str(Path(getattr(args, name)).resolve()))
+    provider = MockProvider(args.latency_ms, args.latency_sigma, args.error_rate,
+                            args.rate_limit_rate, args.retry_after, seed=args.seed)
+    from agent.cassette import use_cassettes
+    previous = install(provider, args.backends, args.rpm, args.tpm, args.max_in_flight, args.cache)
+    use_cassettes(record=args.record, replay=args.replay, speed=args.replay_speed)
+    results = {}
+    try:
+        with isolated_workdir():
+            if args.target in ("pipeline", "all"):
+                results["pipeline"] = bench_pipeline(args, provider)
+            if args.target in ("http", "all"):
+                results["http"] = bench_http(args, provider)
+    finally:
+        uninstall(previous)
+        use_cassettes(speed=1.0)
+    config = {k: v for k, v in vars(args).items() if k not in ("output", "compare")}
+    return {
+        "commit": git_commit(),
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": config,
+        "results": results,
+    }
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    report = run_benchmark(args)
+    output = Path(args.output) if args.output else None
+    if output is None:
+        RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        output = RESULTS_DIR / f"{stamp}-{report['commit'] or 'nogit'}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"💾 Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -11,11 +11,14 @@ def train_reasoner():
     """
     print("Initializing Oumi RL Training Pipeline...")
     
-    # 1. Load Project Memory
-    memory_path = "../storage/memory.json"
-    if os.path.exists(memory_path):
-        with open(memory_path, 'r') as f:
-            data = json.load(f)
+    # 1. Load Project Memory (append-only segment log, one project per line)
+    memory_dir = "../storage/memory"
+    if os.path.isdir(memory_dir):
+        data = []
+        for name in sorted(os.listdir(memory_dir)):
+            if name.startswith("segment-") and name.endswith(".jsonl"):
+                with open(os.path.join(memory_dir, name), 'r') as f:
+                    data.extend(json.loads(line) for line in f if line.strip())
         print(f"Loaded {len(data)} interaction records for training.")
     else:
         print("No memory found. Using synthetic data.")
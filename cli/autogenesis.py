@@ -45,11 +45,19 @@ def main():
         
         try:
             from agent.orchestrator import run_pipeline
+            from agent.workspaces import get_workspace, copy_project
             result = run_pipeline(args.idea)
             
             print(f"\n✅ Generated {len(result['code_files'])} files:")
             for f in result['code_files']:
                 print(f"   - {f}")
+            
+            # Builds run in workspaces/<job_id>/, which is garbage-collected; keep a copy
+            workspace = get_workspace(result['job_id'])
+            if workspace is not None:
+                copy_project(workspace, args.output)
+                print(f"\n📁 Saved to: {os.path.abspath(args.output)}")
+                print(f"   Workspace: {workspace.resolve()}")
             print(f"\n📊 XP Gained: +{result.get('xp_gained', 0)}")
             print(f"🧠 AI Level: {result['intelligence']['level']}%")
             
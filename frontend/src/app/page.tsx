@@ -54,6 +54,7 @@ interface CodeError {
 }
 
 interface AgentResult {
+  job_id?: string;
   idea: string;
   plan: any;
   code_files: string[];
@@ -216,7 +217,7 @@ export default function Home() {
     try {
       const res = await fetch(`${API_URL}/run-stream`, {
         method: "POST", headers: { "Content-Type": "application/json" },
-        body: JSON.stringify({ idea: targetIdea, improve }), signal: abortRef.current.signal,
+        body: JSON.stringify({ idea: targetIdea, improve, previous_job: improve ? result?.job_id : undefined }), signal: abortRef.current.signal,
       });
       const reader = res.body?.getReader();
       const dec = new TextDecoder();
@@ -245,7 +246,7 @@ export default function Home() {
       try {
         const res = await fetch(`${API_URL}/run`, {
           method: "POST", headers: { "Content-Type": "application/json" },
-          body: JSON.stringify({ idea: targetIdea, improve }),
+          body: JSON.stringify({ idea: targetIdea, improve, previous_job: improve ? result?.job_id : undefined }),
         });
         const data = await res.json();
         if (data.result) {
@@ -297,7 +298,9 @@ export default function Home() {
               </div>
             </div>
           )}
-          <a href={`${API_URL}/export`} className="text-xs text-[#525252] hover:text-white transition">Export</a>
+          {result?.job_id && (
+            <a href={`${API_URL}/export?job_id=${result.job_id}`} className="text-xs text-[#525252] hover:text-white transition">Export</a>
+          )}
         </div>
       </nav>
 